@@ -2,8 +2,9 @@ from PySide6.QtWidgets import QApplication
 from PySide6.QtQml import QQmlApplicationEngine
 from PySide6.QtQuickControls2 import QQuickStyle
 import sys
+import os
 from backend.controller.app_controller import AppController
-from utils.config import load_config, CURRENT_VERSION
+from utils.config import load_config, get_rate_limits, CURRENT_VERSION
 from logger_config import setup_logger, setup_translate_logger
 from backend.model import *
 from backend.viewmodel import *
@@ -29,6 +30,44 @@ if __name__ == "__main__":
     translate_logger = setup_translate_logger(_runtime_data.translate_log)
 
     _app_controller = AppController(app)
+    _app_controller.translate_core.update_rate_limits(get_rate_limits(_config_data.free_tier, _config_data.rate_limits))
+    _app_controller.translate_core.configure_base_url(_config_data.gemini_base_url)
+    _app_controller.translate_core.register_keys(_config_data.extra_gemini_api_keys)
+    _app_controller.translate_core.update_retry_policy(_config_data.retry_policy)
+    _app_controller.translate_core.configure_response_cache(
+        _config_data.response_cache_enabled,
+        os.path.join(paths.get_cache_directory(), "response_cache.sqlite3"),
+        _config_data.response_cache_max_mb
+    )
+    _app_controller.translate_core.configure_translation_memory(
+        _config_data.translation_memory_enabled,
+        os.path.join(paths.get_cache_directory(), "translation_memory.sqlite3"),
+        _config_data.fuzzy_match_threshold,
+        _config_data.fuzzy_autofill_threshold
+    )
+    _app_controller.translate_core.configure_context_cache(
+        _config_data.context_cache_enabled,
+        _config_data.context_cache_ttl
+    )
+    _app_controller.translate_core.configure_structured_output(_config_data.structured_output)
+    _app_controller.translate_core.configure_circuit_breaker(
+        _config_data.circuit_breaker_threshold,
+        _config_data.circuit_breaker_reset
+    )
+    _app_controller.translate_core.configure_hedging(
+        _config_data.hedge_percentile if _config_data.hedging_enabled else 0,
+        _config_data.hedge_budget_percent
+    )
+    _app_controller.translate_core.configure_call_trace(
+        _config_data.call_trace_mode,
+        _config_data.call_trace_path or os.path.join(paths.get_cache_directory(), "call_trace.jsonl"),
+        _config_data.call_trace_speed
+    )
+    _app_controller.translate_core.configure_concurrency(
+        _config_data.max_concurrent_request,
+        _config_data.max_adaptive_concurrency,
+        _config_data.adaptive_concurrency
+    )
 
     _start_view_model = StartViewModel(_config_data, _runtime_data, _app_controller)
     _gemini_api_view_model = GeminiApiViewModel(_config_data, _runtime_data, _app_controller)
@@ -1 +1,4 @@
-from .translate_core import TranslateCore
\ No newline at end of file
+from .translate_core import TranslateCore
+from .chunk_runner import ChunkRunner
+from .chunk_reconciler import ChunkReconciler
+from .batch_backend import BatchJobRunner, GeminiBatchBackend, LocalBatchBackend
@@ -0,0 +1,192 @@
+from google.genai import types
+from .translate_core import TranslateCore
+from .chunk_reconciler import ChunkReconciler
+from .response_cache import ResponseCache
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Callable, Iterator
+
+BATCH_DONE_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_PARTIALLY_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED"
+}
+
+def read_batch_output(data: bytes) -> Iterator[tuple[str, str | None]]:
+    """
+    Yields (key, response text) for every line of a batch output file; text is None for failed or blocked requests.
+    """
+    for line in data.decode('utf-8').splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        key = entry.get("key", "")
+        if "response" not in entry:
+            yield key, None
+            continue
+        try:
+            resp = types.GenerateContentResponse.model_validate(entry["response"])
+            yield key, resp.text
+        except Exception:
+            yield key, None
+
+
+class GeminiBatchBackend:
+    """
+    Gemini Batch API: the JSONL request file is uploaded, run as one batch job and its output file downloaded.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def submit(self, jsonl_path: str, model: str, display_name: str) -> str:
+        uploaded = self._client.files.upload(
+            file=jsonl_path,
+            config=types.UploadFileConfig(display_name=display_name, mime_type="jsonl")
+        )
+        job = self._client.batches.create(
+            model=model,
+            src=uploaded.name,
+            config=types.CreateBatchJobConfig(display_name=display_name)
+        )
+        return job.name
+
+    def get_state(self, job_name: str) -> str:
+        job = self._client.batches.get(name=job_name)
+        return job.state.value if hasattr(job.state, "value") else str(job.state)
+
+    def fetch_results(self, job_name: str) -> bytes:
+        job = self._client.batches.get(name=job_name)
+        if not job.dest or not job.dest.file_name:
+            return b""
+        return self._client.files.download(file=job.dest.file_name)
+
+
+class LocalBatchBackend:
+    """
+    File-based stand-in for the Batch API.
+
+    A submitted job is copied into directory/<job id>/input.jsonl and answered line by
+    line with responder(request) into output.jsonl, in the same format the Batch API
+    produces. The default responder echoes the request text back unchanged, so a whole
+    book can be pushed through the batch path without any network access.
+    """
+
+    def __init__(self, directory: str, responder: Callable[[dict], str] | None = None):
+        self._directory = directory
+        self._responder = responder or self._echo
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _echo(request: dict) -> str:
+        return request["contents"][0]["parts"][0]["text"]
+
+    def submit(self, jsonl_path: str, model: str, display_name: str) -> str:
+        job_name = f"local-{uuid.uuid4().hex[:12]}"
+        job_dir = os.path.join(self._directory, job_name)
+        os.makedirs(job_dir)
+        shutil.copyfile(jsonl_path, os.path.join(job_dir, "input.jsonl"))
+        with open(os.path.join(job_dir, "input.jsonl"), "r", encoding="utf-8") as f_in, \
+                open(os.path.join(job_dir, "output.jsonl"), "w", encoding="utf-8") as f_out:
+            for line in f_in:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                try:
+                    text = self._responder(entry["request"])
+                    result = {"key": entry["key"], "response": {"candidates": [
+                        {"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}
+                    ]}}
+                except Exception as e:
+                    result = {"key": entry["key"], "error": {"message": str(e)}}
+                f_out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        return job_name
+
+    def get_state(self, job_name: str) -> str:
+        if os.path.exists(os.path.join(self._directory, job_name, "output.jsonl")):
+            return "JOB_STATE_SUCCEEDED"
+        return "JOB_STATE_FAILED"
+
+    def fetch_results(self, job_name: str) -> bytes:
+        with open(os.path.join(self._directory, job_name, "output.jsonl"), "rb") as f:
+            return f.read()
+
+
+class BatchJobRunner:
+    """
+    Translates a list of JSON chunks as one batch job instead of one request per chunk.
+
+    The job name is stored in work_dir, so an interrupted run resumes polling the job
+    it already submitted instead of paying for it twice.
+    """
+
+    def __init__(self, core: TranslateCore, backend, work_dir: str, poll_interval: float = 30.0):
+        self._logger = logging.getLogger("seamarine_translate")
+        self._core = core
+        self._backend = backend
+        self._work_dir = work_dir
+        self._poll_interval = poll_interval
+        os.makedirs(work_dir, exist_ok=True)
+
+    def run(self, chunks: list[dict[str, str]], on_poll: Callable[[str], None] | None = None) -> dict[str, str]:
+        """
+        Returns every valid id -> translation found in the batch output; ids that failed are left out.
+        """
+        if not chunks:
+            return {}
+        state_path = os.path.join(self._work_dir, "batch_job.json")
+        job_name = self._load_job(state_path, chunks)
+        if not job_name:
+            jsonl_path = os.path.join(self._work_dir, "batch_requests.jsonl")
+            with open(jsonl_path, "w", encoding="utf-8") as f:
+                for chunk_index, chunk in enumerate(chunks):
+                    request = self._core.build_batch_request(json.dumps(chunk, ensure_ascii=False, indent=2), list(chunk.keys()))
+                    f.write(json.dumps({"key": f"chunk-{chunk_index}", "request": request}, ensure_ascii=False) + "\n")
+            job_name = self._backend.submit(jsonl_path, self._core.get_model_name(), os.path.basename(self._work_dir))
+            with open(state_path, "w", encoding="utf-8") as f:
+                json.dump({"job_name": job_name, "chunks_key": self._make_chunks_key(chunks)}, f)
+            self._logger.info(str(self) + f".run -> submitted {job_name} with {len(chunks)} chunks")
+
+        while True:
+            state = self._backend.get_state(job_name)
+            if on_poll:
+                on_poll(state)
+            if state in BATCH_DONE_STATES:
+                break
+            time.sleep(self._poll_interval)
+        self._logger.info(str(self) + f".run -> {job_name} finished with {state}")
+
+        translated: dict[str, str] = {}
+        if state in ("JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"):
+            for key, text in read_batch_output(self._backend.fetch_results(job_name)):
+                chunk_index = int(key.removeprefix("chunk-")) if key.startswith("chunk-") else -1
+                if not 0 <= chunk_index < len(chunks) or not text:
+                    continue
+                reconciler = ChunkReconciler(self._core, chunks[chunk_index], key)
+                reconciler.reconcile(chunks[chunk_index], self._core.parse_json_response(text))
+                translated.update(reconciler.results)
+        os.remove(state_path)
+        return translated
+
+    @staticmethod
+    def _make_chunks_key(chunks: list[dict[str, str]]) -> str:
+        return ResponseCache.make_key([list(chunk.keys()) for chunk in chunks])
+
+    def _load_job(self, state_path: str, chunks: list[dict[str, str]]) -> str:
+        if not os.path.exists(state_path):
+            return ""
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("chunks_key") == self._make_chunks_key(chunks):
+                self._logger.info(str(self) + f"._load_job -> resuming {state['job_name']}")
+                return state["job_name"]
+        except Exception as e:
+            self._logger.warning(str(self) + f"._load_job -> {e}")
+        return ""
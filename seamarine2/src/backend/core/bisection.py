@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable
+
+class BisectionStats:
+    def __init__(self):
+        self.runs = 0
+        self.calls = 0
+        self.memo_hits = 0
+        self.blocked_pieces = 0
+        self.tokens_spent = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "calls": self.calls,
+            "memo_hits": self.memo_hits,
+            "blocked_pieces": self.blocked_pieces,
+            "tokens_spent": self.tokens_spent
+        }
+
+
+class BisectionEngine:
+    """
+    Isolates the lines of a blocked (or otherwise failed) payload by recursive bisection.
+
+    A payload is split in two, by keys for a JSON object or at a line boundary for
+    plain text, and each half is sent once. A half that succeeds is kept (and
+    memoized, so the same half is never paid for twice); a half that fails is split
+    again until max_depth is reached or it cannot be split any further. One blocked
+    line in n therefore costs about 2*log2(n) extra calls.
+
+    generate(contents, response_keys) must return the response text, or "" when the
+    request was blocked or failed. estimate_tokens(contents) is used for statistics.
+    context() fingerprints whatever else decides the answer (model, system instruction,
+    glossary); it is part of every memo key, so an engine shared across stages never
+    returns a half translated under another prompt or model.
+    """
+
+    def __init__(
+            self,
+            generate: Callable[[str, list[str] | None], Awaitable[str]],
+            estimate_tokens: Callable[[str], int],
+            parse_json: Callable[[str], dict],
+            max_depth: int = 8,
+            max_memo_entries: int = 4096,
+            context: Callable[[], str] | None = None
+            ):
+        self._logger = logging.getLogger("seamarine_translate")
+        self._generate = generate
+        self._estimate_tokens = estimate_tokens
+        self._parse_json = parse_json
+        self.max_depth = max_depth
+        self._max_memo_entries = max_memo_entries
+        self._context = context or (lambda: "")
+        self._memo: dict[tuple, object] = {}
+        self.stats = BisectionStats()
+
+    async def bisect_json(self, contents: str) -> str:
+        """
+        Returns a JSON object with every key that could be translated; keys that stay blocked are left out.
+        """
+        try:
+            payload = json.loads(contents)
+        except ValueError:
+            self._logger.warning(str(self) + ".bisect_json -> contents are not a JSON object, splitting as text")
+            return await self.bisect_text(contents)
+        if not isinstance(payload, dict):
+            return await self.bisect_text(contents)
+        self.stats.runs += 1
+        tokens_before = self.stats.tokens_spent
+        blocked_before = self.stats.blocked_pieces
+        result = await self._split_json(payload, 1)
+        self._logger.info(
+            str(self) + f".bisect_json -> recovered {len(result)}/{len(payload)} keys, "
+            f"{self.stats.blocked_pieces - blocked_before} blocked, ~{self.stats.tokens_spent - tokens_before} tokens spent"
+        )
+        return json.dumps(result, ensure_ascii=False)
+
+    async def bisect_text(self, contents: str) -> str:
+        """
+        Returns the translated text; pieces that stay blocked are kept in their original form.
+        """
+        self.stats.runs += 1
+        tokens_before = self.stats.tokens_spent
+        blocked_before = self.stats.blocked_pieces
+        result = await self._split_text(contents, 1)
+        self._logger.info(
+            str(self) + f".bisect_text -> {self.stats.blocked_pieces - blocked_before} blocked pieces, "
+            f"~{self.stats.tokens_spent - tokens_before} tokens spent"
+        )
+        return result
+
+    async def _split_json(self, payload: dict, depth: int) -> dict:
+        keys = list(payload.keys())
+        if len(keys) < 2 or depth > self.max_depth:
+            self.stats.blocked_pieces += 1
+            self._logger.warning(str(self) + f"._split_json -> giving up on ids {keys}")
+            return {}
+        mid = len(keys) // 2
+        halves = [{k: payload[k] for k in keys[:mid]}, {k: payload[k] for k in keys[mid:]}]
+        results = await asyncio.gather(*(self._solve_json(half, depth) for half in halves))
+        merged = {}
+        for result in results:
+            merged.update(result)
+        return merged
+
+    async def _solve_json(self, half: dict, depth: int) -> dict:
+        memo_key = ("json", self._context(), json.dumps(half, ensure_ascii=False, sort_keys=True))
+        if memo_key in self._memo:
+            self.stats.memo_hits += 1
+            return self._memo[memo_key]
+        contents = json.dumps(half, ensure_ascii=False, indent=2)
+        resp = await self._call(contents, list(half.keys()))
+        if resp:
+            parsed = self._parse_json(resp)
+            result = {k: v for k, v in parsed.items() if k in half}
+            if result:
+                self._remember(memo_key, result)
+                return result
+        return await self._split_json(half, depth + 1)
+
+    async def _split_text(self, contents: str, depth: int) -> str:
+        halves = self._halve_text(contents)
+        if halves is None or depth > self.max_depth:
+            self.stats.blocked_pieces += 1
+            self._logger.warning(str(self) + f"._split_text -> giving up on {len(contents)} characters, keeping the original")
+            return contents
+        results = await asyncio.gather(*(self._solve_text(half, depth) for half in halves))
+        return "".join(results)
+
+    async def _solve_text(self, half: str, depth: int) -> str:
+        if not half.strip():
+            return half
+        memo_key = ("text", self._context(), half)
+        if memo_key in self._memo:
+            self.stats.memo_hits += 1
+            return self._memo[memo_key]
+        resp = await self._call(half, None)
+        if resp:
+            # Keep the line break that separated the halves.
+            result = resp + half[len(half.rstrip('\n')):]
+            self._remember(memo_key, result)
+            return result
+        return await self._split_text(half, depth + 1)
+
+    @staticmethod
+    def _halve_text(contents: str) -> tuple[str, str] | None:
+        """
+        Splits at the line break closest to the middle, or at the middle itself for a single long line.
+        """
+        if len(contents.strip()) < 2:
+            return None
+        mid = len(contents) // 2
+        before = contents.rfind('\n', 0, mid)
+        after = contents.find('\n', mid)
+        candidates = [i + 1 for i in (before, after) if i != -1 and 0 < i + 1 < len(contents)]
+        cut = min(candidates, key=lambda i: abs(i - mid)) if candidates else mid
+        return contents[:cut], contents[cut:]
+
+    async def _call(self, contents: str, response_keys: list[str] | None) -> str:
+        self.stats.calls += 1
+        self.stats.tokens_spent += self._estimate_tokens(contents)
+        try:
+            return await self._generate(contents, response_keys)
+        except Exception as e:
+            self._logger.warning(str(self) + f"._call -> {e}")
+            return ""
+
+    def _remember(self, key: tuple, value):
+        if len(self._memo) >= self._max_memo_entries:
+            self._memo.pop(next(iter(self._memo)))
+        self._memo[key] = value
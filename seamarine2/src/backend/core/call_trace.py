@@ -0,0 +1,242 @@
+from google.genai import errors, types
+from .circuit_breaker import CircuitBreaker
+from .stream_collector import StreamCollector
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+
+TRACE_OFF = "off"
+TRACE_RECORD = "record"
+TRACE_REPLAY = "replay"
+
+def hash_contents(contents) -> str:
+    data = contents if isinstance(contents, bytes) else str(contents).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:32]
+
+def summarize_config(gen_config: types.GenerateContentConfig) -> dict:
+    """
+    The parts of a generate config that shape the response; the system prompt and schema are only hashed.
+    """
+    thinking = gen_config.thinking_config
+    return {
+        "temperature": gen_config.temperature,
+        "max_output_tokens": gen_config.max_output_tokens,
+        "thinking_budget": thinking.thinking_budget if thinking else None,
+        "mime_type": gen_config.response_mime_type,
+        "schema": hash_contents(gen_config.response_schema.model_dump_json()) if gen_config.response_schema else None,
+        "system": hash_contents(gen_config.system_instruction) if gen_config.system_instruction else None,
+        "cached": bool(gen_config.cached_content)
+    }
+
+
+class ReplayMissError(LookupError):
+    """
+    Raised in replay mode for a request the trace has no answer for.
+    """
+
+
+class CallTraceRecorder:
+    """
+    Appends every model call to a JSONL trace: contents hash, config summary,
+    latency and either the response (text, finish / block reason, token usage)
+    or the error. String contents are stored too so a replay can answer
+    re-chunked requests line by line.
+    """
+
+    def __init__(self, path: str):
+        self._logger = logging.getLogger("seamarine_translate")
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self.count = 0
+
+    def record(
+            self,
+            contents,
+            model_name: str,
+            gen_config: types.GenerateContentConfig,
+            streamed: bool,
+            latency: float,
+            resp: types.GenerateContentResponse | None = None,
+            error: BaseException | None = None
+            ):
+        entry = {
+            "t": round(time.monotonic() - self._started_at, 3),
+            "model": model_name,
+            "hash": hash_contents(contents),
+            "stream": streamed,
+            "config": summarize_config(gen_config),
+            "latency": round(latency, 3),
+            "contents": contents if isinstance(contents, str) else None
+        }
+        if error is not None:
+            entry["error"] = self._dump_error(error)
+        else:
+            entry["response"] = self._dump_response(resp)
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        self._logger.info(str(self) + f".close -> {self.count} calls recorded to {self.path}")
+
+    @staticmethod
+    def _dump_response(resp: types.GenerateContentResponse) -> dict:
+        candidate = resp.candidates[0] if resp.candidates else None
+        usage = resp.usage_metadata
+        return {
+            "text": resp.text if candidate else None,
+            "finish_reason": candidate.finish_reason.value if candidate and candidate.finish_reason else None,
+            "block_reason": resp.prompt_feedback.block_reason.value if resp.prompt_feedback and resp.prompt_feedback.block_reason else None,
+            "usage": [usage.prompt_token_count, usage.candidates_token_count] if usage else None
+        }
+
+    @staticmethod
+    def _dump_error(e: BaseException) -> dict:
+        if isinstance(e, errors.APIError):
+            return {"type": type(e).__name__, "code": e.code, "details": e.details}
+        return {"type": type(e).__name__, "message": str(e), "outage": CircuitBreaker.is_outage_error(e)}
+
+
+class CallTraceReplayer:
+    """
+    Serves model calls from a trace written by CallTraceRecorder.
+
+    Calls with the same contents are answered in recorded order (so a recorded
+    429 followed by a success replays as exactly that); once exhausted, the last
+    successful answer repeats. A JSON chunk that was never sent as such (e.g.
+    after changing the chunker) is assembled from the recorded per-line
+    translations. Latencies are the recorded ones divided by speed; speed 0
+    answers immediately.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self._logger = logging.getLogger("seamarine_translate")
+        self.path = path
+        self.speed = speed
+        self._entries: dict[str, list[dict]] = {}
+        self._cursor: dict[str, int] = {}
+        self._lines: dict[str, str] = {}
+        self._seconds_per_char: float = 0.0
+        self.hits = 0
+        self.line_hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        rates = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves at most one partial line at the end.
+                    continue
+                self._entries.setdefault(entry["hash"], []).append(entry)
+                response = entry.get("response")
+                if response and response.get("finish_reason") == types.FinishReason.STOP.value and entry.get("contents"):
+                    self._index_lines(entry["contents"], response.get("text") or "")
+                    rates.append(entry["latency"] / max(1, len(entry["contents"])))
+        self._seconds_per_char = statistics.median(rates) if rates else 0.0
+        self._logger.info(str(self) + f"._load -> {sum(len(v) for v in self._entries.values())} calls, {len(self._lines)} lines from {self.path}")
+
+    def _index_lines(self, contents: str, text: str):
+        try:
+            sent = json.loads(contents)
+            received = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(sent, dict) or not isinstance(received, dict):
+            return
+        for key, source in sent.items():
+            value = received.get(key)
+            if isinstance(source, str) and isinstance(value, str):
+                self._lines[source] = value
+
+    def get_stats(self) -> dict:
+        return {"hits": self.hits, "line_hits": self.line_hits, "misses": self.misses}
+
+    async def replay(self, contents, model_name: str, stream: StreamCollector | None = None) -> types.GenerateContentResponse:
+        entry = self._next_entry(hash_contents(contents))
+        if entry is None:
+            entry = self._assemble_entry(contents)
+        if entry is None:
+            self.misses += 1
+            raise ReplayMissError(f"No recorded response for {model_name} request {hash_contents(contents)[:12]}")
+        if self.speed > 0:
+            await asyncio.sleep(entry["latency"] / self.speed)
+        if "error" in entry:
+            raise self._load_error(entry["error"])
+        resp = self._load_response(entry["response"])
+        if stream:
+            stream.begin()
+            stream.feed(resp)
+            stream.end()
+        return resp
+
+    def _next_entry(self, digest: str) -> dict | None:
+        entries = self._entries.get(digest)
+        if not entries:
+            return None
+        index = self._cursor.get(digest, 0)
+        self.hits += 1
+        if index < len(entries):
+            self._cursor[digest] = index + 1
+            return entries[index]
+        successes = [entry for entry in entries if "response" in entry]
+        return successes[-1] if successes else entries[-1]
+
+    def _assemble_entry(self, contents) -> dict | None:
+        if not isinstance(contents, str):
+            return None
+        try:
+            sent = json.loads(contents)
+        except ValueError:
+            return None
+        if not isinstance(sent, dict):
+            return None
+        found = {key: self._lines[source] for key, source in sent.items() if isinstance(source, str) and source in self._lines}
+        if not found:
+            return None
+        self.line_hits += 1
+        text = json.dumps(found, ensure_ascii=False, indent=2)
+        return {
+            "latency": self._seconds_per_char * len(contents),
+            "response": {"text": text, "finish_reason": types.FinishReason.STOP.value, "block_reason": None, "usage": None}
+        }
+
+    @staticmethod
+    def _load_response(data: dict) -> types.GenerateContentResponse:
+        usage = data.get("usage")
+        candidates = None
+        if data.get("text") is not None or data.get("finish_reason"):
+            candidates = [types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=data.get("text") or "")]),
+                finish_reason=data.get("finish_reason")
+            )]
+        return types.GenerateContentResponse(
+            candidates=candidates,
+            prompt_feedback=types.GenerateContentResponsePromptFeedback(block_reason=data["block_reason"]) if data.get("block_reason") else None,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=usage[0], candidates_token_count=usage[1]) if usage else None
+        )
+
+    @staticmethod
+    def _load_error(data: dict) -> Exception:
+        error_type = getattr(errors, data["type"], None)
+        if isinstance(error_type, type) and issubclass(error_type, errors.APIError):
+            return error_type(data["code"], data["details"])
+        if data.get("outage"):
+            # Network errors replay as OSError so the circuit breaker reacts the same way.
+            return ConnectionError(data["message"])
+        return RuntimeError(f"{data['type']}: {data['message']}")
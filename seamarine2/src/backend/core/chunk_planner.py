@@ -0,0 +1,128 @@
+from utils.token_estimator import TokenEstimator, default_token_estimator
+from utils.translatable_xhtml import chunk_text_dict_by_tokens
+import json
+import logging
+import threading
+
+class ChunkPlanner:
+    """
+    Sizes JSON chunks so that their predicted answer fits the model's output limit.
+
+    Expected output is the estimated input text times a per-language expansion
+    ratio (source language into Korean), plus the JSON keys and punctuation that
+    are echoed back verbatim. The ratio starts from LANGUAGE_RATIOS and follows
+    the candidate token counts of real responses. Chunks are kept under
+    safety_margin of the output budget; every MAX_TOKENS truncation shrinks that
+    budget by shrink_factor, and each complete answer wins back recovery_factor.
+    """
+
+    # Output tokens per estimated input token when translating into Korean.
+    LANGUAGE_RATIOS: dict[str, float] = {
+        "Japanese": 0.85,
+        "Chinese": 1.2,
+        "English": 1.0,
+        "Korean": 1.0
+    }
+    DEFAULT_RATIO = 1.0
+    TARGET_LANGUAGE = "Korean"
+
+    def __init__(
+            self,
+            estimator: TokenEstimator | None = None,
+            safety_margin: float = 0.8,
+            shrink_factor: float = 0.7,
+            recovery_factor: float = 1.05,
+            min_scale: float = 0.05,
+            smoothing: float = 0.1
+            ):
+        self._logger = logging.getLogger("seamarine_translate")
+        self._estimator = estimator or default_token_estimator
+        self.safety_margin = safety_margin
+        self.shrink_factor = shrink_factor
+        self.recovery_factor = recovery_factor
+        self.min_scale = min_scale
+        self._smoothing = smoothing
+        self._ratios: dict[str, float] = {}
+        self._scale = 1.0
+        self._lock = threading.Lock()
+        self._checked_languages: set[str] = set()
+        self.truncations = 0
+
+    def get_ratio(self, language: str) -> float:
+        return self._ratios.get(language, self.LANGUAGE_RATIOS.get(language, self.DEFAULT_RATIO))
+
+    def check_language(self, language: str) -> bool:
+        """
+        Warns (once per language) when the source language cannot select a ratio: it is unknown, empty,
+        or the target language itself, which means it was read from a book whose metadata was already
+        rewritten. Returns whether the language has its own ratio.
+        """
+        known = language in self.LANGUAGE_RATIOS and language != self.TARGET_LANGUAGE
+        if not known and language not in self._checked_languages:
+            self._checked_languages.add(language)
+            if language == self.TARGET_LANGUAGE:
+                self._logger.warning(str(self) + f".check_language -> source language is the target language ({language}); the source language was probably read after the metadata rewrite")
+            else:
+                self._logger.warning(str(self) + f".check_language -> no output ratio for source language {language!r}, using {self.DEFAULT_RATIO}")
+        return known
+
+    def get_output_limit(self, output_budget: int) -> int:
+        return max(1, int(output_budget * self.safety_margin * self._scale))
+
+    def predict_output(self, text_dict: dict, language: str) -> int:
+        ratio = self.get_ratio(language)
+        return sum(
+            self._estimator.estimate(str(k)) + TokenEstimator.JSON_ENTRY_OVERHEAD + ratio * self._estimator.estimate(v)
+            for k, v in text_dict.items()
+        ) + 2
+
+    def plan(self, text_dict: dict, max_input_tokens: int, output_budget: int, language: str) -> list[dict]:
+        """
+        Chunks text_dict within max_input_tokens of input and the current output limit.
+        """
+        self.check_language(language)
+        return chunk_text_dict_by_tokens(
+            text_dict,
+            max_input_tokens,
+            self.get_output_limit(output_budget),
+            self.get_ratio(language),
+            self._estimator
+        )
+
+    def split(self, chunk: dict, output_budget: int, language: str) -> list[dict]:
+        """
+        Re-plans an already planned chunk if the output limit shrank since; otherwise returns it as is.
+        """
+        if len(chunk) < 2 or self.predict_output(chunk, language) <= self.get_output_limit(output_budget):
+            return [chunk]
+        return self.plan(chunk, 1 << 30, output_budget, language)
+
+    def observe(self, contents: str, output_tokens: int, truncated: bool, language: str):
+        """
+        Learns from one response to a JSON chunk: its candidate token count and whether it hit MAX_TOKENS.
+        """
+        try:
+            sent = json.loads(contents)
+        except ValueError:
+            return
+        if not isinstance(sent, dict) or not sent:
+            return
+        text_tokens = sum(self._estimator.estimate(v) for v in sent.values() if isinstance(v, str))
+        fixed_tokens = sum(self._estimator.estimate(str(k)) + TokenEstimator.JSON_ENTRY_OVERHEAD for k in sent) + 2
+        observed = (output_tokens - fixed_tokens) / text_tokens if text_tokens and output_tokens > fixed_tokens else None
+        with self._lock:
+            ratio = self.get_ratio(language)
+            if truncated:
+                self.truncations += 1
+                self._scale = max(self.min_scale, self._scale * self.shrink_factor)
+                if observed:
+                    # A cut-off answer only tells us the ratio is at least this high.
+                    self._ratios[language] = max(ratio, observed)
+                self._logger.info(str(self) + f".observe -> MAX_TOKENS after {output_tokens} tokens, output limit scaled to {self._scale:.2f}")
+            else:
+                self._scale = min(1.0, self._scale * self.recovery_factor)
+                if observed:
+                    self._ratios[language] = ratio + self._smoothing * (observed - ratio)
+
+    def get_stats(self) -> dict:
+        return {"scale": self._scale, "truncations": self.truncations, "ratios": dict(self._ratios)}
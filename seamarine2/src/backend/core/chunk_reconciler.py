@@ -0,0 +1,157 @@
+from .translate_core import TranslateCore
+import asyncio
+import json
+import logging
+from typing import Callable
+
+class ChunkReconciler:
+    """
+    Reconciles a JSON chunk response (id -> text) against the chunk that was sent.
+
+    Every id that came back with a valid value is kept; ids that are missing, empty
+    (while their source is not) or not strings are re-batched into small follow-up
+    requests, and ids the model invented are dropped. Only the unresolved lines are
+    ever resubmitted, never the whole chunk.
+
+    With stream=True responses are streamed: lines are accepted (and reported to
+    on_resolved) as they arrive, and a response cut off at MAX_TOKENS is split in
+    half right away instead of being retried at the same size.
+
+    hints ({id: (similar source, its translation)}, e.g. fuzzy translation memory
+    matches) are sent along with every request that contains one of those ids.
+
+    resolved and attempts carry over the state of an earlier, interrupted run of the
+    same chunk: those lines count as resolved from the start and are never sent again.
+    """
+
+    def __init__(
+            self,
+            core: TranslateCore,
+            chunk: dict[str, str],
+            name: str = "",
+            mini_batch_size: int = 20,
+            max_attempts: int = 3,
+            stream: bool = False,
+            on_resolved: Callable[[list[str]], None] | None = None,
+            max_split_depth: int = 4,
+            hints: dict[str, tuple[str, str]] | None = None,
+            resolved: dict[str, str] | None = None,
+            attempts: dict[str, int] | None = None
+            ):
+        self._logger = logging.getLogger("seamarine_translate")
+        self._core = core
+        self._chunk = chunk
+        self._name = name
+        self._mini_batch_size = max(1, mini_batch_size)
+        self._max_attempts = max(1, max_attempts)
+        self._stream = stream
+        self._on_resolved = on_resolved
+        self._max_split_depth = max_split_depth
+        self._hints = hints or {}
+        self.results: dict[str, str] = {k: v for k, v in (resolved or {}).items() if k in chunk}
+        self.attempts: dict[str, int] = dict(attempts or {})
+        self.requests = 0
+        self.resubmitted_lines = 0
+        self.extra_ids = 0
+
+    @property
+    def pending(self) -> dict[str, str]:
+        return {k: v for k, v in self._chunk.items() if k not in self.results}
+
+    @property
+    def done(self) -> bool:
+        return len(self.results) == len(self._chunk)
+
+    def reconcile(self, sent: dict[str, str], response: dict) -> dict[str, str]:
+        """
+        Accepts the valid entries of response for the ids in sent and returns the ids still unresolved.
+        """
+        extra = [k for k in response if k not in sent]
+        if extra:
+            self.extra_ids += len(extra)
+            self._logger.info(str(self) + f".reconcile -> {self._name} dropped {len(extra)} unknown ids")
+        resolved = []
+        for key, source in sent.items():
+            value = response.get(key)
+            if key in self.results or not isinstance(value, str):
+                continue
+            if not value.strip() and source.strip():
+                continue
+            self.results[key] = value
+            resolved.append(key)
+        if resolved and self._on_resolved:
+            self._on_resolved(resolved)
+        return {k: v for k, v in sent.items() if k not in self.results}
+
+    async def resolve(self, resp_in_json: bool = True) -> dict[str, str]:
+        """
+        Sends the chunk, then resubmits the unresolved ids in mini-batches until everything is resolved
+        or max_attempts rounds were spent. Returns every line that was resolved, even on partial failure.
+        """
+        for attempt in range(self._max_attempts):
+            pending = self.pending
+            if not pending or (attempt > 0 and self._core.is_circuit_open()):
+                break
+            if attempt == 0:
+                batches = self._core.split_chunk(pending) if resp_in_json else [pending]
+            else:
+                keys = list(pending.keys())
+                batches = [{k: pending[k] for k in keys[i:i + self._mini_batch_size]} for i in range(0, len(keys), self._mini_batch_size)]
+                self.resubmitted_lines += len(keys)
+                self._logger.info(str(self) + f".resolve -> {self._name} resubmitting {len(keys)} lines in {len(batches)} mini-batches (Try {attempt+1})")
+            await asyncio.gather(*(self._request(batch, resp_in_json, attempt == 0) for batch in batches))
+        if not self.done:
+            self._logger.warning(str(self) + f".resolve -> {self._name} left {len(self.pending)} of {len(self._chunk)} lines unresolved")
+        return dict(self.results)
+
+    def _batch_hints(self, batch: dict[str, str]) -> dict[str, str] | None:
+        hints = dict(self._hints[k] for k in batch if k in self._hints)
+        return hints or None
+
+    async def _request(self, batch: dict[str, str], resp_in_json: bool, use_cache: bool, depth: int = 0):
+        contents = json.dumps(batch, ensure_ascii=False, indent=2)
+        resp = ""
+        self.requests += 1
+        for key in batch:
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+        try:
+            if self._stream and resp_in_json:
+                await self._request_stream(batch, contents, use_cache, depth)
+                return
+            resp = await self._core.agenerate_content(
+                contents,
+                resp_in_json=resp_in_json,
+                use_cache=use_cache,
+                response_keys=list(batch.keys()),
+                hints=self._batch_hints(batch)
+            )
+            missing = self.reconcile(batch, self._core.parse_json_response(resp))
+            if missing and (resp or not self._core.is_circuit_open()):
+                self._logger.info(f"Missing {len(missing)} Lines In Response Of {self._name}\n")
+                self._logger.info(f"##### ORIGINAL #####\n\n{str(contents)}\n\n##### RESPONSE #####\n\n{str(resp)}\n")
+        except Exception as e:
+            if resp:
+                self._logger.info(f"##### ORIGINAL #####\n\n{str(contents)}\n\n##### RESPONSE #####\n\n{str(resp)}\n")
+            self._logger.exception(str(e))
+
+    async def _request_stream(self, batch: dict[str, str], contents: str, use_cache: bool, depth: int):
+        pairs, truncated = await self._core.agenerate_content_stream(
+            contents,
+            response_keys=list(batch.keys()),
+            on_pairs=lambda new_pairs: self.reconcile(batch, new_pairs),
+            use_cache=use_cache,
+            hints=self._batch_hints(batch)
+        )
+        missing = self.reconcile(batch, pairs)
+        if not missing:
+            return
+        if truncated and len(missing) > 1 and depth < self._max_split_depth:
+            keys = list(missing.keys())
+            mid = len(keys) // 2
+            self._logger.info(str(self) + f"._request_stream -> {self._name} hit MAX_TOKENS, splitting {len(keys)} remaining lines")
+            await asyncio.gather(
+                self._request({k: missing[k] for k in keys[:mid]}, True, True, depth + 1),
+                self._request({k: missing[k] for k in keys[mid:]}, True, True, depth + 1)
+            )
+            return
+        self._logger.info(f"Missing {len(missing)} Lines In Streamed Response Of {self._name}\n")
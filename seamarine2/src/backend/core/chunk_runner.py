@@ -0,0 +1,168 @@
+from .translate_core import TranslateCore
+import logging
+import asyncio
+import queue
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Iterator
+
+class ChunkRunner:
+    """
+    Runs a coroutine function over a list of chunks on the TranslateCore event loop.
+
+    Results are handed back to the calling (Q)thread in completion order, so a
+    worker can consume them exactly like concurrent.futures.as_completed, while
+    the requests themselves stay in flight as coroutines instead of OS threads.
+
+    With hedging enabled on the core, a chunk that runs longer than the configured
+    percentile of the chunk latencies seen so far gets a duplicate; the first valid
+    result wins and the other one is cancelled. Duplicates are capped at a
+    percentage of the chunks started.
+
+    While the core's circuit breaker is open no new chunk is started, and a chunk
+    that failed because of the outage is put back in the queue instead of being
+    reported as a failure. Given resume(args, result), the requeued entry runs with
+    the arguments it returns, so work the failed attempt finished is carried over
+    instead of being done again.
+
+    Given a cost function, chunks are started longest-predicted-first (LPT), so a
+    big chunk does not end up as the straggler that decides the wall time;
+    requeued chunks go back into the same priority queue. Without one, chunks
+    start in list order.
+    """
+
+    HEDGE_MIN_SAMPLES = 8
+    MAX_REQUEUES = 20
+
+    def __init__(self, core: TranslateCore, max_in_flight: int):
+        self._logger = logging.getLogger("seamarine_translate")
+        self._core = core
+        # TranslateCore gates the real in-flight window (which may grow adaptively),
+        # so keep enough chunks scheduled to fill its maximum.
+        self._max_in_flight = max(1, int(max_in_flight), core.get_max_concurrency())
+        self._hedge_percentile, self._hedge_budget = core.get_hedging_policy()
+        self._latencies: deque[float] = deque(maxlen=256)
+        self._started = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def run(
+            self,
+            func: Callable[..., Awaitable[Any]],
+            args_list: list[tuple],
+            is_valid: Callable[[Any], bool] | None = None,
+            cost: Callable[[tuple], float] | None = None,
+            resume: Callable[[tuple, Any], tuple] | None = None
+            ) -> Iterator[Any]:
+        """
+        Schedules func(*args) for every entry of args_list and yields each result as soon as it completes.
+        An exception raised by func is re-raised in the calling thread and cancels the remaining work.
+        is_valid decides whether a (hedged) result may win; by default every result does.
+        cost(args) predicts the run time of an entry; the most expensive entries start first.
+        resume(args, result) builds the arguments for an entry requeued during an outage from its partial result.
+        """
+        if not args_list:
+            return
+        results: queue.Queue = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(
+            self._drive(func, args_list, results, is_valid or (lambda result: True), cost, resume),
+            self._core.get_event_loop()
+        )
+        try:
+            for _ in range(len(args_list)):
+                is_ok, value = results.get()
+                if not is_ok:
+                    raise value
+                yield value
+        finally:
+            future.cancel()
+
+    async def _drive(
+            self,
+            func: Callable[..., Awaitable[Any]],
+            args_list: list[tuple],
+            results: queue.Queue,
+            is_valid: Callable[[Any], bool],
+            cost: Callable[[tuple], float] | None,
+            resume: Callable[[tuple, Any], tuple] | None
+            ):
+        # Entries are (-cost, list index, requeues, args); the index keeps equal costs in list order.
+        pending: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        costs = [cost(args) if cost else 0.0 for args in args_list]
+        for index, args in enumerate(args_list):
+            pending.put_nowait((-costs[index], index, 0, args))
+        if cost:
+            self._logger.info(str(self) + f"._drive -> {len(args_list)} chunks largest first, predicted {sum(costs):.0f}s total, {max(costs):.0f}s longest")
+
+        async def consume():
+            while True:
+                try:
+                    priority, index, requeues, args = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await self._core.await_circuit_ready()
+                    result = await self._run_hedged(func, args, is_valid)
+                    if self._core.is_circuit_open() and requeues < self.MAX_REQUEUES and not is_valid(result):
+                        self._logger.info(str(self) + "._drive -> circuit open, chunk requeued")
+                        pending.put_nowait((priority, index, requeues + 1, resume(args, result) if resume else args))
+                        continue
+                    results.put((True, result))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._logger.exception(str(self) + "._drive")
+                    results.put((False, e))
+                    return
+
+        consumers = [asyncio.create_task(consume()) for _ in range(min(self._max_in_flight, len(args_list)))]
+        try:
+            await asyncio.gather(*consumers)
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+
+    def _hedge_threshold(self) -> float | None:
+        if self._hedge_percentile <= 0 or len(self._latencies) < self.HEDGE_MIN_SAMPLES:
+            return None
+        if self.hedges >= self._started * self._hedge_budget / 100:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self._hedge_percentile / 100))]
+
+    async def _run_hedged(self, func: Callable[..., Awaitable[Any]], args: tuple, is_valid: Callable[[Any], bool]) -> Any:
+        self._started += 1
+        started_at = time.monotonic()
+        primary = asyncio.ensure_future(func(*args))
+        threshold = self._hedge_threshold()
+        if threshold is not None:
+            try:
+                await asyncio.wait({primary}, timeout=threshold)
+            except asyncio.CancelledError:
+                primary.cancel()
+                raise
+        if primary.done() or threshold is None or self._hedge_threshold() is None:
+            try:
+                return await primary
+            finally:
+                self._latencies.append(time.monotonic() - started_at)
+
+        self.hedges += 1
+        self._logger.info(str(self) + f"._run_hedged -> hedging after {threshold:.1f} seconds ({self.hedges}/{self._started})")
+        hedge = asyncio.ensure_future(func(*args))
+        pending = {primary, hedge}
+        fallback = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and is_valid(task.result()):
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    fallback = fallback or task
+            return fallback.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            self._latencies.append(time.monotonic() - started_at)
@@ -0,0 +1,101 @@
+from google.genai import errors
+import asyncio
+import logging
+import time
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the API while the circuit is open.
+    """
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Circuit open, retry in {retry_in:.0f} seconds")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker around the Gemini client.
+
+    After failure_threshold consecutive outage-like failures (server errors and
+    network errors; 429s and bad requests are handled elsewhere) the circuit opens
+    and every call fails fast with CircuitOpenError. Once reset_timeout has passed,
+    a single probe request is let through (half-open): success closes the circuit,
+    failure re-opens it with a doubled timeout, up to max_reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, max_reset_timeout: float = 600.0):
+        self._logger = logging.getLogger("seamarine_translate")
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self._reset_timeout = reset_timeout
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CIRCUIT_CLOSED
+
+    @staticmethod
+    def is_outage_error(e: BaseException) -> bool:
+        if isinstance(e, errors.ServerError):
+            return True
+        if isinstance(e, (errors.APIError, CircuitOpenError)) or not isinstance(e, Exception):
+            return False
+        return isinstance(e, (OSError, TimeoutError)) or type(e).__module__.split('.')[0] in ("httpx", "httpcore", "aiohttp")
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError unless a call may go out now.
+        """
+        if self.state == CIRCUIT_CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == CIRCUIT_OPEN and now >= self._open_until:
+            self.state = CIRCUIT_HALF_OPEN
+            self._logger.info(str(self) + ".before_call -> half-open, sending probe")
+        if self.state == CIRCUIT_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        raise CircuitOpenError(max(0.0, self._open_until - now))
+
+    def record_success(self):
+        self._consecutive_failures = 0
+        if self.state != CIRCUIT_CLOSED:
+            self._logger.info(str(self) + ".record_success -> closed")
+        self.state = CIRCUIT_CLOSED
+        self._reset_timeout = self.base_reset_timeout
+        self._probe_in_flight = False
+
+    def record_failure(self, e: BaseException):
+        if not self.is_outage_error(e):
+            self._probe_in_flight = False
+            return
+        self._consecutive_failures += 1
+        if self.state == CIRCUIT_HALF_OPEN:
+            self._reset_timeout = min(self.max_reset_timeout, self._reset_timeout * 2)
+            self._open(f"probe failed: {e}")
+        elif self.state == CIRCUIT_CLOSED and self._consecutive_failures >= self.failure_threshold:
+            self._open(f"{self._consecutive_failures} consecutive failures: {e}")
+
+    def _open(self, reason: str):
+        self.state = CIRCUIT_OPEN
+        self._probe_in_flight = False
+        self._open_until = time.monotonic() + self._reset_timeout
+        self._logger.warning(str(self) + f"._open -> open for {self._reset_timeout:.0f} seconds ({reason})")
+
+    async def wait_until_ready(self, poll_interval: float = 1.0):
+        """
+        Waits while the circuit is open or a probe is deciding its fate. Returns at once when closed.
+        """
+        while self.state != CIRCUIT_CLOSED:
+            if self.state == CIRCUIT_OPEN and time.monotonic() >= self._open_until:
+                return
+            await asyncio.sleep(poll_interval)
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import time
+
+class AimdConcurrencyController:
+    """
+    Additive-increase / multiplicative-decrease window for in-flight Gemini requests.
+
+    Every success grows the window by increase / window (about +1 per full window of
+    successes), every 429 multiplies it by decrease. Throttle signals coming from
+    requests that were started before the last decrease are ignored, so one burst of
+    429s only halves the window once.
+    """
+
+    def __init__(self, initial: int = 1, minimum: int = 1, maximum: int = 1,
+                 increase: float = 1.0, decrease: float = 0.5, adaptive: bool = True):
+        self._logger = logging.getLogger("seamarine_translate")
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.adaptive = adaptive
+        self._window = float(min(max(initial, self.minimum), self.maximum))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition: asyncio.Condition | None = None
+
+    @property
+    def window(self) -> int:
+        return int(self._window)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> float:
+        """
+        Waits for a free slot in the window and returns a ticket (the start time) for on_throttle().
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.window)
+            self._in_flight += 1
+        return time.monotonic()
+
+    async def release(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        if not self.adaptive or self._window >= self.maximum:
+            return
+        old_window = self.window
+        self._window = min(self.maximum, self._window + self.increase / self._window)
+        if self.window != old_window:
+            self._logger.info(str(self) + f".on_success -> window {old_window} => {self.window}")
+            self._notify()
+
+    def on_throttle(self, ticket: float):
+        if not self.adaptive or ticket < self._last_decrease:
+            return
+        old_window = self.window
+        self._window = max(float(self.minimum), self._window * self.decrease)
+        self._last_decrease = time.monotonic()
+        self._logger.info(str(self) + f".on_throttle -> window {old_window} => {self.window}")
+
+    def _notify(self):
+        if self._condition is None:
+            return
+        async def notify():
+            async with self._condition:
+                self._condition.notify_all()
+        asyncio.get_running_loop().create_task(notify())
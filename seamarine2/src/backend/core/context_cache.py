@@ -0,0 +1,98 @@
+from google.genai import errors, types
+import asyncio
+import hashlib
+import logging
+import time
+
+class _CacheEntry:
+    def __init__(self, name: str, expires_at: float, client):
+        self.name = name
+        self.client = client
+        self.expires_at = expires_at
+
+
+class ContextCacheManager:
+    """
+    Creates and reuses Gemini cached-content handles for a static system instruction.
+
+    One handle is kept per (API key, model, system instruction). Handles close to expiry get
+    their TTL extended instead of being re-created. If the API refuses to cache an
+    instruction (e.g. it is below the model's minimum cacheable token count), the
+    refusal is remembered and callers fall back to sending the instruction inline.
+    Transient failures (429, 5xx, network errors) only skip caching for that call.
+    """
+
+    def __init__(self, ttl_seconds: int = 3600, refresh_margin: int = 300):
+        self._logger = logging.getLogger("seamarine_translate")
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self._entries: dict[str, _CacheEntry] = {}
+        self._unsupported: set[str] = set()
+        self._lock: asyncio.Lock | None = None
+
+    @staticmethod
+    def is_permanent_refusal(e: BaseException) -> bool:
+        # 4xx answers (INVALID_ARGUMENT below the minimum token count, unsupported model, no permission)
+        # will not change on retry; 408/429 and server or network errors will.
+        return isinstance(e, errors.ClientError) and e.code not in (408, 429)
+
+    @staticmethod
+    def _make_key(model: str, system_instruction: str, scope: str) -> str:
+        return hashlib.sha256(f"{scope}\n{model}\n{system_instruction}".encode('utf-8')).hexdigest()
+
+    async def get_cache_name(self, client, model: str, system_instruction: str, scope: str = "") -> str | None:
+        key = self._make_key(model, system_instruction, scope)
+        if key in self._unsupported:
+            return None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry and entry.expires_at - now > self.refresh_margin:
+                return entry.name
+            if entry:
+                try:
+                    await client.aio.caches.update(
+                        name=entry.name,
+                        config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s")
+                    )
+                    entry.expires_at = now + self.ttl_seconds
+                    self._logger.info(str(self) + f".get_cache_name -> extended {entry.name}")
+                    return entry.name
+                except Exception as e:
+                    self._logger.warning(str(self) + f".get_cache_name -> failed to extend {entry.name}: {e}")
+                    self._entries.pop(key, None)
+            try:
+                cached = await client.aio.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system_instruction,
+                        ttl=f"{self.ttl_seconds}s",
+                        display_name="seamarine_system_instruction"
+                    )
+                )
+                self._entries[key] = _CacheEntry(cached.name, now + self.ttl_seconds, client)
+                self._logger.info(str(self) + f".get_cache_name -> created {cached.name}")
+                return cached.name
+            except Exception as e:
+                if not self.is_permanent_refusal(e):
+                    self._logger.warning(str(self) + f".get_cache_name -> caching failed, sending inline this time: {e}")
+                    return None
+                self._unsupported.add(key)
+                self._logger.warning(str(self) + f".get_cache_name -> caching unavailable, sending inline: {e}")
+                return None
+
+    def invalidate(self, name: str):
+        for key, entry in list(self._entries.items()):
+            if entry.name == name:
+                del self._entries[key]
+
+    async def release_all(self):
+        for key, entry in list(self._entries.items()):
+            try:
+                await entry.client.aio.caches.delete(name=entry.name)
+                self._logger.info(str(self) + f".release_all -> deleted {entry.name}")
+            except Exception as e:
+                self._logger.warning(str(self) + f".release_all -> failed to delete {entry.name}: {e}")
+            self._entries.pop(key, None)
@@ -0,0 +1,301 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from urllib.parse import urlparse, parse_qs
+
+class FakeGeminiBehavior:
+    """
+    Knobs of the fake Gemini server. Every rate is a probability per request.
+
+    latency: "fixed" (latency_mean), "uniform" (latency_min - latency_max) or
+             "lognormal" (median latency_mean, spread latency_sigma), in seconds.
+    transform: "echo" returns JSON values unchanged, "tag" prefixes them with "[T] ".
+    block_marker: any request containing it is always blocked (for bisection tests).
+    Answers longer than generationConfig.maxOutputTokens (two characters per token)
+    are cut off with MAX_TOKENS, like the real API.
+
+    Decisions are drawn from a generator seeded with (seed, request text, how often
+    that text was seen), so a run is reproducible regardless of request ordering.
+    """
+
+    def __init__(
+            self,
+            latency: str = "fixed",
+            latency_mean: float = 0.0,
+            latency_sigma: float = 0.5,
+            latency_min: float = 0.0,
+            latency_max: float = 0.0,
+            rate_429: float = 0.0,
+            retry_delay: int = 1,
+            rate_500: float = 0.0,
+            rate_block: float = 0.0,
+            block_marker: str = "",
+            rate_truncate: float = 0.0,
+            rate_missing_key: float = 0.0,
+            transform: str = "tag",
+            stream_pieces: int = 4,
+            seed: int = 0
+            ):
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_sigma = latency_sigma
+        self.latency_min = latency_min
+        self.latency_max = latency_max
+        self.rate_429 = rate_429
+        self.retry_delay = retry_delay
+        self.rate_500 = rate_500
+        self.rate_block = rate_block
+        self.block_marker = block_marker
+        self.rate_truncate = rate_truncate
+        self.rate_missing_key = rate_missing_key
+        self.transform = transform
+        self.stream_pieces = max(1, stream_pieces)
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FakeGeminiBehavior":
+        behavior = cls()
+        for key, value in data.items():
+            if hasattr(behavior, key):
+                setattr(behavior, key, value)
+        return behavior
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    def draw_latency(self, rng: random.Random) -> float:
+        if self.latency == "uniform":
+            return rng.uniform(self.latency_min, self.latency_max)
+        if self.latency == "lognormal" and self.latency_mean > 0:
+            return rng.lognormvariate(0, self.latency_sigma) * self.latency_mean
+        return self.latency_mean
+
+
+class FakeGeminiServer:
+    """
+    Local stand-in for the Gemini REST API (v1beta) built on ThreadingHTTPServer.
+
+    Serves generateContent, streamGenerateContent (SSE), models.list and
+    cachedContents, which is everything TranslateCore uses. Point TranslateCore at it
+    with configure_base_url(server.url). GET /fake/stats returns the counters,
+    POST /fake/behavior replaces the behavior at runtime.
+    """
+
+    def __init__(self, behavior: FakeGeminiBehavior | None = None, host: str = "127.0.0.1", port: int = 0):
+        self._logger = logging.getLogger("seamarine_translate")
+        self.behavior = behavior or FakeGeminiBehavior()
+        self._lock = threading.Lock()
+        self._seen: dict[str, int] = {}
+        self.stats: dict[str, int] = {"requests": 0, "ok": 0, "429": 0, "500": 0, "blocked": 0, "truncated": 0, "missing_key": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake_gemini", daemon=True)
+        self._thread.start()
+        self._logger.info(str(self) + f".start -> listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _rng_for(self, text: str) -> random.Random:
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            seen = self._seen.get(digest, 0)
+            self._seen[digest] = seen + 1
+        return random.Random(f"{self.behavior.seed}:{digest}:{seen}")
+
+    def generate(self, model: str, body: dict) -> tuple[int, dict, float]:
+        """
+        Returns (status, response body, latency) for one generateContent request.
+        """
+        behavior = self.behavior
+        parts = [part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])]
+        text = "".join(parts)
+        self._count("requests")
+        rng = self._rng_for(text)
+        latency = behavior.draw_latency(rng)
+
+        if rng.random() < behavior.rate_429:
+            self._count("429")
+            return 429, {"error": {
+                "code": 429,
+                "message": "Resource has been exhausted (e.g. check quota).",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": f"{behavior.retry_delay}s"}]
+            }}, latency
+        if rng.random() < behavior.rate_500:
+            self._count("500")
+            return 500, {"error": {"code": 500, "message": "Internal error encountered.", "status": "INTERNAL"}}, latency
+        if (behavior.block_marker and behavior.block_marker in text) or rng.random() < behavior.rate_block:
+            self._count("blocked")
+            return 200, {"promptFeedback": {"blockReason": "PROHIBITED_CONTENT"}, "modelVersion": model}, latency
+
+        finish_reason = "STOP"
+        # Earlier parts (e.g. reference hints) are context; the last part is what gets translated.
+        output = self._transform(parts[-1] if parts else "", rng)
+        max_output_tokens = body.get("generationConfig", {}).get("maxOutputTokens") or 0
+        if rng.random() < behavior.rate_truncate and len(output) > 2:
+            self._count("truncated")
+            output = output[:rng.randint(1, len(output) - 1)]
+            finish_reason = "MAX_TOKENS"
+        elif max_output_tokens and len(output) // 2 + 1 > max_output_tokens:
+            self._count("truncated")
+            output = output[:max_output_tokens * 2]
+            finish_reason = "MAX_TOKENS"
+        self._count("ok")
+        return 200, {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": output}]}, "finishReason": finish_reason, "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": len(text) // 2 + 1,
+                "candidatesTokenCount": len(output) // 2 + 1,
+                "totalTokenCount": (len(text) + len(output)) // 2 + 2
+            },
+            "modelVersion": model
+        }, latency
+
+    def _transform(self, text: str, rng: random.Random) -> str:
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            return text if self.behavior.transform == "echo" else f"[T] {text}"
+        if not isinstance(payload, dict):
+            return text
+        if self.behavior.transform == "tag":
+            payload = {k: f"[T] {v}" if isinstance(v, str) else v for k, v in payload.items()}
+        if payload and rng.random() < self.behavior.rate_missing_key:
+            self._count("missing_key")
+            payload.pop(rng.choice(list(payload.keys())))
+        return json.dumps(payload, ensure_ascii=False)
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _read_json(self) -> dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+            def _send_json(self, status: int, body: dict):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_sse(self, body: dict):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for event in fake._split_stream(body):
+                    data = f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode('utf-8')
+                    self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == "/fake/stats":
+                    self._send_json(200, dict(fake.stats))
+                elif path.endswith("/models"):
+                    self._send_json(200, {"models": [
+                        {"name": f"models/{name}", "supportedGenerationMethods": ["generateContent", "countTokens"]}
+                        for name in ("gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.5-flash-lite", "gemini-2.0-flash")
+                    ]})
+                else:
+                    self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {path}", "status": "NOT_FOUND"}})
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                path = parsed.path
+                body = self._read_json()
+                if path == "/fake/behavior":
+                    fake.behavior = FakeGeminiBehavior.from_dict(body)
+                    self._send_json(200, fake.behavior.to_dict())
+                elif path.endswith("/cachedContents"):
+                    self._send_json(200, {
+                        "name": f"cachedContents/{uuid.uuid4().hex[:12]}",
+                        "model": body.get("model", ""),
+                        "displayName": body.get("displayName", "")
+                    })
+                elif ":generateContent" in path or ":streamGenerateContent" in path:
+                    model = path.rsplit("/", 1)[-1].split(":", 1)[0]
+                    status, response, latency = fake.generate(model, body)
+                    time.sleep(latency)
+                    if status == 200 and ":streamGenerateContent" in path and parse_qs(parsed.query).get("alt") == ["sse"]:
+                        self._send_sse(response)
+                    else:
+                        self._send_json(status, response)
+                elif ":countTokens" in path:
+                    text = json.dumps(body.get("contents", []), ensure_ascii=False)
+                    self._send_json(200, {"totalTokens": len(text) // 2 + 1})
+                else:
+                    self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {path}", "status": "NOT_FOUND"}})
+
+            def do_PATCH(self):
+                body = self._read_json()
+                body["name"] = urlparse(self.path).path.split("/v1beta/", 1)[-1]
+                self._send_json(200, body)
+
+            def do_DELETE(self):
+                self._send_json(200, {})
+
+        return Handler
+
+    def _split_stream(self, body: dict) -> list[dict]:
+        """
+        Splits a response into streamed events; only the last one carries finishReason and usage.
+        """
+        candidates = body.get("candidates")
+        if not candidates:
+            return [body]
+        text = candidates[0]["content"]["parts"][0]["text"]
+        pieces = self.behavior.stream_pieces
+        size = max(1, -(-len(text) // pieces))
+        chunks = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        events = []
+        for i, chunk in enumerate(chunks):
+            event = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}, "index": 0}], "modelVersion": body.get("modelVersion", "")}
+            if i == len(chunks) - 1:
+                event["candidates"][0]["finishReason"] = candidates[0]["finishReason"]
+                event["usageMetadata"] = body.get("usageMetadata", {})
+            events.append(event)
+        return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake Gemini API server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--behavior", default="", help="JSON object of FakeGeminiBehavior fields")
+    args = parser.parse_args()
+    fake = FakeGeminiServer(FakeGeminiBehavior.from_dict(json.loads(args.behavior or "{}")), port=args.port)
+    print(f"Fake Gemini listening on {fake.url}")
+    try:
+        fake._httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,155 @@
+from google import genai
+from google.genai import types
+from .rate_limiter import RateLimiter
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Callable
+
+class ApiKeySlot:
+    """
+    One API key with its own client, per-model rate limiters and 429 cooldown.
+    """
+
+    def __init__(self, key: str, client):
+        self.key = key
+        self.client = client
+        self.label = hashlib.sha256(key.encode('utf-8')).hexdigest()[:8]
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttles = 0
+        self.consecutive_throttles = 0
+        self._rate_limiters: dict[str, RateLimiter] = {}
+
+    def get_rate_limiter(self, model_name: str, rate_limits: dict[str, dict]) -> RateLimiter | None:
+        limiter = self._rate_limiters.get(model_name)
+        if limiter is None:
+            limits = rate_limits.get(model_name)
+            if not limits:
+                return None
+            limiter = RateLimiter(limits.get('rpm', 0), limits.get('tpm', 0))
+            self._rate_limiters[model_name] = limiter
+        return limiter
+
+    def reset_rate_limiters(self):
+        self._rate_limiters = {}
+
+    def remaining(self, model_name: str, rate_limits: dict[str, dict]) -> float:
+        limiter = self.get_rate_limiter(model_name, rate_limits)
+        return limiter.remaining() if limiter else 1.0
+
+
+class ApiKeyPool:
+    """
+    Dispatches requests over several API keys (each with its own project quota).
+
+    Every request goes to the key that is not cooling down after a 429 and has the
+    most remaining RPM/TPM budget for the model, ties broken by fewer requests in
+    flight, so one book's throughput scales with the number of keys.
+    """
+
+    def __init__(self, default_cooldown: float = 10.0):
+        self._logger = logging.getLogger("seamarine_translate")
+        self.default_cooldown = default_cooldown
+        self._slots: list[ApiKeySlot] = []
+        self._rate_limits: dict[str, dict] = {}
+        self.base_url = ""
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def primary(self) -> ApiKeySlot | None:
+        return self._slots[0] if self._slots else None
+
+    def set_keys(self, keys: list[str]):
+        """
+        Replaces the pool with keys (first one is the primary key). Slots of keys that stay keep their state.
+        """
+        existing = {slot.key: slot for slot in self._slots}
+        slots = []
+        for key in keys:
+            if not key or any(slot.key == key for slot in slots):
+                continue
+            slots.append(existing.get(key) or ApiKeySlot(key, self._make_client(key)))
+        self._slots = slots
+        self._logger.info(str(self) + f".set_keys -> {[slot.label for slot in slots]}")
+
+    def set_base_url(self, base_url: str):
+        """
+        Points every client at base_url (e.g. a local fake server); an empty string restores the public endpoint.
+        """
+        self.base_url = base_url
+        for slot in self._slots:
+            slot.client = self._make_client(slot.key)
+
+    def _make_client(self, key: str):
+        if self.base_url:
+            return genai.Client(api_key=key, http_options=types.HttpOptions(base_url=self.base_url))
+        return genai.Client(api_key=key)
+
+    def update_rate_limits(self, rate_limits: dict[str, dict]):
+        self._rate_limits = dict(rate_limits)
+        for slot in self._slots:
+            slot.reset_rate_limiters()
+
+    def available_count(self) -> int:
+        now = time.monotonic()
+        return sum(1 for slot in self._slots if slot.cooldown_until <= now)
+
+    async def acquire(self, model_name: str, tokens: int) -> ApiKeySlot:
+        if not self._slots:
+            raise RuntimeError("No Gemini API key registered")
+        while True:
+            now = time.monotonic()
+            available = [slot for slot in self._slots if slot.cooldown_until <= now]
+            if available:
+                break
+            await asyncio.sleep(min(slot.cooldown_until for slot in self._slots) - now)
+        slot = max(available, key=lambda s: (s.remaining(model_name, self._rate_limits), -s.in_flight))
+        slot.in_flight += 1
+        slot.requests += 1
+        try:
+            limiter = slot.get_rate_limiter(model_name, self._rate_limits)
+            if limiter:
+                await limiter.acquire(tokens)
+        except BaseException:
+            slot.in_flight -= 1
+            raise
+        return slot
+
+    def release(self, slot: ApiKeySlot):
+        slot.in_flight -= 1
+
+    def on_success(self, slot: ApiKeySlot):
+        slot.consecutive_throttles = 0
+
+    def on_throttle(self, slot: ApiKeySlot, retry_after: float = 0, backoff: Callable[[int], float] | None = None):
+        """
+        Benches slot after a 429: for the server's RetryInfo delay if it sent one, otherwise for
+        backoff(consecutive 429s of this key), which starts short and grows while the key keeps
+        being throttled (default_cooldown without a backoff).
+        """
+        slot.throttles += 1
+        if retry_after > 0:
+            cooldown = retry_after
+        elif backoff:
+            cooldown = backoff(slot.consecutive_throttles)
+        else:
+            cooldown = self.default_cooldown
+        slot.consecutive_throttles += 1
+        slot.cooldown_until = max(slot.cooldown_until, time.monotonic() + cooldown)
+        self._logger.info(str(self) + f".on_throttle -> key {slot.label} cooling down for {cooldown:.1f} seconds")
+
+    def settle(self, slot: ApiKeySlot, model_name: str, estimated_tokens: int, actual_tokens: int | None):
+        limiter = slot.get_rate_limiter(model_name, self._rate_limits)
+        if limiter:
+            limiter.settle(estimated_tokens, actual_tokens)
+
+    def get_stats(self) -> list[dict]:
+        return [
+            {"key": slot.label, "requests": slot.requests, "throttles": slot.throttles, "in_flight": slot.in_flight}
+            for slot in self._slots
+        ]
@@ -0,0 +1,177 @@
+from collections import deque
+import logging
+import time
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+OUTCOME_THROTTLED = "throttled"
+OUTCOME_BLOCKED = "blocked"
+OUTCOME_EMPTY = "empty"
+
+class ModelHealth:
+    """
+    Rolling window of the last outcomes of one model, plus a moving average of
+    its seconds per token (prompt + answer) for predicting request latency.
+    """
+
+    def __init__(self, window: int = 20):
+        self._outcomes: deque[tuple[str, float]] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.tripped_until = 0.0
+        self.trips = 0
+        self.seconds_per_token: float | None = None
+
+    def record(self, outcome: str, latency: float, tokens: int = 0):
+        self._outcomes.append((outcome, latency))
+        if outcome == OUTCOME_OK:
+            self.consecutive_failures = 0
+        elif outcome != OUTCOME_BLOCKED:
+            # A safety block is caused by the payload, not the model, so it never trips the breaker in a row.
+            self.consecutive_failures += 1
+        if outcome == OUTCOME_OK and tokens > 0 and latency > 0:
+            rate = latency / tokens
+            self.seconds_per_token = rate if self.seconds_per_token is None else self.seconds_per_token + 0.2 * (rate - self.seconds_per_token)
+
+    def reset_window(self):
+        self._outcomes.clear()
+        self.consecutive_failures = 0
+
+    @property
+    def samples(self) -> int:
+        return len(self._outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for outcome, _ in self._outcomes if outcome in (OUTCOME_ERROR, OUTCOME_BLOCKED, OUTCOME_EMPTY)) / len(self._outcomes)
+
+    @property
+    def throttle_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for outcome, _ in self._outcomes if outcome == OUTCOME_THROTTLED) / len(self._outcomes)
+
+    @property
+    def p95_latency(self) -> float:
+        latencies = sorted(latency for outcome, latency in self._outcomes if outcome == OUTCOME_OK)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def to_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "error_rate": round(self.error_rate, 3),
+            "throttle_rate": round(self.throttle_rate, 3),
+            "p95_latency": round(self.p95_latency, 2),
+            "seconds_per_token": round(self.seconds_per_token, 5) if self.seconds_per_token is not None else None,
+            "tripped": self.tripped_until > time.monotonic(),
+            "trips": self.trips
+        }
+
+
+class ModelHealthTracker:
+    """
+    Picks the model to use from an ordered fallback chain based on rolling health.
+
+    A model is taken out of rotation when, over its recent window, the error rate
+    (errors, blocked and empty results), the 429 rate or the p95 latency crosses its
+    threshold, or after max_consecutive_failures failures in a row. It stays out for
+    a cooldown that doubles on every repeated trip; afterwards its window is cleared
+    and it is tried again first, which gives automatic fail-back.
+    """
+
+    # Seconds per token assumed for a model without samples yet (about 100 tokens/s).
+    DEFAULT_SECONDS_PER_TOKEN = 0.01
+
+    def __init__(
+            self,
+            window: int = 20,
+            min_samples: int = 5,
+            max_error_rate: float = 0.5,
+            max_throttle_rate: float = 0.5,
+            max_p95_latency: float = 180.0,
+            max_consecutive_failures: int = 3,
+            cooldown: float = 60.0,
+            max_cooldown: float = 900.0
+            ):
+        self._logger = logging.getLogger("seamarine_translate")
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.max_throttle_rate = max_throttle_rate
+        self.max_p95_latency = max_p95_latency
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._health: dict[str, ModelHealth] = {}
+        self._current: dict[tuple[str, ...], str] = {}
+
+    def _get(self, model_name: str) -> ModelHealth:
+        health = self._health.get(model_name)
+        if health is None:
+            health = ModelHealth(self.window)
+            self._health[model_name] = health
+        return health
+
+    def is_available(self, model_name: str) -> bool:
+        health = self._get(model_name)
+        if health.tripped_until == 0.0:
+            return True
+        if health.tripped_until > time.monotonic():
+            return False
+        # Cooldown is over: give the model a clean window and let it serve again.
+        health.tripped_until = 0.0
+        health.reset_window()
+        return True
+
+    def select(self, chain: list[str]) -> str:
+        """
+        Returns the first available model of chain, or the one that comes back soonest if none is.
+        """
+        chain = [model for i, model in enumerate(chain) if model and model not in chain[:i]]
+        selected = next((model for model in chain if self.is_available(model)), None)
+        if selected is None:
+            selected = min(chain, key=lambda model: self._get(model).tripped_until)
+        key = tuple(chain)
+        previous = self._current.get(key)
+        if previous and previous != selected:
+            direction = "failing back" if chain.index(selected) < chain.index(previous) else "failing over"
+            self._logger.warning(str(self) + f".select -> {direction} from {previous} to {selected}")
+        self._current[key] = selected
+        return selected
+
+    def record(self, model_name: str, outcome: str, latency: float = 0.0, tokens: int = 0):
+        health = self._get(model_name)
+        health.record(outcome, latency, tokens)
+        if health.tripped_until > time.monotonic():
+            return
+        reason = self._unhealthy_reason(health)
+        if reason:
+            health.trips += 1
+            cooldown = min(self.max_cooldown, self.cooldown * (2 ** (health.trips - 1)))
+            health.tripped_until = time.monotonic() + cooldown
+            self._logger.warning(str(self) + f".record -> {model_name} unhealthy ({reason}), out of rotation for {cooldown:.0f} seconds")
+        elif outcome == OUTCOME_OK and health.samples >= self.window:
+            health.trips = 0
+
+    def _unhealthy_reason(self, health: ModelHealth) -> str:
+        if health.consecutive_failures >= self.max_consecutive_failures:
+            return f"{health.consecutive_failures} failures in a row"
+        if health.samples < self.min_samples:
+            return ""
+        if health.error_rate >= self.max_error_rate:
+            return f"error rate {health.error_rate:.2f}"
+        if health.throttle_rate >= self.max_throttle_rate:
+            return f"429 rate {health.throttle_rate:.2f}"
+        if health.p95_latency >= self.max_p95_latency:
+            return f"p95 latency {health.p95_latency:.1f}s"
+        return ""
+
+    def get_seconds_per_token(self, model_name: str) -> float:
+        seconds_per_token = self._get(model_name).seconds_per_token
+        return seconds_per_token if seconds_per_token is not None else self.DEFAULT_SECONDS_PER_TOKEN
+
+    def get_stats(self) -> dict[str, dict]:
+        return {model: health.to_dict() for model, health in self._health.items()}
@@ -0,0 +1,180 @@
+from utils.foreign_detect import contains_foreign
+from utils.token_estimator import default_token_estimator
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+SCOPE_BODY = "body"
+SCOPE_TOC = "toc"
+
+STATUS_PENDING = "pending"
+STATUS_TRANSLATED = "translated"
+STATUS_FOREIGN = "foreign"
+
+def load_legacy_snapshot(snapshot_path: str) -> dict:
+    """
+    Reads the translations a worker kept before the project store: the JSON snapshot
+    (e.g. text_dict.json) plus, if present, the lines of its ".journal" replayed on top.
+    Reading stops at the first line torn by a crash.
+    """
+    data = {}
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    if os.path.exists(snapshot_path + ".journal"):
+        with open(snapshot_path + ".journal", "rb") as f:
+            for line in f:
+                try:
+                    entries = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    break
+                if not line.endswith(b"\n") or not isinstance(entries, dict):
+                    break
+                data.update(entries)
+    return data
+
+class ProjectStore:
+    """
+    Per-book project database (SQLite) holding every extracted segment and its translation.
+
+    One row per segment and scope (book body or table of contents) with its
+    chapter, source, translation, status, attempt count, model, estimated
+    output tokens and latency. Status is derived from the translation when it
+    is saved: "pending" until translated, "foreign" while the translation still
+    contains foreign script (the reviewer's work list), "translated" otherwise.
+    Indexes on status and chapter make resume, review selection and stats
+    indexed queries. Every write is one transaction, so a crash loses at most
+    the chunk being saved.
+    """
+
+    def __init__(self, path: str):
+        self._logger = logging.getLogger("seamarine_translate")
+        self._path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL keeps a per-chunk commit to one sequential append instead of rewriting pages in place.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "scope TEXT NOT NULL, id TEXT NOT NULL, position INTEGER NOT NULL, chapter TEXT NOT NULL, "
+                "source TEXT NOT NULL, translation TEXT, status TEXT NOT NULL DEFAULT 'pending', "
+                "attempts INTEGER NOT NULL DEFAULT 0, model TEXT, tokens INTEGER, latency REAL, updated REAL, "
+                "PRIMARY KEY (scope, id))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS segments_status ON segments (scope, status)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS segments_chapter ON segments (scope, chapter, position)")
+
+    @staticmethod
+    def _position(doc_id: str) -> int:
+        try:
+            return int(doc_id)
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _status(translation: str | None) -> str:
+        if translation is None:
+            return STATUS_PENDING
+        return STATUS_FOREIGN if contains_foreign(translation) else STATUS_TRANSLATED
+
+    def sync_sources(self, scope: str, text_dict: dict[str, str], chapters: dict[str, str] | None = None):
+        """
+        Inserts the extracted segments of scope; existing rows get the current source and chapter but keep their translation.
+        """
+        chapters = chapters or {}
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO segments (scope, id, position, chapter, source) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (scope, id) DO UPDATE SET source = excluded.source, chapter = excluded.chapter",
+                [(scope, doc_id, self._position(doc_id), chapters.get(doc_id, ""), source) for doc_id, source in text_dict.items()]
+            )
+        self._logger.info(str(self) + f".sync_sources -> {len(text_dict)} segments ({scope})")
+
+    def import_legacy(self, scope: str, snapshot_path: str) -> int:
+        """
+        Imports translations of a project started before the store existed (JSON snapshot + journal),
+        unless scope already has translations. Returns the number of lines imported.
+        """
+        if self.count(scope, STATUS_TRANSLATED) or self.count(scope, STATUS_FOREIGN):
+            return 0
+        if not os.path.exists(snapshot_path) and not os.path.exists(snapshot_path + ".journal"):
+            return 0
+        translations = load_legacy_snapshot(snapshot_path)
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT id FROM segments WHERE scope = ?", (scope,))}
+        translations = {k: v for k, v in translations.items() if k in known and isinstance(v, str)}
+        self.save_translations(scope, translations, model="")
+        self._logger.info(str(self) + f".import_legacy -> {len(translations)} lines from {snapshot_path}")
+        return len(translations)
+
+    def save_translations(
+            self,
+            scope: str,
+            translations: dict[str, str],
+            model: str,
+            attempts: dict[str, int] | None = None,
+            latency: float | None = None
+            ):
+        """
+        Stores translated lines in one transaction. attempts ({id: requests}) is added to each row's count;
+        latency is the wall time of the chunk the lines came from.
+        """
+        if not translations:
+            return
+        attempts = attempts or {}
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE segments SET translation = ?, status = ?, attempts = attempts + ?, model = ?, tokens = ?, latency = ?, updated = ? "
+                "WHERE scope = ? AND id = ?",
+                [
+                    (translation, self._status(translation), attempts.get(doc_id, 0), model,
+                     default_token_estimator.estimate(translation), latency, now, scope, doc_id)
+                    for doc_id, translation in translations.items()
+                ]
+            )
+
+    def get_translations(self, scope: str) -> dict[str, str]:
+        """
+        Returns {id: translation} of every translated line of scope, in document order.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, translation FROM segments WHERE scope = ? AND status != ? ORDER BY position",
+                (scope, STATUS_PENDING)
+            ).fetchall()
+        return dict(rows)
+
+    def get_ids(self, scope: str, status: str) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM segments WHERE scope = ? AND status = ? ORDER BY position", (scope, status)
+            ).fetchall()
+        return [doc_id for (doc_id,) in rows]
+
+    def count(self, scope: str, status: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM segments WHERE scope = ? AND status = ?", (scope, status)).fetchone()[0]
+
+    def get_stats(self, scope: str) -> dict:
+        with self._lock:
+            statuses = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM segments WHERE scope = ? GROUP BY status", (scope,)
+            ).fetchall())
+            tokens, attempts, latency = self._conn.execute(
+                "SELECT COALESCE(SUM(tokens), 0), COALESCE(SUM(attempts), 0), AVG(latency) FROM segments WHERE scope = ?", (scope,)
+            ).fetchone()
+            models = dict(self._conn.execute(
+                "SELECT model, COUNT(*) FROM segments WHERE scope = ? AND status != ? GROUP BY model", (scope, STATUS_PENDING)
+            ).fetchall())
+        return {"statuses": statuses, "tokens": tokens, "attempts": attempts, "avg_latency": latency, "models": models}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
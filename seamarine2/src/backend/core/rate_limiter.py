@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at capacity / period tokens per second.
+    The level may go negative when a request turns out to be bigger than estimated;
+    later requests then wait until the debt is paid back.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        self._refill()
+        self._level = min(self.capacity, self._level - amount)
+
+    def remaining(self) -> float:
+        self._refill()
+        return max(0.0, self._level) / self.capacity
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budget for one model.
+    Waiters are served in FIFO order so a large chunk cannot be starved by small ones.
+    A limit of 0 (or less) disables that bucket.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._lock: asyncio.Lock | None = None
+
+    async def acquire(self, tokens: int = 0):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                delay = 0.0
+                if self._requests:
+                    delay = max(delay, self._requests.wait_time(1))
+                if self._tokens:
+                    delay = max(delay, self._tokens.wait_time(tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            if self._requests:
+                self._requests.consume(1)
+            if self._tokens:
+                self._tokens.consume(tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int | None):
+        """
+        Corrects the token bucket once the real token usage of a request is known.
+        """
+        if self._tokens and actual_tokens is not None:
+            self._tokens.adjust(actual_tokens - estimated_tokens)
+
+    def remaining(self) -> float:
+        """
+        Fraction (0.0 - 1.0) of the tighter of the two budgets that is currently unused.
+        """
+        fractions = [bucket.remaining() for bucket in (self._requests, self._tokens) if bucket]
+        return min(fractions) if fractions else 1.0
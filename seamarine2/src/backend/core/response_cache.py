@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache of Gemini responses backed by SQLite.
+
+    Entries are keyed by a SHA-256 over everything that determines the response
+    (model, system prompt, sampling / thinking config, contents) and evicted in
+    least-recently-used order once the stored text exceeds max_bytes.
+
+    A hit does not write: its access time is buffered and flushed together with the
+    next put(), every TOUCH_FLUSH_EVERY hits, or on close(), so reads never wait for
+    a commit. The connection is guarded by a lock, so get() and put() may run on
+    worker threads (TranslateCore calls them through asyncio.to_thread).
+    """
+
+    TOUCH_FLUSH_EVERY = 256
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self._logger = logging.getLogger("seamarine_translate")
+        self._path = path
+        self._max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._touched: dict[str, float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = time.time()
+            self.hits += 1
+            if len(self._touched) >= self.TOUCH_FLUSH_EVERY:
+                self._flush_touched()
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str):
+        size = len(response.encode('utf-8'))
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            self._flush_touched()
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time())
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+    def _flush_touched(self):
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET last_access = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def _evict(self):
+        while self._total_bytes > self._max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for key, size in rows:
+                if self._total_bytes <= self._max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+            self._logger.info(str(self) + f"._evict -> {self._total_bytes} bytes left")
@@ -0,0 +1,66 @@
+import asyncio
+import random
+import time
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 8, base_delay: float = 2.0, max_delay: float = 120.0, deadline: float = 1800.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RetryPolicy":
+        return cls(
+            max_attempts=data.get('max_attempts', 8),
+            base_delay=data.get('base_delay', 2.0),
+            max_delay=data.get('max_delay', 120.0),
+            deadline=data.get('deadline', 1800.0)
+        )
+
+
+class RetryScheduler:
+    """
+    Exponential backoff with full jitter, bounded by a max attempt count and a deadline.
+
+    A delay hint from the server (RetryInfo) is used as the floor and the jitter is
+    added on top, so requests throttled together do not all come back at once.
+    Waiting requests are parked as futures on the event loop timer queue; they hold
+    neither a thread nor a concurrency slot while they wait.
+    """
+
+    def __init__(self, policy: RetryPolicy | None = None):
+        self.policy = policy or RetryPolicy()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def next_delay(self, attempt: int, started_at: float, retry_after: float = 0) -> float | None:
+        """
+        Returns the delay before retry number attempt + 1, or None when the policy is exhausted.
+        """
+        if attempt + 1 >= self.policy.max_attempts:
+            return None
+        delay = max(0, retry_after) + self.backoff(attempt)
+        if time.monotonic() + delay - started_at > self.policy.deadline:
+            return None
+        return delay
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff for retry number attempt + 1, without any server hint.
+        """
+        return random.uniform(0, min(self.policy.max_delay, self.policy.base_delay * (2 ** attempt)))
+
+    async def defer(self, delay: float):
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        handle = loop.call_later(delay, lambda: waiter.done() or waiter.set_result(None))
+        self._pending += 1
+        try:
+            await waiter
+        finally:
+            handle.cancel()
+            self._pending -= 1
@@ -0,0 +1,48 @@
+from google.genai import types
+from utils.json_salvage import JsonObjectStreamParser
+from typing import Callable
+
+class StreamCollector:
+    """
+    Collects a streamed JSON object response.
+
+    Every key/value pair is handed to on_pairs as soon as it is complete, so callers
+    can report progress line by line. finish_reason is tracked per stream; a
+    MAX_TOKENS finish marks the response as truncated.
+    """
+
+    def __init__(self, on_pairs: Callable[[dict[str, str]], None] | None = None):
+        self.pairs: dict[str, str] = {}
+        self.finish_reason: types.FinishReason | None = None
+        self._on_pairs = on_pairs
+        self._parser = JsonObjectStreamParser()
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason == types.FinishReason.MAX_TOKENS
+
+    def begin(self):
+        """
+        Starts a new stream (e.g. a retry); pairs collected from earlier streams are kept.
+        """
+        self._parser = JsonObjectStreamParser()
+        self.finish_reason = None
+
+    def feed(self, chunk: types.GenerateContentResponse) -> str:
+        if chunk.candidates and chunk.candidates[0].finish_reason:
+            self.finish_reason = chunk.candidates[0].finish_reason
+        text = chunk.text or ""
+        if text:
+            self.merge(self._parser.feed(text))
+        return text
+
+    def end(self):
+        self.merge(self._parser.close())
+
+    def merge(self, pairs: dict):
+        new_pairs = {k: v for k, v in pairs.items() if k not in self.pairs}
+        if not new_pairs:
+            return
+        self.pairs.update(new_pairs)
+        if self._on_pairs:
+            self._on_pairs(new_pairs)
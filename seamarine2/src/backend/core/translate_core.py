@@ -4,12 +4,33 @@ from logger_config import setup_logger
 import logging
 import os
 from backend.model import AiModelConfig
+from .key_pool import ApiKeyPool, ApiKeySlot
+from .concurrency_controller import AimdConcurrencyController
+from .retry_scheduler import RetryPolicy, RetryScheduler
+from .response_cache import ResponseCache
+from .translation_memory import TranslationMemory
+from .context_cache import ContextCacheManager
+from .bisection import BisectionEngine
+from .chunk_planner import ChunkPlanner
+from .stream_collector import StreamCollector
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .call_trace import CallTraceRecorder, CallTraceReplayer, TRACE_OFF, TRACE_RECORD, TRACE_REPLAY
+from .model_health import ModelHealthTracker, OUTCOME_OK, OUTCOME_ERROR, OUTCOME_THROTTLED, OUTCOME_BLOCKED, OUTCOME_EMPTY
+from utils.json_salvage import salvage_json_object
+from utils.token_estimator import default_token_estimator
+from utils.foreign_detect import contains_foreign
 import ast
 import time
 import re
 import json
+import asyncio
+import threading
+from typing import Callable
 
 class TranslateCore:
+    # Thinking tokens count against max_output_tokens; 2.5 models think dynamically unless given a budget.
+    DYNAMIC_THINKING_RESERVE = 24576
+
     def __init__(self, language_from=""):
         self._logger = logging.getLogger("seamarine_translate")
         try:
@@ -17,6 +38,28 @@ class TranslateCore:
             self._key: str = ""
             self._client = None if self._key == "" else genai.Client()
             self._model_data: AiModelConfig
+            self._loop: asyncio.AbstractEventLoop | None = None
+            self._loop_thread: threading.Thread | None = None
+            self._loop_lock = threading.Lock()
+            self._extra_keys: list[str] = []
+            self._key_pool = ApiKeyPool()
+            self._model_health = ModelHealthTracker()
+            self._circuit_breaker = CircuitBreaker()
+            self._concurrency = AimdConcurrencyController()
+            self._retry_scheduler = RetryScheduler()
+            self._response_cache: ResponseCache | None = None
+            self._translation_memory: TranslationMemory | None = None
+            self._fuzzy_threshold: float = 0.75
+            self._autofill_threshold: float = 0.97
+            self._context_cache: ContextCacheManager | None = None
+            self._call_recorder: CallTraceRecorder | None = None
+            self._call_replayer: CallTraceReplayer | None = None
+            self._glossary: dict[str, str] = {}
+            self._structured_output: bool = True
+            self._hedge_percentile: float = 0.0
+            self._hedge_budget: float = 0.0
+            self._chunk_planner = ChunkPlanner()
+            self._bisection = BisectionEngine(self._abisection_generate, self._estimate_tokens, self.parse_json_response, context=self._get_bisection_context)
             self._logger.info(str(self) + ".__init__")
         except Exception as e:
             self._logger.error(str(self) + str(e))
@@ -24,13 +67,43 @@ class TranslateCore:
     def register_key(self, key: str) -> bool: 
         try:
             os.environ['GOOGLE_API_KEY'] = key
-            self._client = genai.Client()
+            self._key = key
+            self._key_pool.set_keys([key] + self._extra_keys)
+            self._client = self._key_pool.primary.client
             self._logger.info(str(self) + f".register_key({key})")
             return True
         except Exception as e:
             self._logger.error(str(self) + f".register_key({key})\n-> " + str(e))
             return False
         
+    def register_keys(self, keys: list[str]) -> bool:
+        """
+        Registers additional API keys (each with its own project quota) next to the primary key.
+        Requests are dispatched over all of them by remaining budget.
+        """
+        try:
+            self._extra_keys = [key for key in keys if key]
+            self._key_pool.set_keys([self._key] + self._extra_keys)
+            self._client = self._key_pool.primary.client if self._key_pool.primary else None
+            self._logger.info(str(self) + f".register_keys({len(self._extra_keys)} extra keys)")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".register_keys({len(keys)} extra keys)\n-> " + str(e))
+            return False
+
+    def configure_base_url(self, base_url: str) -> bool:
+        """
+        Sends every request to base_url instead of the public Gemini endpoint (empty string restores it).
+        """
+        try:
+            self._key_pool.set_base_url(base_url)
+            self._client = self._key_pool.primary.client if self._key_pool.primary else None
+            self._logger.info(str(self) + f".configure_base_url({base_url})")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".configure_base_url({base_url})\n-> " + str(e))
+            return False
+
     def update_model_data(self, data: AiModelConfig) -> bool:
         try:
             self._model_data = data
@@ -40,6 +113,290 @@ class TranslateCore:
             self._logger.error(str(self) + f".update_model_data({str(data.to_dict())})\n-> " + str(e))
             return False
 
+    def update_rate_limits(self, rate_limits: dict[str, dict]) -> bool:
+        try:
+            self._key_pool.update_rate_limits(rate_limits)
+            self._logger.info(str(self) + f".update_rate_limits({str(rate_limits)})")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".update_rate_limits({str(rate_limits)})\n-> " + str(e))
+            return False
+
+    def configure_concurrency(self, initial: int, maximum: int, adaptive: bool = True) -> bool:
+        try:
+            self._concurrency = AimdConcurrencyController(
+                initial=initial,
+                maximum=maximum if adaptive else initial,
+                adaptive=adaptive
+            )
+            self._logger.info(str(self) + f".configure_concurrency({initial}, {maximum}, {adaptive})")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".configure_concurrency({initial}, {maximum}, {adaptive})\n-> " + str(e))
+            return False
+
+    def update_retry_policy(self, retry_policy: dict) -> bool:
+        try:
+            self._retry_scheduler = RetryScheduler(RetryPolicy.from_dict(retry_policy))
+            self._logger.info(str(self) + f".update_retry_policy({str(retry_policy)})")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".update_retry_policy({str(retry_policy)})\n-> " + str(e))
+            return False
+
+    def configure_response_cache(self, enabled: bool, path: str = "", max_mb: int = 512) -> bool:
+        try:
+            if self._response_cache:
+                self._response_cache.close()
+            self._response_cache = ResponseCache(path, max_mb * 1024 * 1024) if enabled else None
+            self._logger.info(str(self) + f".configure_response_cache({enabled}, {path}, {max_mb})")
+            return True
+        except Exception as e:
+            self._response_cache = None
+            self._logger.error(str(self) + f".configure_response_cache({enabled}, {path}, {max_mb})\n-> " + str(e))
+            return False
+
+    def configure_translation_memory(self, enabled: bool, path: str = "", fuzzy_threshold: float = 0.75, autofill_threshold: float = 0.97) -> bool:
+        """
+        Lines whose best fuzzy match scores at least fuzzy_threshold get it as a hint in their
+        chunk's request; matches of at least autofill_threshold (with the same names) are reused as is.
+        """
+        try:
+            if self._translation_memory:
+                self._translation_memory.close()
+            self._translation_memory = TranslationMemory(path) if enabled else None
+            self._fuzzy_threshold = fuzzy_threshold
+            self._autofill_threshold = autofill_threshold
+            self._logger.info(str(self) + f".configure_translation_memory({enabled}, {path}, {fuzzy_threshold}, {autofill_threshold})")
+            return True
+        except Exception as e:
+            self._translation_memory = None
+            self._logger.error(str(self) + f".configure_translation_memory({enabled}, {path}, {fuzzy_threshold}, {autofill_threshold})\n-> " + str(e))
+            return False
+
+    def _get_language_pair(self) -> str:
+        return f"{self.language_from}>Korean"
+
+    def lookup_translation_memory(self, text_dict: dict) -> dict:
+        """
+        Returns the stored translations of text_dict lines seen in earlier books (same language and glossary names).
+        """
+        if not self._translation_memory:
+            return {}
+        try:
+            return self._translation_memory.lookup(text_dict, self._get_language_pair(), self._glossary)
+        except Exception as e:
+            self._logger.error(str(self) + ".lookup_translation_memory\n-> " + str(e))
+            return {}
+
+    def lookup_fuzzy_translation_memory(self, text_dict: dict) -> tuple[dict, dict]:
+        """
+        Returns (fills, hints): {id: translation} for near-100% matches and
+        {id: (similar source, its translation)} for the other matches above the threshold.
+        """
+        if not self._translation_memory or self._fuzzy_threshold <= 0:
+            return {}, {}
+        try:
+            matches = self._translation_memory.lookup_fuzzy(text_dict, self._get_language_pair(), self._fuzzy_threshold, self._glossary)
+        except Exception as e:
+            self._logger.error(str(self) + ".lookup_fuzzy_translation_memory\n-> " + str(e))
+            return {}, {}
+        fills = {k: m.target for k, m in matches.items() if m.score >= self._autofill_threshold and m.same_glossary}
+        hints = {k: (m.source, m.target) for k, m in matches.items() if k not in fills}
+        return fills, hints
+
+    def add_to_translation_memory(self, source_dict: dict, target_dict: dict) -> int:
+        """
+        Stores the translated lines of a finished book; lines still in the source script are skipped.
+        """
+        if not self._translation_memory:
+            return 0
+        try:
+            translated = {k: v for k, v in target_dict.items() if isinstance(v, str) and not contains_foreign(v)}
+            return self._translation_memory.add(source_dict, translated, self._get_language_pair(), self._glossary)
+        except Exception as e:
+            self._logger.error(str(self) + ".add_to_translation_memory\n-> " + str(e))
+            return 0
+
+    def configure_context_cache(self, enabled: bool, ttl_seconds: int = 3600) -> bool:
+        try:
+            self._context_cache = ContextCacheManager(ttl_seconds) if enabled else None
+            self._logger.info(str(self) + f".configure_context_cache({enabled}, {ttl_seconds})")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".configure_context_cache({enabled}, {ttl_seconds})\n-> " + str(e))
+            return False
+
+    def configure_structured_output(self, enabled: bool) -> bool:
+        self._structured_output = enabled
+        self._logger.info(str(self) + f".configure_structured_output({enabled})")
+        return True
+
+    def configure_hedging(self, percentile: float, budget_percent: float) -> bool:
+        """
+        Enables hedged chunk requests: a chunk slower than the given latency percentile is sent
+        a second time, with at most budget_percent extra chunks. A percentile of 0 disables hedging.
+        """
+        try:
+            self._hedge_percentile = max(0.0, min(100.0, float(percentile)))
+            self._hedge_budget = max(0.0, float(budget_percent))
+            self._logger.info(str(self) + f".configure_hedging({percentile}, {budget_percent})")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".configure_hedging({percentile}, {budget_percent})\n-> " + str(e))
+            return False
+
+    def configure_circuit_breaker(self, failure_threshold: int, reset_timeout: float, max_reset_timeout: float = 600.0) -> bool:
+        try:
+            self._circuit_breaker = CircuitBreaker(failure_threshold, reset_timeout, max_reset_timeout)
+            self._logger.info(str(self) + f".configure_circuit_breaker({failure_threshold}, {reset_timeout}, {max_reset_timeout})")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".configure_circuit_breaker({failure_threshold}, {reset_timeout}, {max_reset_timeout})\n-> " + str(e))
+            return False
+
+    def configure_call_trace(self, mode: str, path: str = "", speed: float = 1.0) -> bool:
+        """
+        mode "record" appends every model call to the JSONL trace at path, "replay" answers
+        model calls from that trace instead of the API (latency divided by speed, 0 = none),
+        anything else turns tracing off.
+        """
+        try:
+            if self._call_recorder:
+                self._call_recorder.close()
+            self._call_recorder = None
+            self._call_replayer = None
+            if mode == TRACE_RECORD:
+                self._call_recorder = CallTraceRecorder(path)
+            elif mode == TRACE_REPLAY:
+                self._call_replayer = CallTraceReplayer(path, speed)
+            self._logger.info(str(self) + f".configure_call_trace({mode}, {path}, {speed})")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + f".configure_call_trace({mode}, {path}, {speed})\n-> " + str(e))
+            return False
+
+    def get_call_trace_stats(self) -> dict:
+        if self._call_replayer:
+            return {"mode": TRACE_REPLAY} | self._call_replayer.get_stats()
+        if self._call_recorder:
+            return {"mode": TRACE_RECORD, "recorded": self._call_recorder.count}
+        return {"mode": TRACE_OFF}
+
+    def is_circuit_open(self) -> bool:
+        return self._circuit_breaker.is_open
+
+    async def await_circuit_ready(self):
+        await self._circuit_breaker.wait_until_ready()
+
+    def get_hedging_policy(self) -> tuple[float, float]:
+        return self._hedge_percentile, self._hedge_budget
+
+    def set_glossary(self, glossary: dict[str, str]) -> bool:
+        """
+        Sets the book-level proper noun glossary appended to the system instruction.
+        Together with the system prompt it forms the static prefix shared by every chunk of a book.
+        """
+        try:
+            self._glossary = dict(glossary)
+            self._logger.info(str(self) + f".set_glossary({len(self._glossary)} entries)")
+            return True
+        except Exception as e:
+            self._logger.error(str(self) + ".set_glossary\n-> " + str(e))
+            return False
+
+    def release_context_caches(self):
+        if self._context_cache:
+            self.run_coroutine(self._context_cache.release_all())
+
+    def get_concurrency_window(self) -> int:
+        return self._concurrency.window
+
+    def get_max_concurrency(self) -> int:
+        return self._concurrency.maximum
+
+    def get_client(self):
+        return self._client
+
+    def get_model_name(self) -> str:
+        return self._model_data.name
+
+    def build_batch_request(self, contents: str, response_keys: list[str] | None = None) -> dict:
+        """
+        Builds one GenerateContentRequest (as JSON) for a batch job file, with the same
+        system instruction, sampling, safety and response schema as an interactive request.
+        """
+        gen_config = self._build_generate_config()
+        if response_keys is not None and self._structured_output:
+            self._apply_response_schema(gen_config, response_keys)
+        config = gen_config.model_dump(mode='json', exclude_none=True)
+        request = {"contents": [{"role": "user", "parts": [{"text": contents}]}]}
+        system_instruction = config.pop('system_instruction', None)
+        if system_instruction:
+            request['system_instruction'] = {"parts": [{"text": system_instruction}]}
+        safety_settings = config.pop('safety_settings', None)
+        if safety_settings:
+            request['safety_settings'] = safety_settings
+        request['generation_config'] = config
+        return request
+
+    def get_max_output_tokens(self, model_name: str | None = None) -> int:
+        model_name = model_name or self._model_data.name
+        return 65536 if '2.5' in model_name else 8192
+
+    def get_output_budget(self) -> int:
+        """
+        Output tokens left for the answer after thinking, on the tightest model of the fallback chain.
+        """
+        budgets = []
+        for model_name in [self._model_data.name] + list(self._model_data.fallback_models):
+            budget = self.get_max_output_tokens(model_name)
+            if '2.5' in model_name:
+                if model_name == self._model_data.name and self._model_data.use_thinking_budget and self._model_data.thinking_budget >= 0:
+                    budget -= self._model_data.thinking_budget
+                else:
+                    budget -= self.DYNAMIC_THINKING_RESERVE
+            budgets.append(max(1024, budget))
+        return min(budgets)
+
+    def plan_chunks(self, text_dict: dict, max_input_tokens: int) -> list[dict]:
+        """
+        Chunks text_dict for JSON translation within max_input_tokens and the output budget.
+        """
+        chunks = self._chunk_planner.plan(text_dict, max_input_tokens, self.get_output_budget(), self.language_from)
+        self._logger.info(str(self) + f".plan_chunks -> {len(text_dict)} lines in {len(chunks)} chunks (output limit {self._chunk_planner.get_output_limit(self.get_output_budget())})")
+        return chunks
+
+    def split_chunk(self, chunk: dict) -> list[dict]:
+        """
+        Splits a planned chunk whose predicted answer no longer fits, e.g. after MAX_TOKENS truncations.
+        """
+        return self._chunk_planner.split(chunk, self.get_output_budget(), self.language_from)
+
+    def estimate_chunk_cost(self, chunk: dict) -> float:
+        """
+        Predicted seconds for a JSON chunk: its input and expected output tokens times
+        the configured model's observed seconds per token.
+        """
+        tokens = default_token_estimator.estimate_text_dict(chunk) + self._chunk_planner.predict_output(chunk, self.language_from)
+        return tokens * self._model_health.get_seconds_per_token(self._model_data.name)
+
+    def get_chunk_planner_stats(self) -> dict:
+        return self._chunk_planner.get_stats()
+
+    def _select_model(self) -> str:
+        return self._model_health.select([self._model_data.name] + list(self._model_data.fallback_models))
+
+    def get_model_health(self) -> dict[str, dict]:
+        return self._model_health.get_stats()
+
+    def get_key_stats(self) -> list[dict]:
+        return self._key_pool.get_stats()
+
+    def _estimate_tokens(self, contents) -> int:
+        text = contents if isinstance(contents, str) else ""
+        return default_token_estimator.estimate(self._get_system_instruction()) + default_token_estimator.estimate(text)
+
     def get_model_list(self) -> list[str]:
         try:
             raw_model_list = self._client.models.list()
@@ -55,62 +412,344 @@ class TranslateCore:
             self._logger.error(str(self) + str(e))
             return []
         
-    def generate_content(self, contents: str | bytes, divide_n_conquer = True, resp_in_json = False):
+    def get_event_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Returns the event loop that drives every async Gemini request.
+        The loop runs forever in a daemon thread so that all workers share
+        one loop (and one async client) regardless of which QThread calls in.
+        """
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="seamarine_aio",
+                    daemon=True
+                )
+                self._loop_thread.start()
+                self._logger.info(str(self) + ".get_event_loop -> started")
+            return self._loop
+
+    def run_coroutine(self, coro):
+        """
+        Runs a coroutine on the core event loop and blocks until it finishes.
+        Must not be called from the event loop thread itself.
+        """
+        loop = self.get_event_loop()
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("run_coroutine() called from the core event loop thread")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def generate_content(self, contents: str | bytes, divide_n_conquer = True, resp_in_json = False, use_cache = True, response_keys: list[str] | None = None):
+        return self.run_coroutine(self.agenerate_content(contents, divide_n_conquer, resp_in_json, use_cache, response_keys))
+
+    async def agenerate_content(self, contents: str | bytes, divide_n_conquer = True, resp_in_json = False, use_cache = True, response_keys: list[str] | None = None, hints: dict[str, str] | None = None):
+        """
+        Generates a response for contents with the current model data.
+        Text requests are served from the response cache when possible; with use_cache=False
+        the cache is bypassed for the lookup but the fresh response still replaces the entry.
+        Entries are keyed by the model that answered and only complete (STOP) answers are stored.
+        With response_keys (and structured output enabled) the model is constrained to a JSON
+        object whose string properties are exactly those keys.
+        hints ({source: translation} of similar earlier lines) are sent ahead of contents as reference.
+        """
+        if not self._structured_output:
+            response_keys = None
+        cache = self._response_cache
+        if not cache or not isinstance(contents, str):
+            cache = None
+        elif use_cache:
+            cached = await asyncio.to_thread(cache.get, self._make_cache_key(self._select_model(), contents, resp_in_json, response_keys, hints))
+            if cached is not None:
+                self._logger.info(str(self) + f".agenerate_content -> cache hit ({cache.hits} hits, {cache.misses} misses)")
+                return cached
+        result, model_name, complete = await self._agenerate_with_retry(contents, divide_n_conquer, resp_in_json, response_keys, hints=hints)
+        if cache and result and complete:
+            await asyncio.to_thread(cache.put, self._make_cache_key(model_name, contents, resp_in_json, response_keys, hints), result)
+        return result
+
+    async def agenerate_content_stream(self, contents: str, response_keys: list[str] | None = None, on_pairs: Callable[[dict[str, str]], None] | None = None, use_cache = True, hints: dict[str, str] | None = None) -> tuple[dict[str, str], bool]:
+        """
+        Streams a JSON object response and hands every completed key/value pair to on_pairs as it arrives.
+        Returns (pairs, truncated); truncated is True when the model stopped at MAX_TOKENS, in which case
+        the pairs received so far are kept and the caller should split the rest instead of retrying it whole.
+        """
+        if not self._structured_output:
+            response_keys = None
+        collector = StreamCollector(on_pairs)
+        cache = self._response_cache
+        if cache and use_cache:
+            cached = await asyncio.to_thread(cache.get, self._make_cache_key(self._select_model(), contents, True, response_keys, hints))
+            if cached is not None:
+                self._logger.info(str(self) + f".agenerate_content_stream -> cache hit ({cache.hits} hits, {cache.misses} misses)")
+                collector.merge(self.parse_json_response(cached))
+                return dict(collector.pairs), False
+        result, model_name, complete = await self._agenerate_with_retry(contents, True, True, response_keys, collector, hints)
+        if result:
+            # Covers a bisected (blocked) response and anything the incremental parser could not place.
+            collector.merge(self.parse_json_response(result))
+        if collector.truncated:
+            self._logger.warning(str(self) + f".agenerate_content_stream -> truncated at MAX_TOKENS after {len(collector.pairs)} entries")
+        elif cache and result and complete:
+            await asyncio.to_thread(cache.put, self._make_cache_key(model_name, contents, True, response_keys, hints), result)
+        return dict(collector.pairs), collector.truncated
+
+    def _make_cache_key(self, model_name: str, contents: str, resp_in_json: bool, response_keys: list[str] | None, hints: dict[str, str] | None = None) -> str:
+        # The model that answers replaces the configured one, so a fallback's output never stands in for the primary's.
+        # Hints only join the key when present, so entries made without them stay valid.
+        model_data = dict(self._model_data.to_dict(), name=model_name)
+        return ResponseCache.make_key(model_data, self._get_system_instruction(), resp_in_json, response_keys is not None, contents, *([hints] if hints else []))
+
+    async def _agenerate_with_retry(self, contents: str | bytes, divide_n_conquer: bool, resp_in_json: bool, response_keys: list[str] | None, stream: StreamCollector | None = None, hints: dict[str, str] | None = None) -> tuple[str, str, bool]:
+        """
+        Returns (text, model that answered, whether the answer is complete, i.e. finished with STOP).
+        """
+        attempt = 0
+        started_at = time.monotonic()
+        while True:
+            model_name = self._select_model()
+            try:
+                text, complete = await self._agenerate_once(contents, divide_n_conquer, resp_in_json, response_keys, model_name, stream, hints)
+                return text, model_name, complete
+            except CircuitOpenError:
+                # Fail fast (and quietly) while the API is down; ChunkRunner pauses and requeues the work.
+                return "", model_name, False
+            except Exception as e:
+                self._logger.error(f"{str(self)}._agenerate_with_retry -> {str(e)}")
+                if not self._is_rate_limit_error(e):
+                    return "", model_name, False
+                retry_after = self._get_retry_delay_from_exception(str(e))
+                delay = self._retry_scheduler.next_delay(attempt, started_at, retry_after)
+                if delay is None:
+                    self._logger.warning(str(self) + f"._agenerate_with_retry\n-> 429/Resource Exhausted Detected. Giving up after {attempt+1} attempts")
+                    return "", model_name, False
+                if self._key_pool.available_count() > 0 or self._select_model() != model_name:
+                    # Another key or a fallback model still has quota; only the throttled one cools down.
+                    delay = 0.0
+                self._logger.info(str(self) + f"._agenerate_with_retry\n-> 429/Resource Exhausted Detected. Retry after {delay:.1f} seconds ({self._retry_scheduler.pending} waiting)")
+                await self._retry_scheduler.defer(delay)
+                attempt += 1
+
+    async def _agenerate_once(self, contents: str | bytes, divide_n_conquer: bool, resp_in_json: bool, response_keys: list[str] | None, model_name: str, stream: StreamCollector | None = None, hints: dict[str, str] | None = None) -> tuple[str, bool]:
+        gen_config = await self._abuild_generate_config(response_keys, model_name)
+        # Bisection sub-requests (divide_n_conquer=False) probe one blocked payload piece by piece;
+        # their outcomes say nothing new about the model, so only the original request is recorded.
+        record_health = divide_n_conquer
+        started_at = time.monotonic()
         try:
-            gen_config = types.GenerateContentConfig(
-                max_output_tokens= 65536 if '2.5' in self._model_data.name else 8192,
-                system_instruction= self._model_data.system_prompt,
-                temperature= self._model_data.temperature,
-                top_p= self._model_data.top_p,
-                frequency_penalty= self._model_data.frequency_penalty,
-                safety_settings = [
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                        threshold=types.HarmBlockThreshold.OFF
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                        threshold=types.HarmBlockThreshold.OFF
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
-                        threshold=types.HarmBlockThreshold.OFF
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                        threshold=types.HarmBlockThreshold.OFF
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_CIVIC_INTEGRITY,
-                        threshold=types.HarmBlockThreshold.OFF
-                    )
-                ],
-            )
-            if self._model_data.use_thinking_budget:
-                gen_config.thinking_config = types.ThinkingConfig(thinking_budget=self._model_data.thinking_budget)
-            
-            resp = self._client.models.generate_content(
-                model=self._model_data.name,
-                contents=contents,
-                config=gen_config
+            resp = await self._acall_model(contents, gen_config, model_name, stream, hints)
+        except Exception as e:
+            if record_health:
+                self._model_health.record(model_name, OUTCOME_THROTTLED if self._is_rate_limit_error(e) else OUTCOME_ERROR)
+            if gen_config.cached_content:
+                # The handle may have expired or been deleted server-side; re-create it next time.
+                self._context_cache.invalidate(gen_config.cached_content)
+            raise
+        if response_keys is not None and resp.candidates and resp.usage_metadata and isinstance(contents, str):
+            self._chunk_planner.observe(
+                contents,
+                resp.usage_metadata.candidates_token_count or 0,
+                resp.candidates[0].finish_reason == types.FinishReason.MAX_TOKENS,
+                self.language_from
             )
+        if resp.prompt_feedback and resp.prompt_feedback.block_reason:
+            if record_health:
+                self._model_health.record(model_name, OUTCOME_BLOCKED)
+            self._logger.warning(f"Response blocked with the reason {resp.prompt_feedback.block_reason}")
+            # A bisected answer is not stored as a whole; its pieces are cached by their own requests.
+            if divide_n_conquer:
+                return await self._divide_and_conquer_json(contents) if resp_in_json else await self._divide_and_conquer(contents), False
+            else:
+                return "", False
+        if not resp.text:
+            if record_health:
+                self._model_health.record(model_name, OUTCOME_EMPTY)
+            self._logger.warning(str(self) + f"._agenerate_once -> empty response from {model_name}")
+            return "", False
+        usage = resp.usage_metadata
+        tokens = (usage.prompt_token_count or 0) + (usage.candidates_token_count or 0) if usage else 0
+        if record_health:
+            self._model_health.record(model_name, OUTCOME_OK, time.monotonic() - started_at, tokens)
+        complete = bool(resp.candidates) and resp.candidates[0].finish_reason == types.FinishReason.STOP
+        return self._clean_gemini_response(resp.text), complete
 
-            if resp.prompt_feedback and resp.prompt_feedback.block_reason:
-                self._logger.warning(f"Response blocked with the reason {resp.prompt_feedback.block_reason}")
-                if divide_n_conquer:
-                    return self._divide_and_conquer_json(contents) if resp_in_json else self._divide_and_conquer(contents)
-                else:
-                    return ""
-            return self._clean_gemini_response(resp.text)
-        except Exception as e:
-            self._logger.error(f"{str(self)}.generate_content -> {str(e)}")
-            if "429" in str(e) or "Resource exhausted" in str(e):
-                dynamic_delay = self._get_retry_delay_from_exception(str(e))
-                self._logger.info(str(self) + f".process_chunk\n-> 429/Resource Exhausted Detected. Retry after {dynamic_delay} seconds")
-                time.sleep(dynamic_delay)
-                return self.generate_content(contents)
+    async def _acall_model(self, contents, gen_config: types.GenerateContentConfig, model_name: str, stream: StreamCollector | None = None, hints: dict[str, str] | None = None) -> types.GenerateContentResponse:
+        request = [self._format_hints(hints), contents] if hints else contents
+        estimated_tokens = self._estimate_tokens(contents) + (default_token_estimator.estimate(request[0]) if hints else 0)
+        concurrency = self._concurrency
+        breaker = self._circuit_breaker
+        ticket = await concurrency.acquire()
+        try:
+            # Checked once the slot is held: a call cancelled while waiting for one must not keep the half-open probe.
+            breaker.before_call()
+        except CircuitOpenError:
+            await concurrency.release()
+            raise
+        slot: ApiKeySlot | None = None
+        try:
+            if self._call_replayer:
+                resp = await self._call_replayer.replay(request, model_name, stream)
             else:
-                return ""
+                slot = await self._key_pool.acquire(model_name, estimated_tokens)
+                await self._aapply_context_cache(gen_config, slot, model_name)
+                resp = await self._acall_client(slot.client, request, gen_config, model_name, stream)
+            concurrency.on_success()
+            breaker.record_success()
+            if slot:
+                self._key_pool.on_success(slot)
+        except BaseException as e:
+            breaker.record_failure(e)
+            if self._is_rate_limit_error(e):
+                concurrency.on_throttle(ticket)
+                if slot:
+                    self._key_pool.on_throttle(slot, self._get_retry_delay_from_exception(str(e)), self._retry_scheduler.backoff)
+            raise
+        finally:
+            if slot:
+                self._key_pool.release(slot)
+            await concurrency.release()
+        if resp.usage_metadata and resp.usage_metadata.prompt_token_count and isinstance(contents, str):
+            # Keeps the offline estimator that sizes chunks in line with the real tokenizer.
+            default_token_estimator.calibrate(contents, resp.usage_metadata.prompt_token_count, estimated_tokens - default_token_estimator.estimate(contents))
+        if slot and resp.usage_metadata:
+            self._key_pool.settle(slot, model_name, estimated_tokens, resp.usage_metadata.prompt_token_count)
+        return resp
+
+    def _format_hints(self, hints: dict[str, str]) -> str:
+        return (
+            "Reference translations of similar lines from earlier volumes, for consistent wording only. "
+            "Do not include them in your output.\n"
+            + "\n".join(f"{source} => {target}" for source, target in hints.items())
+        )
+
+    async def _acall_client(self, client, contents, gen_config: types.GenerateContentConfig, model_name: str, stream: StreamCollector | None) -> types.GenerateContentResponse:
+        recorder = self._call_recorder
+        started_at = time.monotonic()
+        try:
+            if stream:
+                resp = await self._aconsume_stream(client, model_name, contents, gen_config, stream)
+            else:
+                resp = await client.aio.models.generate_content(
+                    model=model_name,
+                    contents=contents,
+                    config=gen_config
+                )
+        except Exception as e:
+            if recorder:
+                recorder.record(contents, model_name, gen_config, stream is not None, time.monotonic() - started_at, error=e)
+            raise
+        if recorder:
+            recorder.record(contents, model_name, gen_config, stream is not None, time.monotonic() - started_at, resp=resp)
+        return resp
+
+    async def _aconsume_stream(self, client, model_name: str, contents, gen_config: types.GenerateContentConfig, stream: StreamCollector) -> types.GenerateContentResponse:
+        """
+        Consumes generate_content_stream into stream and returns the equivalent non-streamed response.
+        """
+        stream.begin()
+        texts: list[str] = []
+        prompt_feedback = None
+        usage_metadata = None
+        async for chunk in await client.aio.models.generate_content_stream(
+            model=model_name,
+            contents=contents,
+            config=gen_config
+        ):
+            prompt_feedback = chunk.prompt_feedback or prompt_feedback
+            usage_metadata = chunk.usage_metadata or usage_metadata
+            texts.append(stream.feed(chunk))
+            if stream.truncated:
+                break
+        stream.end()
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text="".join(texts))]),
+                finish_reason=stream.finish_reason
+            )],
+            prompt_feedback=prompt_feedback,
+            usage_metadata=usage_metadata
+        )
+
+    def _is_rate_limit_error(self, e: Exception) -> bool:
+        return "429" in str(e) or "Resource exhausted" in str(e)
+
+    def _get_system_instruction(self) -> str:
+        if not self._glossary:
+            return self._model_data.system_prompt
+        glossary_lines = [f"{t_from}: {t_to}" for t_from, t_to in sorted(self._glossary.items())]
+        return self._model_data.system_prompt + \
+            "\n\n# Glossary\nAlways translate the following proper nouns as given:\n" + "\n".join(glossary_lines)
+
+    async def _abuild_generate_config(self, response_keys: list[str] | None = None, model_name: str | None = None) -> types.GenerateContentConfig:
+        gen_config = self._build_generate_config(model_name)
+        if response_keys is not None:
+            self._apply_response_schema(gen_config, response_keys)
+        return gen_config
+
+    def _apply_response_schema(self, gen_config: types.GenerateContentConfig, response_keys: list[str]):
+        gen_config.response_mime_type = "application/json"
+        gen_config.response_schema = types.Schema(
+            type=types.Type.OBJECT,
+            properties={key: types.Schema(type=types.Type.STRING) for key in response_keys},
+            required=list(response_keys),
+            property_ordering=list(response_keys)
+        )
+
+    async def _aapply_context_cache(self, gen_config: types.GenerateContentConfig, slot: ApiKeySlot, model_name: str):
+        """
+        Swaps the system instruction for a cached-content handle of the key the request is sent with
+        (handles belong to the key's project and cannot be shared between keys).
+        """
+        if self._context_cache and gen_config.system_instruction:
+            cache_name = await self._context_cache.get_cache_name(
+                slot.client,
+                model_name,
+                gen_config.system_instruction,
+                slot.label
+            )
+            if cache_name:
+                gen_config.system_instruction = None
+                gen_config.cached_content = cache_name
+
+    def _build_generate_config(self, model_name: str | None = None) -> types.GenerateContentConfig:
+        """
+        Builds the config for model_name (the configured model by default). The thinking budget
+        is tuned for the configured model, so fallback models keep their own default.
+        """
+        model_name = model_name or self._model_data.name
+        gen_config = types.GenerateContentConfig(
+            max_output_tokens= self.get_max_output_tokens(model_name),
+            system_instruction= self._get_system_instruction(),
+            temperature= self._model_data.temperature,
+            top_p= self._model_data.top_p,
+            frequency_penalty= self._model_data.frequency_penalty,
+            safety_settings = [
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+                    threshold=types.HarmBlockThreshold.OFF
+                ),
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+                    threshold=types.HarmBlockThreshold.OFF
+                ),
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
+                    threshold=types.HarmBlockThreshold.OFF
+                ),
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+                    threshold=types.HarmBlockThreshold.OFF
+                ),
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_CIVIC_INTEGRITY,
+                    threshold=types.HarmBlockThreshold.OFF
+                )
+            ],
+        )
+        if self._model_data.use_thinking_budget and model_name == self._model_data.name:
+            gen_config.thinking_config = types.ThinkingConfig(thinking_budget=self._model_data.thinking_budget)
+        return gen_config
         
     def count_token(self, text):
         return self._client.models.count_tokens(text)
@@ -135,52 +774,32 @@ class TranslateCore:
                         break
         except Exception as e:
             self._logger.warning(f"Failed to parse retryDelay: {e}")
-            return 10
+            return 0
 
         return retry_seconds + extra_seconds if retry_seconds > 0 else 0
 
-    def _divide_and_conquer_json(self, contents: str) -> str:
-        json_dict = json.loads(contents)
-        keys = list(json_dict.keys())
-        mid = len(keys) // 2
-        first_half = {k: json_dict[k] for k in keys[:mid]}
-        second_half = {k: json_dict[k] for k in keys[mid:]}
+    async def _divide_and_conquer_json(self, contents: str) -> str:
+        return await self._bisection.bisect_json(contents)
 
-        subcontents_1 = json.dumps(first_half)
-        subcontents_2 = json.dumps(second_half)
-
-        subdict_1 = {}
-        subdict_2 = {}
-        for i in range(3):
-            try:
-                subresp_1 = self.generate_content(subcontents_1, resp_in_json=True)
-                subdict_1.update(json.loads(subresp_1))
-            except Exception as e:
-                self._logger.exception(f"Failed to divide and conquer in json, retry...({i})")
-                continue
-        for i in range(3):
-            try:
-                subresp_2 = self.generate_content(subcontents_2, resp_in_json=True)
-                subdict_2.update(json.loads(subresp_2))
-            except Exception as e:
-                self._logger.exception(f"Failed to divide and conquer in json, retry...({i})")
-                continue
+    async def _divide_and_conquer(self, contents: str | bytes) -> str:
+        if not isinstance(contents, str):
+            self._logger.warning(str(self) + "._divide_and_conquer -> non-text contents cannot be split")
+            return ""
+        return await self._bisection.bisect_text(contents)
 
+    async def _abisection_generate(self, contents: str, response_keys: list[str] | None) -> str:
+        return await self.agenerate_content(
+            contents,
+            divide_n_conquer=False,
+            resp_in_json=response_keys is not None,
+            response_keys=response_keys
+        )
 
-        merged_dict = {}
-        merged_dict.update(subdict_1)
-        merged_dict.update(subdict_2)
-
-        return json.dumps(merged_dict)
-    
-    def _divide_and_conquer(self, contents: str) -> str:
-        subcontents_1 = contents[0:len(contents)//2]
-        subcontents_2 = contents[len(contents)//2:len(contents)]
-
-
-
-        
+    def _get_bisection_context(self) -> str:
+        return ResponseCache.make_key(self._model_data.to_dict(), self._get_system_instruction())
 
+    def get_bisection_stats(self) -> dict:
+        return self._bisection.stats.to_dict()
 
     def _clean_gemini_response(self, response_text: str) -> str:
         """
@@ -197,10 +816,28 @@ class TranslateCore:
             text = text[8:].strip()
         if text.endswith("```"):
             text = text[:-3].strip()
-
-        self.escape_special_chars_in_json_string_safe(text)
             
         return text
+
+    def parse_json_response(self, response_text: str) -> dict:
+        """
+        Parses a JSON object response as leniently as possible.
+        Falls back to escaping stray special characters, and finally to salvaging every
+        complete key/value pair, so a partly broken or truncated reply is not lost entirely.
+        """
+        try:
+            data = json.loads(response_text)
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+        try:
+            data = json.loads(self.escape_special_chars_in_json_string_safe(response_text))
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+        return salvage_json_object(response_text)
     
     def escape_special_chars_in_json_string_safe(self, s: str) -> str:
         """
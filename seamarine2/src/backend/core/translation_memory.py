@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from utils.text_dedup import dedup_key
+
+def normalize_segment(text: str) -> str:
+    # Whitespace only, like in-book dedup: NFKC would make "……" an exact hit for "......".
+    # Lines that differ in punctuation are left to lookup_fuzzy().
+    return dedup_key(text)
+
+def segment_grams(text: str, n: int = 3) -> set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def glossary_version(text: str, glossary: dict[str, str]) -> str:
+    """
+    Hash of the glossary entries that occur in text (by source or, once the
+    dictionary was applied to the book, by target), so a line is only reused
+    under the same names. Lines without any glossary term get "".
+    """
+    entries = sorted((k, v) for k, v in glossary.items() if k and (k in text or (v and v in text)))
+    if not entries:
+        return ""
+    return hashlib.sha256(json.dumps(entries, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+class FuzzyMatch:
+    """
+    A stored segment similar to a queried line; score is the Dice coefficient of their character trigrams.
+    """
+
+    def __init__(self, score: float, source: str, target: str, same_glossary: bool):
+        self.score = score
+        self.source = source
+        self.target = target
+        self.same_glossary = same_glossary
+
+
+class TranslationMemory:
+    """
+    Persistent translation memory shared by every book, backed by SQLite.
+
+    Segments are keyed by normalized source text, language pair and the
+    version of the glossary entries they contain. Finished books are added
+    with add(); lookup() returns exact matches so they can be filled in before
+    chunking and never reach the API.
+
+    lookup_fuzzy() finds near-identical segments through an inverted index of
+    character trigrams (segment_grams, clustered by trigram, with document
+    frequencies in gram_df). Only the rarest trigrams of a line are probed:
+    any segment reaching the Dice threshold must share at least one of them,
+    so the lookup touches a few short posting lists even in a TM of millions
+    of segments, and only the best candidates are scored.
+    """
+
+    LOOKUP_BATCH = 500
+    GRAM_SIZE = 3
+    MAX_POSTINGS = 2000
+    MAX_CANDIDATES = 50
+    INDEX_VERSION = 2
+
+    def __init__(self, path: str):
+        self._logger = logging.getLogger("seamarine_translate")
+        self._path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "source_norm TEXT NOT NULL, language_pair TEXT NOT NULL, glossary_version TEXT NOT NULL, "
+            "source TEXT NOT NULL, target TEXT NOT NULL, uses INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL, "
+            "PRIMARY KEY (source_norm, language_pair, glossary_version))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segment_grams ("
+            "gram TEXT NOT NULL, segment_id INTEGER NOT NULL, PRIMARY KEY (gram, segment_id)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS gram_df (gram TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID")
+        self._conn.commit()
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 2:
+            self._renormalize_sources()
+        if version < self.INDEX_VERSION:
+            self._rebuild_gram_index()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, source: str, glossary: dict[str, str]) -> tuple[str, str]:
+        return normalize_segment(source), glossary_version(source, glossary)
+
+    def lookup(self, text_dict: dict, language_pair: str, glossary: dict[str, str] | None = None) -> dict:
+        """
+        Returns {id: stored translation} for every entry of text_dict with an exact match.
+        """
+        glossary = glossary or {}
+        keys: dict[tuple[str, str], list] = {}
+        for doc_id, source in text_dict.items():
+            if isinstance(source, str) and source.strip():
+                keys.setdefault(self._key(source, glossary), []).append(doc_id)
+        found: dict[tuple[str, str], str] = {}
+        norms = list({norm for norm, _ in keys})
+        with self._lock:
+            for i in range(0, len(norms), self.LOOKUP_BATCH):
+                batch = norms[i:i + self.LOOKUP_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT source_norm, glossary_version, target FROM segments "
+                    f"WHERE language_pair = ? AND source_norm IN ({','.join('?' * len(batch))})",
+                    [language_pair, *batch]
+                ).fetchall()
+                found.update({(norm, version): target for norm, version, target in rows if (norm, version) in keys})
+            if found:
+                self._conn.executemany(
+                    "UPDATE segments SET uses = uses + 1 WHERE source_norm = ? AND language_pair = ? AND glossary_version = ?",
+                    [(norm, language_pair, version) for norm, version in found]
+                )
+                self._conn.commit()
+        result = {doc_id: found[key] for key, doc_ids in keys.items() if key in found for doc_id in doc_ids}
+        self.hits += len(result)
+        self.misses += len(text_dict) - len(result)
+        self._logger.info(str(self) + f".lookup -> {len(result)} of {len(text_dict)} lines found ({language_pair})")
+        return result
+
+    def add(self, source_dict: dict, target_dict: dict, language_pair: str, glossary: dict[str, str] | None = None) -> int:
+        """
+        Stores every translated line of a finished book; newer translations replace older ones.
+        """
+        glossary = glossary or {}
+        now = time.time()
+        rows = []
+        for doc_id, target in target_dict.items():
+            source = source_dict.get(doc_id)
+            if not isinstance(source, str) or not isinstance(target, str) or not source.strip() or not target.strip():
+                continue
+            norm, version = self._key(source, glossary)
+            rows.append((norm, language_pair, version, source, target, now))
+        with self._lock:
+            for norm, pair, version, source, target, updated in rows:
+                row = self._conn.execute(
+                    "SELECT rowid FROM segments WHERE source_norm = ? AND language_pair = ? AND glossary_version = ?",
+                    (norm, pair, version)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE segments SET source = ?, target = ?, updated = ? WHERE rowid = ?",
+                        (source, target, updated, row[0])
+                    )
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT INTO segments (source_norm, language_pair, glossary_version, source, target, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                    (norm, pair, version, source, target, updated)
+                )
+                self._index_grams(cursor.lastrowid, norm)
+            self._conn.commit()
+        self._logger.info(str(self) + f".add -> {len(rows)} lines stored ({language_pair})")
+        return len(rows)
+
+    def _index_grams(self, segment_id: int, norm: str):
+        grams = segment_grams(norm, self.GRAM_SIZE)
+        self._conn.executemany("INSERT OR IGNORE INTO segment_grams (gram, segment_id) VALUES (?, ?)", [(gram, segment_id) for gram in grams])
+        self._conn.executemany(
+            "INSERT INTO gram_df (gram, df) VALUES (?, 1) ON CONFLICT (gram) DO UPDATE SET df = df + 1",
+            [(gram,) for gram in grams]
+        )
+
+    def _renormalize_sources(self):
+        """
+        Re-keys segments stored by earlier versions, which folded the source with NFKC.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT rowid, source FROM segments").fetchall()
+            self._conn.executemany(
+                "UPDATE OR REPLACE segments SET source_norm = ? WHERE rowid = ?",
+                [(normalize_segment(source), rowid) for rowid, source in rows]
+            )
+            self._conn.commit()
+        self._logger.info(str(self) + f"._renormalize_sources -> {len(rows)} segments")
+
+    def _rebuild_gram_index(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM segment_grams")
+            self._conn.execute("DELETE FROM gram_df")
+            for segment_id, norm in self._conn.execute("SELECT rowid, source_norm FROM segments").fetchall():
+                self._index_grams(segment_id, norm)
+            self._conn.execute(f"PRAGMA user_version = {self.INDEX_VERSION}")
+            self._conn.commit()
+        self._logger.info(str(self) + "._rebuild_gram_index")
+
+    def lookup_fuzzy(self, text_dict: dict, language_pair: str, threshold: float = 0.75, glossary: dict[str, str] | None = None) -> dict:
+        """
+        Returns {id: FuzzyMatch} with the most similar stored segment for every line of text_dict
+        that has one with a score of at least threshold.
+        """
+        glossary = glossary or {}
+        result = {}
+        with self._lock:
+            for doc_id, source in text_dict.items():
+                if not isinstance(source, str):
+                    continue
+                norm, version = self._key(source, glossary)
+                match = self._best_match(norm, language_pair, threshold)
+                if match:
+                    score, matched_source, target, matched_version = match
+                    result[doc_id] = FuzzyMatch(score, matched_source, target, matched_version == version)
+        self._logger.info(str(self) + f".lookup_fuzzy -> {len(result)} of {len(text_dict)} lines matched ({language_pair})")
+        return result
+
+    def _best_match(self, norm: str, language_pair: str, threshold: float) -> tuple[float, str, str, str] | None:
+        grams = segment_grams(norm, self.GRAM_SIZE)
+        if not grams:
+            return None
+        placeholders = ','.join('?' * len(grams))
+        df = dict(self._conn.execute(f"SELECT gram, df FROM gram_df WHERE gram IN ({placeholders})", list(grams)).fetchall())
+        # Dice >= t needs an overlap of at least t / (2 - t) of the query's trigrams (prefix filtering).
+        min_overlap = max(1, math.ceil(threshold * len(grams) / (2 - threshold) - 1e-9))
+        known = sorted((gram for gram in grams if gram in df), key=df.get)
+        if len(known) < min_overlap:
+            return None
+        probe = known[:len(known) - min_overlap + 1]
+        hits: dict[int, int] = {}
+        for gram in probe:
+            for (segment_id,) in self._conn.execute(
+                "SELECT segment_id FROM segment_grams WHERE gram = ? LIMIT ?", (gram, self.MAX_POSTINGS)
+            ):
+                hits[segment_id] = hits.get(segment_id, 0) + 1
+        if not hits:
+            return None
+        candidates = sorted(hits, key=hits.get, reverse=True)[:self.MAX_CANDIDATES]
+        rows = self._conn.execute(
+            f"SELECT source_norm, source, target, glossary_version FROM segments "
+            f"WHERE language_pair = ? AND rowid IN ({','.join('?' * len(candidates))})",
+            [language_pair, *candidates]
+        ).fetchall()
+        best = None
+        for candidate_norm, source, target, version in rows:
+            candidate_grams = segment_grams(candidate_norm, self.GRAM_SIZE)
+            score = 2 * len(grams & candidate_grams) / (len(grams) + len(candidate_grams))
+            if score >= threshold and (best is None or score > best[0]):
+                best = (score, source, target, version)
+        return best
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -8,6 +8,7 @@ class AiModelConfig:
         self.frequency_penalty: float = 0.0
         self.thinking_budget: int = 0
         self.use_thinking_budget: bool = False
+        self.fallback_models: list[str] = []
 
     def load(self, data: dict):
         self.data = data
@@ -20,6 +21,7 @@ class AiModelConfig:
         self.frequency_penalty = data.get('frequency_penalty', 0.0)
         self.thinking_budget = data.get('thinking_budget', 0)
         self.use_thinking_budget = data.get('use_thinking_budget', False)
+        self.fallback_models = data.get('fallback_models', [])
 
     def to_dict(self):
         return {
@@ -29,5 +31,6 @@ class AiModelConfig:
             'top_p': self.top_p,
             'frequency_penalty': self.frequency_penalty,
             'thinking_budget': self.thinking_budget,
-            'use_thinking_budget': self.use_thinking_budget
+            'use_thinking_budget': self.use_thinking_budget,
+            'fallback_models': self.fallback_models
         }
\ No newline at end of file
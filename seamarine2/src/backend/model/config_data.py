@@ -5,10 +5,35 @@ class ConfigData:
         self.version: str = ''
         self.data: dict = {}
         self.gemini_api_key: str = ''
+        self.extra_gemini_api_keys: list[str] = []
+        self.gemini_base_url: str = ''
         self.translate_pipeline: list[str] = ["ruby removal", "main translation", "review"]
         self.max_chunk_size: int = 4096
+        self.max_chunk_tokens: int = 2560
         self.max_concurrent_request: int = 1
-        self.request_delay: int = 0
+        self.adaptive_concurrency: bool = True
+        self.max_adaptive_concurrency: int = 32
+        self.free_tier: bool = False
+        self.rate_limits: dict[str, dict] = {}
+        self.retry_policy: dict = {}
+        self.response_cache_enabled: bool = True
+        self.response_cache_max_mb: int = 512
+        self.translation_memory_enabled: bool = True
+        self.fuzzy_match_threshold: float = 0.75
+        self.fuzzy_autofill_threshold: float = 0.97
+        self.context_cache_enabled: bool = False
+        self.context_cache_ttl: int = 3600
+        self.structured_output: bool = True
+        self.batch_mode: bool = False
+        self.stream_responses: bool = False
+        self.hedging_enabled: bool = False
+        self.hedge_percentile: float = 95
+        self.hedge_budget_percent: float = 5
+        self.circuit_breaker_threshold: int = 5
+        self.circuit_breaker_reset: float = 30
+        self.call_trace_mode: str = 'off'
+        self.call_trace_path: str = ''
+        self.call_trace_speed: float = 1.0
         self.pn_extract_model_config: AiModelConfig = AiModelConfig()
         self.main_translate_model_config: AiModelConfig = AiModelConfig()
         self.toc_translate_model_config: AiModelConfig = AiModelConfig()
@@ -19,10 +44,35 @@ class ConfigData:
         self.data = data
         self.version = self.data.get('current_version', '')
         self.gemini_api_key = self.data.get('gemini_api_key', '')
+        self.extra_gemini_api_keys = self.data.get('extra_gemini_api_keys', [])
+        self.gemini_base_url = self.data.get('gemini_base_url', '')
         self.translate_pipeline = self.data.get('translate_pipeline', ["ruby removal", "main translation", "review"])
         self.max_chunk_size = self.data.get('max_chunk_size', 4096)
+        self.max_chunk_tokens = self.data.get('max_chunk_tokens', 2560)
         self.max_concurrent_request = self.data.get('max_concurrent_request', 1)
-        self.request_delay = self.data.get('request_delay', 0)
+        self.adaptive_concurrency = self.data.get('adaptive_concurrency', True)
+        self.max_adaptive_concurrency = self.data.get('max_adaptive_concurrency', 32)
+        self.free_tier = self.data.get('free_tier', False)
+        self.rate_limits = self.data.get('rate_limits', {})
+        self.retry_policy = self.data.get('retry_policy', {})
+        self.response_cache_enabled = self.data.get('response_cache_enabled', True)
+        self.response_cache_max_mb = self.data.get('response_cache_max_mb', 512)
+        self.translation_memory_enabled = self.data.get('translation_memory_enabled', True)
+        self.fuzzy_match_threshold = self.data.get('fuzzy_match_threshold', 0.75)
+        self.fuzzy_autofill_threshold = self.data.get('fuzzy_autofill_threshold', 0.97)
+        self.context_cache_enabled = self.data.get('context_cache_enabled', False)
+        self.context_cache_ttl = self.data.get('context_cache_ttl', 3600)
+        self.structured_output = self.data.get('structured_output', True)
+        self.batch_mode = self.data.get('batch_mode', False)
+        self.stream_responses = self.data.get('stream_responses', False)
+        self.hedging_enabled = self.data.get('hedging_enabled', False)
+        self.hedge_percentile = self.data.get('hedge_percentile', 95)
+        self.hedge_budget_percent = self.data.get('hedge_budget_percent', 5)
+        self.circuit_breaker_threshold = self.data.get('circuit_breaker_threshold', 5)
+        self.circuit_breaker_reset = self.data.get('circuit_breaker_reset', 30)
+        self.call_trace_mode = self.data.get('call_trace_mode', 'off')
+        self.call_trace_path = self.data.get('call_trace_path', '')
+        self.call_trace_speed = self.data.get('call_trace_speed', 1.0)
         self.pn_extract_model_config.load(data.get('pn_extract_model_config', {}))
         self.main_translate_model_config.load(data.get('main_translate_model_config', {}))
         self.toc_translate_model_config.load(data.get('toc_translate_model_config', {}))
@@ -33,10 +83,35 @@ class ConfigData:
         return {
             'current_version': self.version,
             'gemini_api_key': self.gemini_api_key,
+            'extra_gemini_api_keys': self.extra_gemini_api_keys,
+            'gemini_base_url': self.gemini_base_url,
             'translate_pipeline': self.translate_pipeline,
             'max_chunk_size': self.max_chunk_size,
+            'max_chunk_tokens': self.max_chunk_tokens,
             'max_concurrent_request': self.max_concurrent_request,
-            'request_delay': self.request_delay,
+            'adaptive_concurrency': self.adaptive_concurrency,
+            'max_adaptive_concurrency': self.max_adaptive_concurrency,
+            'free_tier': self.free_tier,
+            'rate_limits': self.rate_limits,
+            'retry_policy': self.retry_policy,
+            'response_cache_enabled': self.response_cache_enabled,
+            'response_cache_max_mb': self.response_cache_max_mb,
+            'translation_memory_enabled': self.translation_memory_enabled,
+            'fuzzy_match_threshold': self.fuzzy_match_threshold,
+            'fuzzy_autofill_threshold': self.fuzzy_autofill_threshold,
+            'context_cache_enabled': self.context_cache_enabled,
+            'context_cache_ttl': self.context_cache_ttl,
+            'structured_output': self.structured_output,
+            'batch_mode': self.batch_mode,
+            'stream_responses': self.stream_responses,
+            'hedging_enabled': self.hedging_enabled,
+            'hedge_percentile': self.hedge_percentile,
+            'hedge_budget_percent': self.hedge_budget_percent,
+            'circuit_breaker_threshold': self.circuit_breaker_threshold,
+            'circuit_breaker_reset': self.circuit_breaker_reset,
+            'call_trace_mode': self.call_trace_mode,
+            'call_trace_path': self.call_trace_path,
+            'call_trace_speed': self.call_trace_speed,
             'pn_extract_model_config': self.pn_extract_model_config.to_dict(),
             'main_translate_model_config': self.main_translate_model_config.to_dict(),
             'toc_translate_model_config': self.toc_translate_model_config.to_dict(),
@@ -147,8 +147,7 @@ class AdvancedModeViewModel(QObject):
                 self._runtime_data.file,
                 self._runtime_data.pn_dict_file,
                 self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_concurrent_request
             )
             self.pn_extractor.progress.connect(self.set_progress)
             self.pn_extractor.finished.connect(self.setPnExtractFalse)
@@ -192,9 +191,10 @@ class AdvancedModeViewModel(QObject):
                 proper_noun,
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
-                self._config_data.max_chunk_size,
+                self._config_data.max_chunk_tokens,
                 self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.batch_mode,
+                self._config_data.stream_responses
             )
             self.main_translator.progress.connect(self.set_progress)
             self.main_translator.finished.connect(self.setMainTranslateFalse)
@@ -231,9 +231,8 @@ class AdvancedModeViewModel(QObject):
                 proper_noun,
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
-                self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_chunk_tokens,
+                self._config_data.max_concurrent_request
             )
             self.toc_translator.progress.connect(self.set_progress)
             self.toc_translator.finished.connect(self.setTocTranslateFalse)
@@ -271,9 +270,8 @@ class AdvancedModeViewModel(QObject):
                 proper_noun,
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
-                self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_chunk_tokens,
+                self._config_data.max_concurrent_request
             )
             self.reviewer.progress.connect(self.set_progress)
             self.reviewer.finished.connect(self.setReviewFalse)
@@ -311,8 +309,7 @@ class AdvancedModeViewModel(QObject):
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
                 self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_concurrent_request
             )
             self.languageMerger.progress.connect(self.set_progress)
             self.languageMerger.finished.connect(self.setDualLanguageFalse)
@@ -351,8 +348,7 @@ class AdvancedModeViewModel(QObject):
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
                 self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_concurrent_request
             )
             self.image_annotater.progress.connect(self.set_progress)
             self.image_annotater.finished.connect(self.setImageTranslateFalse)
@@ -2,7 +2,7 @@ from PySide6.QtCore import QObject, Slot, Signal, Property
 from backend.controller.app_controller import AppController
 from logger_config import setup_logger
 from backend.model import ConfigData
-from utils.config import get_default_config, save_config, load_config
+from utils.config import get_default_config, save_config, load_config, get_rate_limits
 
 class GeneralSettingViewModel(QObject):
     def __init__(self, config_data: ConfigData, runtime_data, app_controller, parent=None):
@@ -13,9 +13,9 @@ class GeneralSettingViewModel(QObject):
             self.runtime_data = runtime_data
             self.app_controller: AppController = app_controller
 
-            self.max_chunk_size = config_data.max_chunk_size
+            self.max_chunk_tokens = config_data.max_chunk_tokens
             self.max_concurrent_request = config_data.max_concurrent_request
-            self.request_delay = config_data.request_delay
+            self.free_tier = config_data.free_tier
             self.is_save_succeed = False
             self.is_save_failed = False
 
@@ -23,20 +23,23 @@ class GeneralSettingViewModel(QObject):
         except Exception as e:
             self.logger.error(str(self) + str(e))
     
-    maxChunkSizeChanged = Signal()
-    @Property(int, notify=maxChunkSizeChanged)
-    def maxChunkSize(self):
-        return self.max_chunk_size
+    maxChunkTokensChanged = Signal()
+    @Property(int, notify=maxChunkTokensChanged)
+    def maxChunkTokens(self):
+        return self.max_chunk_tokens
     
     maxConcurrentRequestChanged = Signal()
     @Property(int, notify=maxConcurrentRequestChanged)
     def maxConcurrentRequest(self):
         return self.max_concurrent_request
     
-    requestDelayChanged = Signal()
-    @Property(int, notify=requestDelayChanged)
-    def requestDelay(self):
-        return self.request_delay
+    freeTierChanged = Signal()
+    def setFreeTier(self, value: bool):
+        self.free_tier = value
+        self.freeTierChanged.emit()
+    def getFreeTier(self) -> bool:
+        return self.free_tier
+    freeTier = Property(bool, getFreeTier, setFreeTier, notify=freeTierChanged)
     
     saveSucceedChanged = Signal()
     @Property(bool, notify=saveSucceedChanged)
@@ -51,30 +54,34 @@ class GeneralSettingViewModel(QObject):
     @Slot()
     def open_guide_link(self):
         pass
-    @Slot(int, int, int)
-    def save_data(self, chunk_size, conrequest, delay):
+    @Slot(int, int)
+    def save_data(self, chunk_tokens, conrequest):
         try:
-            if chunk_size < 1000 or chunk_size > 65536:
-                raise Exception(f"Invalid max chunk size detected ({chunk_size})")
+            if chunk_tokens < 256 or chunk_tokens > 32768:
+                raise Exception(f"Invalid max chunk tokens detected ({chunk_tokens})")
             if conrequest < 1 or conrequest > 99:
                 raise Exception(f"Invalid max concurrent request detected ({conrequest})")
-            if delay < 0 or delay > 99:
-                raise Exception(f"Invalid request delay detected ({delay})")
-            self.config_data.max_chunk_size = chunk_size
+            self.config_data.max_chunk_tokens = chunk_tokens
             self.config_data.max_concurrent_request = conrequest
-            self.config_data.request_delay = delay
-            self.max_chunk_size = chunk_size
+            self.config_data.free_tier = self.free_tier
+            self.max_chunk_tokens = chunk_tokens
             self.max_concurrent_request = conrequest
-            self.request_delay = delay
-            self.maxChunkSizeChanged.emit()
+            self.maxChunkTokensChanged.emit()
             self.maxConcurrentRequestChanged.emit()
-            self.requestDelayChanged.emit()
             save_config(self.config_data.to_dict())
+            self.app_controller.translate_core.configure_concurrency(
+                self.config_data.max_concurrent_request,
+                self.config_data.max_adaptive_concurrency,
+                self.config_data.adaptive_concurrency
+            )
+            self.app_controller.translate_core.update_rate_limits(
+                get_rate_limits(self.config_data.free_tier, self.config_data.rate_limits)
+            )
             self.is_save_succeed = True
             self.is_save_failed = False
             self.saveSucceedChanged.emit()
             self.saveFailedChanged.emit()
-            self.logger.info(str(self) + f".save_data({chunk_size}, {conrequest}, {delay})")
+            self.logger.info(str(self) + f".save_data({chunk_tokens}, {conrequest}, {self.free_tier})")
         except Exception as e:
             self.is_save_succeed = False
             self.is_save_failed = True
@@ -84,14 +91,14 @@ class GeneralSettingViewModel(QObject):
     @Slot()
     def close(self):
         try:
-            self.max_chunk_size = self.config_data.max_chunk_size
+            self.max_chunk_tokens = self.config_data.max_chunk_tokens
             self.max_concurrent_request = self.config_data.max_concurrent_request
-            self.request_delay = self.config_data.request_delay
+            self.free_tier = self.config_data.free_tier
             self.is_save_succeed = False
             self.is_save_failed = False
-            self.maxChunkSizeChanged.emit()
+            self.maxChunkTokensChanged.emit()
             self.maxConcurrentRequestChanged.emit()
-            self.requestDelayChanged.emit()
+            self.freeTierChanged.emit()
             self.app_controller.popCurrentPage.emit()
             self.saveSucceedChanged.emit()
             self.saveFailedChanged.emit()
@@ -103,14 +110,14 @@ class GeneralSettingViewModel(QObject):
     def set_default(self, property: str):
         try:
             if 'chunk' in property:
-                self.max_chunk_size = get_default_config().get('max_chunk_size')
-                self.maxChunkSizeChanged.emit()
+                self.max_chunk_tokens = get_default_config().get('max_chunk_tokens')
+                self.maxChunkTokensChanged.emit()
             elif 'con' in property:
                 self.max_concurrent_request = get_default_config().get('max_concurrent_request')
                 self.maxConcurrentRequestChanged.emit()
-            elif 'delay' in property:
-                self.request_delay = get_default_config().get('request_delay')
-                self.requestDelayChanged.emit()
+            elif 'tier' in property:
+                self.free_tier = get_default_config().get('free_tier')
+                self.freeTierChanged.emit()
             else:
                 raise Exception(f"Undefined behavior of defaulting property ({property})")
             self.logger.info(str(self) + f".set_default({property})")
@@ -167,8 +167,7 @@ class HomeViewModel(QObject):
                 self._runtime_data.file,
                 self._runtime_data.pn_dict_file,
                 self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_concurrent_request
             )
             self.pn_extractor.progress.connect(self.set_progress)
             self.pn_extractor.finished.connect(self.pn_extractor.quit)
@@ -224,9 +223,10 @@ class HomeViewModel(QObject):
                 proper_noun,
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
-                self._config_data.max_chunk_size,
+                self._config_data.max_chunk_tokens,
                 self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.batch_mode,
+                self._config_data.stream_responses
             )
             self.main_translator.progress.connect(self.set_progress)
             self.main_translator.completed.connect(self.updateTargetFile)
@@ -268,9 +268,8 @@ class HomeViewModel(QObject):
                 proper_noun,
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
-                self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_chunk_tokens,
+                self._config_data.max_concurrent_request
             )
             self.toc_translator.progress.connect(self.set_progress)
             self.toc_translator.completed.connect(self.updateTargetFile)
@@ -312,9 +311,8 @@ class HomeViewModel(QObject):
                 proper_noun,
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
-                self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_chunk_tokens,
+                self._config_data.max_concurrent_request
             )
             self.reviewer.progress.connect(self.set_progress)
             self.reviewer.completed.connect(self.updateTargetFile)
@@ -357,8 +355,7 @@ class HomeViewModel(QObject):
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
                 self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_concurrent_request
             )
             self.languageMerger.progress.connect(self.set_progress)
             self.languageMerger.completed.connect(self.updateTargetFile)
@@ -401,8 +398,7 @@ class HomeViewModel(QObject):
                 self._runtime_data.file,
                 self._runtime_data.save_directory,
                 self._config_data.max_chunk_size,
-                self._config_data.max_concurrent_request,
-                self._config_data.request_delay
+                self._config_data.max_concurrent_request
             )
             self.image_annotater.progress.connect(self.set_progress)
             self.image_annotater.completed.connect(self.updateTargetFile)
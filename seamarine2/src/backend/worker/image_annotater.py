@@ -27,8 +27,7 @@ class ImageAnnotater(QThread):
             file_path: str,
             save_directory: str,
             max_chunk_size: int,
-            max_concurrent_request: int,
-            request_delay: int
+            max_concurrent_request: int
             ):
         super().__init__()
         self._logger = logging.getLogger("seamarine_translate")
@@ -39,7 +38,6 @@ class ImageAnnotater(QThread):
         self._save_directory = save_directory
         self._max_chunk_size = max_chunk_size
         self._max_concurrent_request = max_concurrent_request
-        self._request_delay = request_delay
         self._logger.info("[ImageAnnotater.init]: Thread Initialized")
 
     def run(self):
@@ -64,7 +62,8 @@ class ImageAnnotater(QThread):
             raise
 
         self._core.update_model_data(self._model_data)
-        self._core.language_from = book.get_language()
+        self._core.set_glossary(self._proper_noun)
+        self._core.language_from = book.get_original_language()
         self._logger.info(f"[MainTranslator._execute]: TranslateCore Setup Completed")
 
         for idx, chap in enumerate(chapter_files):
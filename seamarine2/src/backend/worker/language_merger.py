@@ -24,8 +24,7 @@ class LanguageMerger(QThread):
             file_path: str,
             save_directory: str,
             max_chunk_size: int,
-            max_concurrent_request: int,
-            request_delay: int
+            max_concurrent_request: int
             ):
         super().__init__()
         self._logger = logging.getLogger("seamarine_translate")
@@ -36,7 +35,6 @@ class LanguageMerger(QThread):
         self._save_directory = save_directory
         self._max_chunk_size = max_chunk_size
         self._max_concurrent_request = max_concurrent_request
-        self._request_delay = request_delay
         self._logger.info("[LanguageMerger.init]: Thread Initialized")
         
         
@@ -1,15 +1,15 @@
 from PySide6.QtCore import Signal, QThread
-from backend.core import TranslateCore
+from backend.core import TranslateCore, ChunkRunner, ChunkReconciler, BatchJobRunner, GeminiBatchBackend
+from backend.core.project_store import ProjectStore, SCOPE_BODY, STATUS_PENDING
 import logging
 from backend.model import AiModelConfig, LineData, save_line_data_to_csv
 import utils
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
 import html
 import time
+import asyncio
 import os
-import json
 import ast
 from enum import Enum
 import copy
@@ -25,9 +25,10 @@ class MainTranslator(QThread):
             proper_noun: dict[str, str],
             file_path: str,
             save_directory: str,
-            max_chunk_size: int,
+            max_chunk_tokens: int,
             max_concurrent_request: int,
-            request_delay: int
+            batch_mode: bool = False,
+            stream_responses: bool = False
             ):
         super().__init__()
         self._logger = logging.getLogger("seamarine_translate")
@@ -36,9 +37,14 @@ class MainTranslator(QThread):
         self._proper_noun = proper_noun
         self._file_path = file_path
         self._save_directory = save_directory
-        self._max_chunk_size = max_chunk_size
+        self._max_chunk_tokens = max_chunk_tokens
         self._max_concurrent_request = max_concurrent_request
-        self._request_delay = request_delay
+        self._batch_mode = batch_mode
+        self._stream_responses = stream_responses
+        self._attempt = 1
+        self._lines_total = 0
+        self._lines_resolved: set[str] = set()
+        self._fuzzy_hints: dict[str, tuple[str, str]] = {}
         self._logger.info("[MainTranslator.init]: Thread Initialized")
         
         
@@ -53,6 +59,8 @@ class MainTranslator(QThread):
         except Exception:
             self._logger.exception("[MainTranslator.run]: Task Failed")
             self.progress.emit(0)
+        finally:
+            self._core.release_context_caches()
 
     def _execute(self, attempt):
         ## Load Epub ##
@@ -105,7 +113,8 @@ To prevent errors, all string values inside the JSON MUST be correctly escaped.
 Before you finalize your response, double-check that the entire output is a single block of valid JSON code and that all string content adheres to these escaping rules.
 """.strip() + '\n\n' + ai_model_data.system_prompt
         self._core.update_model_data(ai_model_data)
-        self._core.language_from = book.get_language()
+        self._core.set_glossary(self._proper_noun)
+        self._core.language_from = book.get_original_language()
         self._logger.info(f"[MainTranslator._execute]: TranslateCore Setup Completed")
 
         book.override_original_chapter()
@@ -128,58 +137,80 @@ Before you finalize your response, double-check that the entire output is a sing
         ## Save Extracted Texts ##
         working_dir_name, _ = os.path.splitext(os.path.basename(self._file_path))
         working_dir = os.path.join(self._save_directory, working_dir_name)
-        original_dir = os.path.join(working_dir, "original")
         translated_dir = os.path.join(working_dir, "translated")
-        os.makedirs(translated_dir, exist_ok=True)
-        os.makedirs(original_dir, exist_ok=True)
-        with open(os.path.join(original_dir, "text_dict.json"), "w", encoding='utf-8') as f:
-            json.dump(text_dict, f, ensure_ascii=False)
+        store = ProjectStore(os.path.join(working_dir, "project.sqlite3"))
+        chapters = {k: chapter_file for chapter_file, xhtml in xhtmls.items() for k in xhtml.text_dict}
+        store.sync_sources(SCOPE_BODY, text_dict, chapters)
         self._logger.info(f"[MainTranslator._execute]: Saved Extraction")
 
         ## Load Prework ##
-        if os.path.exists(os.path.join(translated_dir, "text_dict.json")):
-            with open(os.path.join(translated_dir, "text_dict.json"), "r", encoding="utf-8") as f:
-                translated_text_dict = json.load(f)
-        else:
-            translated_text_dict = {}
-     
+        store.import_legacy(SCOPE_BODY, os.path.join(translated_dir, "text_dict.json"))
+
         ## Load Unfinished Work ##
-        untranslated_text_dict = {k: v for k, v in text_dict.items() if k not in translated_text_dict.keys()}
+        untranslated_text_dict = {k: text_dict[k] for k in store.get_ids(SCOPE_BODY, STATUS_PENDING) if k in text_dict}
         self._logger.info(f"Found {len(untranslated_text_dict)} Lines To Translate")
 
+        ## Translation Memory ##
+        memory_hits = self._core.lookup_translation_memory(untranslated_text_dict)
+        if memory_hits:
+            store.save_translations(SCOPE_BODY, memory_hits, "translation_memory")
+            untranslated_text_dict = {k: v for k, v in untranslated_text_dict.items() if k not in memory_hits}
+            self._logger.info(f"Filled {len(memory_hits)} Lines From Translation Memory")
+
+        ## Fuzzy Translation Memory ##
+        fuzzy_fills, self._fuzzy_hints = self._core.lookup_fuzzy_translation_memory(untranslated_text_dict)
+        if fuzzy_fills:
+            store.save_translations(SCOPE_BODY, fuzzy_fills, "translation_memory")
+            untranslated_text_dict = {k: v for k, v in untranslated_text_dict.items() if k not in fuzzy_fills}
+        self._logger.info(f"Filled {len(fuzzy_fills)} Lines From Fuzzy Matches, {len(self._fuzzy_hints)} Lines Get Hints")
+
+        ## Deduplication ##
+        untranslated_text_dict, duplicate_ids = utils.dedupe_text_dict(untranslated_text_dict)
+        self._logger.info(f"Collapsed {sum(len(ids) for ids in duplicate_ids.values())} Duplicate Lines Into {len(duplicate_ids)} Canonical Lines")
+
         ## Chunking ##
-        text_dict_chunks = utils.chunk_text_dict(untranslated_text_dict, self._max_chunk_size // (2 ** (attempt-1)))
+        text_dict_chunks = self._core.plan_chunks(untranslated_text_dict, self._max_chunk_tokens // (2 ** (attempt-1)))
+        self._attempt = attempt
+        self._lines_total = len(untranslated_text_dict)
+        self._lines_resolved = set()
 
-        ## Chunk Translation (Thread Registration) ##
-        translated_dir = os.path.join(working_dir, "translated")
-        os.makedirs(translated_dir, exist_ok=True)
-        with ThreadPoolExecutor(max_workers=self._max_concurrent_request) as executor:
-            futures = [
-                executor.submit(
-                    self._translate_text_dict_chunk,
-                    chunk,
-                    chunk_index,
-                ) for chunk_index, chunk in enumerate(text_dict_chunks)
-            ]
+        ## Chunk Translation (Batch Mode) ##
+        if self._batch_mode and attempt == 1:
+            # Lines the batch job could not translate are picked up interactively in attempt 2.
+            batch_runner = BatchJobRunner(self._core, GeminiBatchBackend(self._core.get_client()), os.path.join(working_dir, "batch"))
+            batch_results = utils.expand_text_dict(batch_runner.run(
+                text_dict_chunks,
+                lambda state: self._logger.info(f"Batch Job State: {state}")
+            ), duplicate_ids)
+            store.save_translations(SCOPE_BODY, batch_results, self._core.get_model_name())
+            text_dict_chunks = []
+            self.progress.emit(85)
+
+        ## Chunk Translation (Scheduling) ##
+        runner = ChunkRunner(self._core, self._max_concurrent_request)
         
-            ## Chunk Translation (Update) ##
-            completed = 0
-            for future in as_completed(futures):
-                success, chunk_index, translated_chunk = future.result()
-                completed += 1
-                translated_text_dict.update(translated_chunk)
-                self._logger.info(f"Translation Of Chunk{chunk_index} Success: {success}")
+        ## Chunk Translation (Update) ##
+        completed = 0
+        for success, chunk_index, translated_chunk, chunk_attempts, latency in runner.run(
+            self._translate_text_dict_chunk,
+            [(chunk, chunk_index) for chunk_index, chunk in enumerate(text_dict_chunks)],
+            is_valid=lambda result: result[0],
+            cost=lambda args: self._core.estimate_chunk_cost(args[0]),
+            resume=lambda args, result: (args[0], args[1], result)
+        ):
+            completed += 1
+            chunk_results = utils.expand_text_dict(translated_chunk, duplicate_ids)
+            self._logger.info(f"Translation Of Chunk{chunk_index} Success: {success}")
+            if not self._stream_responses:
                 self.progress.emit(int(completed / len(text_dict_chunks) * 85) if attempt == 1 else 85 + int(completed / len(text_dict_chunks) * 10))
-                translated_text_dict = dict(sorted(translated_text_dict.items()))
-                ## Save Middle Translated Lines ##
-                with open(os.path.join(translated_dir, "text_dict.json"), "w", encoding='utf-8') as f:
-                    json.dump(translated_text_dict, f)
-        
-        translated_text_dict = dict(sorted(translated_text_dict.items()))
+            ## Save Middle Translated Lines ##
+            store.save_translations(SCOPE_BODY, chunk_results, self._core.get_model_name(), utils.expand_text_dict(chunk_attempts, duplicate_ids), latency)
 
-        ## Save Final Translated Lines ##
-        with open(os.path.join(translated_dir, "text_dict.json"), "w", encoding='utf-8') as f:
-            json.dump(translated_text_dict, f, ensure_ascii=False)
+        ## Load Final Translated Lines ##
+        translated_text_dict = store.get_translations(SCOPE_BODY)
+        self._logger.info(f"Project Stats: {store.get_stats(SCOPE_BODY)}")
+        store.close()
+        self._core.add_to_translation_memory(text_dict, translated_text_dict)
         
         ## Update Epub Contents ##
         for idx, chapter_file in enumerate(chapter_files):
@@ -194,38 +225,36 @@ Before you finalize your response, double-check that the entire output is a sing
         book.save(save_path)
         self.completed.emit(save_path)
 
-    def _translate_text_dict_chunk(self, chunk: dict[int, str], chunk_index: int):
-        is_suceed: bool = True
-        translated_text_dict = {}
-        llm_contents = json.dumps(chunk, ensure_ascii=False, indent=2)
-        self._logger.info(f"Load Gemini Contents")
-
-        for i in range(3):
-            try:
-                self._logger.info(f"Chunk{chunk_index} Translation (Try {i+1})")
-                resp = self._core.generate_content(llm_contents, resp_in_json=True)
-                translated_text_dict: dict = json.loads(resp)
-                if translated_text_dict.keys() != chunk.keys():
-                    self._logger.info(f"Failed To Parse Translated Response Of Chunk{chunk_index} (Try {i+1})\n")
-                    self._logger.info(f"##### ORIGINAL #####\n\n{str(llm_contents)}\n\n##### RESPONSE #####\n\n{str(resp)}\n")
-                    if i == 2:
-                        self._logger.warning(f"Final Failiure In Chunk{chunk_index} Translation")
-                        is_suceed = False
-                    continue
-                self._logger.info(f"Updated Chunks[{chunk_index}] Data")
-                time.sleep(self._request_delay)
-                return is_suceed, chunk_index, translated_text_dict
-
-            except Exception as e:
-                if resp:
-                    self._logger.info(f"##### ORIGINAL #####\n\n{str(llm_contents)}\n\n##### RESPONSE #####\n\n{str(resp)}\n")
-                self._logger.exception(str(e))
-                if i < 2:
-                    continue
-                else:
-                    return False, chunk_index, {}
-        return False, chunk_index, {}
-    
+    async def _translate_text_dict_chunk(self, chunk: dict[int, str], chunk_index: int, previous: tuple | None = None):
+        self._logger.info(f"Chunk{chunk_index} Translation ({len(chunk)} Lines)")
+        ## Resume After An Outage (Lines Already Resolved Are Kept) ##
+        resolved, attempts = (previous[2], previous[3]) if previous else (None, None)
+        reconciler = ChunkReconciler(
+            self._core,
+            chunk,
+            f"Chunk{chunk_index}",
+            stream=self._stream_responses,
+            on_resolved=self._on_lines_resolved if self._stream_responses else None,
+            hints={k: self._fuzzy_hints[k] for k in chunk if k in self._fuzzy_hints},
+            resolved=resolved,
+            attempts=attempts
+        )
+        started_at = time.monotonic()
+        translated_text_dict = await reconciler.resolve(resp_in_json=True)
+        latency = time.monotonic() - started_at
+        if not reconciler.done:
+            self._logger.warning(f"Final Failiure In Chunk{chunk_index} Translation ({len(reconciler.pending)} Lines Left)")
+            return False, chunk_index, translated_text_dict, reconciler.attempts, latency
+        self._logger.info(f"Updated Chunks[{chunk_index}] Data ({reconciler.requests} Requests, {reconciler.resubmitted_lines} Lines Resubmitted)")
+        return True, chunk_index, translated_text_dict, reconciler.attempts, latency
+
+    def _on_lines_resolved(self, ids: list[str]):
+        ## Per-Line Progress (Streaming) ##
+        # A hedged duplicate of a chunk resolves the same ids again; count each id once.
+        self._lines_resolved.update(ids)
+        ratio = min(1.0, len(self._lines_resolved) / max(1, self._lines_total))
+        self.progress.emit(int(ratio * 85) if self._attempt == 1 else 85 + int(ratio * 10))
+
     def _apply_repeat_tags(self, text: str, min_repeat: int = 4, max_unit_len: int = 10) -> str:
         """
         주어진 텍스트에서 반복되는 문자열을 <repeat time="N">...<repeat> 형태로 감싸서 반환
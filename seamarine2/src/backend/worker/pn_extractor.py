@@ -2,15 +2,15 @@ from PySide6.QtCore import Signal, QThread
 import logging
 from backend.model import AiModelConfig
 from collections import Counter
-from backend.core import TranslateCore
+from backend.core import TranslateCore, ChunkRunner
 from ebooklib import epub
-import pycountry
+from utils.epub import Epub
 from bs4 import BeautifulSoup
 import json
 import time
+import asyncio
 import re
 import ast
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import csv
 from sudachipy import Dictionary, Morpheme
@@ -27,8 +27,7 @@ class PnExtractor(QThread):
             file_path: str, 
             save_path: str, 
             max_chunk_size: int, 
-            max_concurrent_request: int, 
-            request_delay: int
+            max_concurrent_request: int 
             ):
         super().__init__()
         self._logger = logging.getLogger("seamarine_translate")
@@ -39,7 +38,6 @@ class PnExtractor(QThread):
             self._save_path: str = save_path
             self._max_chunk_size = max_chunk_size
             self._max_concurrent_request = max_concurrent_request
-            self._request_delay = request_delay
             self._max_retries = 3
             self._proper_nouns = {}
             self._logger.info(str(self) + ".__init__")
@@ -61,6 +59,7 @@ class PnExtractor(QThread):
         self._logger.info(str(self) + "._execute")
         try:
             self._core.update_model_data(self._model_data)
+            self._core.set_glossary({})
             self._core.language_from = self._get_language()
             full_text = self._extract_text()
                 
@@ -68,16 +67,11 @@ class PnExtractor(QThread):
             chunk_count = len(chunks)
             completed = 0
 
-            with ThreadPoolExecutor(max_workers=self._max_concurrent_request) as executor:
-                futures = {
-                    executor.submit(self._process_chunk, chunk): chunk
-                    for chunk in chunks
-                }
-                for future in as_completed(futures):
-                    result = future.result()
-                    self._proper_nouns.update(result)
-                    completed += 1
-                    self.progress.emit(int(completed / chunk_count * 99))
+            runner = ChunkRunner(self._core, self._max_concurrent_request)
+            for result in runner.run(self._process_chunk, [(chunk,) for chunk in chunks]):
+                self._proper_nouns.update(result)
+                completed += 1
+                self.progress.emit(int(completed / chunk_count * 99))
             
             self._save_to_csv()
         except Exception as e:
@@ -87,26 +81,11 @@ class PnExtractor(QThread):
     def _get_language(self) -> str:
         self._logger.info(str(self) + "._get_language")
         try:
-            book = epub.read_epub(self._file_path)
-            lang_code = book.get_metadata('DC', 'language')[0][0]
-            lang_code = lang_code.lower()
-            self._logger.info(f"Detected Language: {lang_code}")
-        
-            lang = pycountry.languages.get(alpha_2=lang_code)
-            if lang:
-                return lang.name
-
-            lang = pycountry.languages.get(alpha_3=lang_code)
-            if lang:
-                return lang.name
-
-            for lang in pycountry.languages:
-                if hasattr(lang, 'bibliographic') and lang.bibliographic == lang_code:
-                    return lang.name
-                if hasattr(lang, 'terminology') and lang.terminology == lang_code:
-                    return lang.name
-            
-            raise Exception("Failed to extract text from epub")
+            lang = Epub(self._file_path).get_original_language()
+            self._logger.info(f"Detected Language: {lang}")
+            if not lang:
+                raise Exception("Failed to extract text from epub")
+            return lang
         except Exception as e:
             self._logger.error(str(self) + "._get_language\n-> " + str(e))
             raise e
@@ -170,10 +149,10 @@ class PnExtractor(QThread):
 
         return retry_seconds + extra_seconds if retry_seconds > 0 else 0
     
-    def _process_chunk(self, chunk):
+    async def _process_chunk(self, chunk):
         for attempt in range(1, self._max_retries + 1):
             try:
-                response = self._core.generate_content(chunk, True, True)
+                response = await self._core.agenerate_content(chunk, True, True, use_cache=attempt == 1)
                 if response:
                     cleaned = self._clean_response(response.strip())
                     self._logger.info(cleaned)
@@ -181,7 +160,6 @@ class PnExtractor(QThread):
                 else:
                     new_dict = {}
 
-                time.sleep(self._request_delay)
                 self._logger.info(str(self) + f"._process_chunk() -> ")
                 return new_dict
 
@@ -190,10 +168,10 @@ class PnExtractor(QThread):
                     attempt -= 1
                     dynamic_delay = self._get_retry_delay_from_exception(str(e))
                     self._logger.info(str(self) + f".process_chunk\n-> 429/Resource Exhausted Detected. Retry after {dynamic_delay} seconds")
-                    time.sleep(dynamic_delay)
+                    await asyncio.sleep(dynamic_delay)
                 else:
                     self._logger.error(f"Attempt {attempt} - Failed to parse chunk: {e}")
-                    time.sleep(5)
+                    await asyncio.sleep(5)
 
         self._logger.error("Final failure after MAX_RETRIES attempts. Returning empty dict.")
         return {}
@@ -1,17 +1,17 @@
 from PySide6.QtCore import Signal, QThread
-from backend.core import TranslateCore
+from backend.core import TranslateCore, ChunkRunner, ChunkReconciler
+from backend.core.project_store import ProjectStore, SCOPE_BODY, STATUS_TRANSLATED, STATUS_FOREIGN
 import logging
 from backend.model import AiModelConfig, LineData, save_line_data_to_csv, load_line_data_from_csv
 import utils
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
 import html
 import time
+import asyncio
 import os
 import ast
 import copy
-import json
 from enum import Enum
 
 class Reviewer(QThread):
@@ -25,9 +25,8 @@ class Reviewer(QThread):
             proper_noun: dict[str, str],
             file_path: str,
             save_directory: str,
-            max_chunk_size: int,
-            max_concurrent_request: int,
-            request_delay: int
+            max_chunk_tokens: int,
+            max_concurrent_request: int
             ):
         super().__init__()
         self._logger = logging.getLogger("seamarine_translate")
@@ -36,9 +35,8 @@ class Reviewer(QThread):
         self._proper_noun = proper_noun
         self._file_path = file_path
         self._save_directory = save_directory
-        self._max_chunk_size = max_chunk_size
+        self._max_chunk_tokens = max_chunk_tokens
         self._max_concurrent_request = max_concurrent_request
-        self._request_delay = request_delay
         self._logger.info("[Reviewer.init]: Thread Initialized")
         
         
@@ -51,6 +49,8 @@ class Reviewer(QThread):
         except Exception:
             self._logger.exception("[Reviewer.run]: Task Failed")
             self.progress.emit(0)
+        finally:
+            self._core.release_context_caches()
 
     def _execute(self):
         ## Load Epub ##
@@ -98,6 +98,7 @@ To prevent errors, all string values inside the JSON MUST be correctly escaped.
 Before you finalize your response, double-check that the entire output is a single block of valid JSON code and that all string content adheres to these escaping rules.
 """.strip() + "\n\n" + ai_model_data.system_prompt
         self._core.update_model_data(ai_model_data)
+        self._core.set_glossary(self._proper_noun)
         self._core.language_from = book.get_original_language()
         self._logger.info(f"[Reviewer._execute]: TranslateCore Setup Completed")
 
@@ -122,51 +123,49 @@ Before you finalize your response, double-check that the entire output is a sing
             ## Retrieve Translated Text Data ##
             working_dir_name, _ = os.path.splitext(os.path.basename(self._file_path))
             working_dir = os.path.join(self._save_directory, working_dir_name)
-            original_dir = os.path.join(working_dir, "original")
             translated_dir = os.path.join(working_dir, "translated")
-            if os.path.exists(os.path.join(translated_dir, "text_dict.json")):
-                with open(os.path.join(translated_dir, "text_dict.json"), "r", encoding="utf-8") as f:
-                    translated_text_dict: dict = json.load(f)
-            else:
+            store = ProjectStore(os.path.join(working_dir, "project.sqlite3"))
+            chapters = {k: chapter_file for chapter_file, xhtml in xhtmls.items() for k in xhtml.text_dict}
+            store.sync_sources(SCOPE_BODY, text_dict, chapters)
+            store.import_legacy(SCOPE_BODY, os.path.join(translated_dir, "text_dict.json"))
+            if not store.count(SCOPE_BODY, STATUS_TRANSLATED) and not store.count(SCOPE_BODY, STATUS_FOREIGN):
+                store.close()
                 raise RuntimeError("No translated text dict found")
 
-            untranslated_text_dict = { k: text_dict[k] for k, v in translated_text_dict.items() if utils.contains_foreign(v) }
+            untranslated_text_dict = {k: text_dict[k] for k in store.get_ids(SCOPE_BODY, STATUS_FOREIGN) if k in text_dict}
             self._logger.info(f"{len(untranslated_text_dict)} untranslated text lines found")
 
+            ## Deduplication ##
+            untranslated_text_dict, duplicate_ids = utils.dedupe_text_dict(untranslated_text_dict)
+
             ## Chunking ##
-            text_dict_chunks = utils.chunk_text_dict(untranslated_text_dict, int(self._max_chunk_size / (2**trial)))
+            text_dict_chunks = self._core.plan_chunks(untranslated_text_dict, int(self._max_chunk_tokens / (2**trial)))
             self._logger.info(f"{len(text_dict_chunks)} chunks ready")
 
-            ## Chunk Translation (Thread Registration) ##
-            translated_dir = os.path.join(working_dir, "translated")
-            os.makedirs(translated_dir, exist_ok=True)
-            with ThreadPoolExecutor(max_workers=self._max_concurrent_request) as executor:
-                futures = [
-                    executor.submit(
-                        self._translate_text_dict_chunk,
-                        chunk,
-                        chunk_index,
-                    ) for chunk_index, chunk in enumerate(text_dict_chunks)
-                ]
-            
-                ## Chunk Translation (Update) ##
-                completed = 0
-                for future in as_completed(futures):
-                    success, chunk_index, translated_chunk = future.result()
-                    completed += 1
-                    translated_text_dict.update(translated_chunk)
-                    self._logger.info(f"Translation Of Chunk{chunk_index} Success: {success}")
-                    self.progress.emit(int(completed / len(text_dict_chunks) * 95 * 1 / 5) + int(20 * (trial-1) / 5))
-                    translated_text_dict = dict(sorted(translated_text_dict.items()))
-                    ## Save Middle Translated Lines ##
-                    with open(os.path.join(translated_dir, "review_text_dict.json"), "w", encoding='utf-8') as f:
-                        json.dump(translated_text_dict, f)
+            ## Chunk Translation (Scheduling) ##
+            runner = ChunkRunner(self._core, self._max_concurrent_request)
             
-            translated_text_dict = dict(sorted(translated_text_dict.items()))
-
-            ## Save Final Translated Lines ##
-            with open(os.path.join(translated_dir, "text_dict.json"), "w", encoding='utf-8') as f:
-                json.dump(translated_text_dict, f, ensure_ascii=False)
+            ## Chunk Translation (Update) ##
+            completed = 0
+            for success, chunk_index, translated_chunk, chunk_attempts, latency in runner.run(
+                self._translate_text_dict_chunk,
+                [(chunk, chunk_index) for chunk_index, chunk in enumerate(text_dict_chunks)],
+                is_valid=lambda result: result[0],
+                cost=lambda args: self._core.estimate_chunk_cost(args[0]),
+                resume=lambda args, result: (args[0], args[1], result)
+            ):
+                completed += 1
+                chunk_results = utils.expand_text_dict(translated_chunk, duplicate_ids)
+                self._logger.info(f"Translation Of Chunk{chunk_index} Success: {success}")
+                self.progress.emit(int(completed / len(text_dict_chunks) * 95 * 1 / 5) + int(20 * (trial-1) / 5))
+                ## Save Middle Translated Lines ##
+                store.save_translations(SCOPE_BODY, chunk_results, self._core.get_model_name(), utils.expand_text_dict(chunk_attempts, duplicate_ids), latency)
+
+            ## Load Final Translated Lines ##
+            translated_text_dict = store.get_translations(SCOPE_BODY)
+            self._logger.info(f"Project Stats: {store.get_stats(SCOPE_BODY)}")
+            store.close()
+            self._core.add_to_translation_memory(text_dict, translated_text_dict)
             
             ## Update Epub Contents ##
             for idx, chapter_file in enumerate(chapter_files):
@@ -211,7 +210,6 @@ Before you finalize your response, double-check that the entire output is a sing
                 for i, line in enumerate(translated_lines):
                     chunk[i].translated = self._restore_repeat_tags(re.sub(r'^\[\d+\]\s*', '', line).strip())
                 self._logger.info(f"Updated Chunks[{chunk_index}] Data")
-                time.sleep(self._request_delay)
                 return is_suceed, chunk_index
             except Exception as e:
                 self._logger.exception(str(e))
@@ -301,33 +299,16 @@ Before you finalize your response, double-check that the entire output is a sing
 
         return retry_seconds + extra_seconds if retry_seconds > 0 else 0
 
-    def _translate_text_dict_chunk(self, chunk: dict[int, str], chunk_index: int):
-        is_suceed: bool = True
-        translated_text_dict = {}
-        llm_contents = json.dumps(chunk, ensure_ascii=False, indent=2)
-        self._logger.info(f"Load Gemini Contents")
-
-        for i in range(3):
-            try:
-                self._logger.info(f"Chunk{chunk_index} Translation (Try {i+1})")
-                resp = self._core.generate_content(llm_contents)
-                translated_text_dict: dict = json.loads(resp)
-                if translated_text_dict.keys() != chunk.keys():
-                    self._logger.info(f"Failed To Parse Translated Response Of Chunk{chunk_index} (Try {i+1})\n")
-                    if i == 2:
-                        self._logger.warning(f"Final Failiure In Chunk{chunk_index} Translation")
-                        is_suceed = False
-                    continue
-                self._logger.info(f"Updated Chunks[{chunk_index}] Data")
-                time.sleep(self._request_delay)
-                return is_suceed, chunk_index, translated_text_dict
-
-            except Exception as e:
-                if resp:
-                    self._logger.info(f"##### ORIGINAL #####\n\n{str(llm_contents)}\n\n##### RESPONSE #####\n\n{str(resp)}\n")
-                self._logger.exception(str(e))
-                if i < 2:
-                    continue
-                else:
-                    return False, chunk_index, {}
-        return False, chunk_index, {}
\ No newline at end of file
+    async def _translate_text_dict_chunk(self, chunk: dict[int, str], chunk_index: int, previous: tuple | None = None):
+        self._logger.info(f"Chunk{chunk_index} Translation ({len(chunk)} Lines)")
+        ## Resume After An Outage (Lines Already Resolved Are Kept) ##
+        resolved, attempts = (previous[2], previous[3]) if previous else (None, None)
+        reconciler = ChunkReconciler(self._core, chunk, f"Chunk{chunk_index}", resolved=resolved, attempts=attempts)
+        started_at = time.monotonic()
+        translated_text_dict = await reconciler.resolve(resp_in_json=True)
+        latency = time.monotonic() - started_at
+        if not reconciler.done:
+            self._logger.warning(f"Final Failiure In Chunk{chunk_index} Translation ({len(reconciler.pending)} Lines Left)")
+            return False, chunk_index, translated_text_dict, reconciler.attempts, latency
+        self._logger.info(f"Updated Chunks[{chunk_index}] Data ({reconciler.requests} Requests, {reconciler.resubmitted_lines} Lines Resubmitted)")
+        return True, chunk_index, translated_text_dict, reconciler.attempts, latency
@@ -1,16 +1,18 @@
 from ..core.translate_core import TranslateCore
+from ..core.chunk_runner import ChunkRunner
+from ..core.chunk_reconciler import ChunkReconciler
+from ..core.project_store import ProjectStore, SCOPE_TOC, STATUS_PENDING
 from ..model.ai_model_config import AiModelConfig
 from utils.epub import Epub
-from utils.translatable_xhtml import TranslatableXHTML, chunk_text_dict
+from utils.translatable_xhtml import TranslatableXHTML
 from PySide6.QtCore import Signal, QThread
 import logging
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import re
 import time
+import asyncio
 import copy
-import json
 import html
 
 class LineData:
@@ -25,7 +27,7 @@ class TocTranslator(QThread):
 
     def __init__(self, core: TranslateCore, model_data: AiModelConfig, 
                  proper_noun: dict[str, str], file_path: str, save_directory: str, 
-                 max_chunk_size: int, max_concurrent_request: int, request_delay: int):
+                 max_chunk_tokens: int, max_concurrent_request: int):
         super().__init__()
         self._logger = logging.getLogger("seamarine_translate")
         self._core = core
@@ -33,9 +35,8 @@ class TocTranslator(QThread):
         self._proper_noun = proper_noun
         self._file_path = file_path
         self._save_directory = save_directory
-        self._max_chunk_size = max_chunk_size
+        self._max_chunk_tokens = max_chunk_tokens
         self._max_concurrent_request = max_concurrent_request
-        self._request_delay = request_delay
         self._logger.info("[TocTranslator.init]: Thread Initialized")
     
     def run(self):
@@ -47,6 +48,8 @@ class TocTranslator(QThread):
         except Exception:
             self._logger.exception("[TocTranslator.run]: Task Failed")
             self.progress.emit(0)
+        finally:
+            self._core.release_context_caches()
 
 
     def _execute(self):
@@ -95,7 +98,8 @@ To prevent errors, all string values inside the JSON MUST be correctly escaped.
 Before you finalize your response, double-check that the entire output is a single block of valid JSON code and that all string content adheres to these escaping rules.
 """.strip() + "\n\n" + ai_model_data.system_prompt
         self._core.update_model_data(ai_model_data)
-        self._core.language_from = book.get_language()
+        self._core.set_glossary(self._proper_noun)
+        self._core.language_from = book.get_original_language()
         self._logger.info(f"[TocTranslator._execute]: TranslateCore Setup Completed")
         self.progress.emit(10)
 
@@ -112,53 +116,41 @@ Before you finalize your response, double-check that the entire output is a sing
         ## Save Extracted Texts ##
         working_dir_name, _ = os.path.splitext(os.path.basename(self._file_path))
         working_dir = os.path.join(self._save_directory, working_dir_name)
-        original_dir = os.path.join(working_dir, "original")
         translated_dir = os.path.join(working_dir, "translated")
-        os.makedirs(translated_dir, exist_ok=True)
-        os.makedirs(original_dir, exist_ok=True)
-        with open(os.path.join(original_dir, "toc_text_dict.json"), "w", encoding='utf-8') as f:
-            json.dump(text_dict, f)
+        store = ProjectStore(os.path.join(working_dir, "project.sqlite3"))
+        store.sync_sources(SCOPE_TOC, text_dict, {k: file for file, xhtml in xhtmls.items() for k in xhtml.text_dict})
         self._logger.info(f"[TocTranslator._execute]: Saved Extraction")
 
         ## Load Prework ##
-        if os.path.exists(os.path.join(translated_dir, "toc_text_dict.json")):
-            with open(os.path.join(translated_dir, "toc_text_dict.json"), "r", encoding='utf-8') as f:
-                translated_text_dict = json.load(f)
-        else:
-            translated_text_dict = {}
+        store.import_legacy(SCOPE_TOC, os.path.join(translated_dir, "toc_text_dict.json"))
 
         ## Load Unfinished Work ##
-        untranslated_text_dict = {k: v for k, v in text_dict.items() if k not in translated_text_dict.keys()}
+        untranslated_text_dict = {k: text_dict[k] for k in store.get_ids(SCOPE_TOC, STATUS_PENDING) if k in text_dict}
 
         ## Chunking ##
-        text_dict_chunks = chunk_text_dict(untranslated_text_dict, self._max_chunk_size)
+        text_dict_chunks = self._core.plan_chunks(untranslated_text_dict, self._max_chunk_tokens)
 
-        ## Chunk Translation (Thread Registration) ##
-        translated_dir = os.path.join(working_dir, "translated")
-        os.makedirs(translated_dir, exist_ok=True)
-        with ThreadPoolExecutor(max_workers=self._max_concurrent_request) as executor:
-            futures = [
-                executor.submit(
-                    self._translate_text_dict_chunk,
-                    chunk,
-                    chunk_index,
-                ) for chunk_index, chunk in enumerate(text_dict_chunks)
-            ]
-        
-            ## Chunk Translation (Update) ##
-            completed = 0
-            for future in as_completed(futures):
-                success, chunk_index, translated_chunk = future.result()
-                completed += 1
-                translated_text_dict.update(translated_chunk)
-                self._logger.info(f"Translation Of Chunk{chunk_index} Success: {success}")
-                self.progress.emit(int(completed / len(text_dict_chunks) * 95))
-                translated_text_dict = dict(sorted(translated_text_dict.items()))
-                ## Save Middle Translated Lines ##
-                with open(os.path.join(translated_dir, "toc_text_dict.json"), "w", encoding='utf-8') as f:
-                    json.dump(translated_text_dict, f)
+        ## Chunk Translation (Scheduling) ##
+        runner = ChunkRunner(self._core, self._max_concurrent_request)
         
-        translated_text_dict = dict(sorted(translated_text_dict.items()))
+        ## Chunk Translation (Update) ##
+        completed = 0
+        for success, chunk_index, translated_chunk, chunk_attempts, latency in runner.run(
+            self._translate_text_dict_chunk,
+            [(chunk, chunk_index) for chunk_index, chunk in enumerate(text_dict_chunks)],
+            is_valid=lambda result: result[0],
+            cost=lambda args: self._core.estimate_chunk_cost(args[0]),
+            resume=lambda args, result: (args[0], args[1], result)
+        ):
+            completed += 1
+            self._logger.info(f"Translation Of Chunk{chunk_index} Success: {success}")
+            self.progress.emit(int(completed / len(text_dict_chunks) * 95))
+            ## Save Middle Translated Lines ##
+            store.save_translations(SCOPE_TOC, translated_chunk, self._core.get_model_name(), chunk_attempts, latency)
+
+        ## Load Final Translated Lines ##
+        translated_text_dict = store.get_translations(SCOPE_TOC)
+        store.close()
 
         ## Update Epub Contents ##
         for file in [book._opf_path, book._toc_path]:
@@ -173,40 +165,19 @@ Before you finalize your response, double-check that the entire output is a sing
         book.save(save_path)
         self.completed.emit(save_path)
 
-        ## Save Final Translated Lines ##
-        with open(os.path.join(translated_dir, "toc_text_dict.json"), "w", encoding='utf-8') as f:
-            json.dump(translated_text_dict, f)
-
-    def _translate_text_dict_chunk(self, chunk: dict[int, str], chunk_index: int):
-        is_suceed: bool = True
-        translated_text_dict = {}
-        llm_contents = json.dumps(chunk, ensure_ascii=False, indent=2)
-        self._logger.info(f"Load Gemini Contents")
-
-        for i in range(3):
-            try:
-                self._logger.info(f"Chunk{chunk_index} Translation (Try {i+1})")
-                resp = self._core.generate_content(llm_contents)
-                translated_text_dict: dict = json.loads(resp)
-                if translated_text_dict.keys() != chunk.keys():
-                    self._logger.info(f"Failed To Parse Translated Response Of Chunk{chunk_index} (Try {i+1})\n")
-                    if i == 2:
-                        self._logger.warning(f"Final Failiure In Chunk{chunk_index} Translation")
-                        is_suceed = False
-                    continue
-                self._logger.info(f"Updated Chunks[{chunk_index}] Data")
-                time.sleep(self._request_delay)
-                return is_suceed, chunk_index, translated_text_dict
-
-            except Exception as e:
-                if resp:
-                    self._logger.info(f"##### ORIGINAL #####\n\n{str(llm_contents)}\n\n##### RESPONSE #####\n\n{str(resp)}\n")
-                self._logger.exception(str(e))
-                if i < 2:
-                    continue
-                else:
-                    return False, chunk_index, {}
-        return False, chunk_index, {}
+    async def _translate_text_dict_chunk(self, chunk: dict[int, str], chunk_index: int, previous: tuple | None = None):
+        self._logger.info(f"Chunk{chunk_index} Translation ({len(chunk)} Lines)")
+        ## Resume After An Outage (Lines Already Resolved Are Kept) ##
+        resolved, attempts = (previous[2], previous[3]) if previous else (None, None)
+        reconciler = ChunkReconciler(self._core, chunk, f"Chunk{chunk_index}", resolved=resolved, attempts=attempts)
+        started_at = time.monotonic()
+        translated_text_dict = await reconciler.resolve(resp_in_json=True)
+        latency = time.monotonic() - started_at
+        if not reconciler.done:
+            self._logger.warning(f"Final Failiure In Chunk{chunk_index} Translation ({len(reconciler.pending)} Lines Left)")
+            return False, chunk_index, translated_text_dict, reconciler.attempts, latency
+        self._logger.info(f"Updated Chunks[{chunk_index}] Data ({reconciler.requests} Requests, {reconciler.resubmitted_lines} Lines Resubmitted)")
+        return True, chunk_index, translated_text_dict, reconciler.attempts, latency
 
     def _translate_toc(self, data: list[LineData], save_path: str, original_path: str):
         is_suceed: bool = True
@@ -261,7 +232,6 @@ Before you finalize your response, double-check that the entire output is a sing
                 for i, line in enumerate(translated_lines):
                     data[i].translated = re.sub(r'^\[\d+\]\s*', '', line).strip()
                 self._logger.info(f"Updated Data")
-                time.sleep(self._request_delay)
                 return is_suceed
             except Exception as e:
                 self._logger.exception(str(e))
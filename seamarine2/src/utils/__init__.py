@@ -4,4 +4,7 @@ from .paths import *
 from .pn_dict import *
 from .chunker import *
 from .foreign_detect import *
-from .translatable_xhtml import *
\ No newline at end of file
+from .translatable_xhtml import *
+from .json_salvage import *
+from .token_estimator import *
+from .text_dedup import *
\ No newline at end of file
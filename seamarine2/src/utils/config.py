@@ -4,9 +4,21 @@ from PySide6.QtCore import QStandardPaths
 
 CURRENT_VERSION = "2.1.0"
 
+# Free-tier quotas per model, enforced when "free_tier" is set. Paid keys have far
+# higher limits, so without it only the models listed in "rate_limits" are throttled.
+FREE_TIER_RATE_LIMITS: dict[str, dict] = {
+    "gemini-2.5-pro": {"rpm": 5, "tpm": 250000},
+    "gemini-2.5-flash": {"rpm": 10, "tpm": 250000},
+    "gemini-2.5-flash-lite": {"rpm": 15, "tpm": 250000},
+    "gemini-2.0-flash": {"rpm": 15, "tpm": 1000000},
+    "gemini-2.0-flash-lite": {"rpm": 30, "tpm": 1000000}
+}
+
 _default_config_data: dict = {
     "current_version": CURRENT_VERSION,
     "gemini_api_key": "",
+    "extra_gemini_api_keys": [],
+    "gemini_base_url": "",
     "translate_pipeline": [
         "ruby removal", 
         "pn extract",
@@ -17,8 +29,36 @@ _default_config_data: dict = {
         "image translation"
     ],
     "max_chunk_size": 4096,
+    "max_chunk_tokens": 2560,
     "max_concurrent_request": 3,
-    "request_delay": 0,
+    "adaptive_concurrency": True,
+    "max_adaptive_concurrency": 32,
+    "free_tier": False,
+    "rate_limits": {},
+    "retry_policy": {
+        "max_attempts": 8,
+        "base_delay": 2,
+        "max_delay": 120,
+        "deadline": 1800
+    },
+    "response_cache_enabled": True,
+    "response_cache_max_mb": 512,
+    "translation_memory_enabled": True,
+    "fuzzy_match_threshold": 0.75,
+    "fuzzy_autofill_threshold": 0.97,
+    "context_cache_enabled": False,
+    "context_cache_ttl": 3600,
+    "structured_output": True,
+    "batch_mode": False,
+    "stream_responses": False,
+    "hedging_enabled": False,
+    "hedge_percentile": 95,
+    "hedge_budget_percent": 5,
+    "circuit_breaker_threshold": 5,
+    "circuit_breaker_reset": 30,
+    "call_trace_mode": "off",
+    "call_trace_path": "",
+    "call_trace_speed": 1.0,
     "pn_extract_model_config": {
         "name": "gemini-2.5-flash",
         "system_prompt": \
@@ -54,7 +94,8 @@ You are a highly specialized linguistic processor. Your sole function is to rece
         "top_p": 0.95,
         "frequency_penalty": 0.0,
         "thinking_budget": -1,
-        "use_thinking_budget": True
+        "use_thinking_budget": True,
+        "fallback_models": []
     },
     "main_translate_model_config": {
         "name": "gemini-2.5-flash",
@@ -105,7 +146,8 @@ Core Principle: Translate faithfully without summarization or addition. Ensure n
         "top_p": 0.95,
         "frequency_penalty": 0.0,
         "thinking_budget": -1,
-        "use_thinking_budget": True
+        "use_thinking_budget": True,
+        "fallback_models": []
     },
     "toc_translate_model_config": {
         "name": "gemini-2.5-flash",
@@ -151,7 +193,8 @@ Core Principle: Translate faithfully without summarization or addition. Ensure n
         "top_p": 0.95,
         "frequency_penalty": 0.0,
         "thinking_budget": -1,
-        "use_thinking_budget": True
+        "use_thinking_budget": True,
+        "fallback_models": []
     },
     "review_model_config": {
         "name": "gemini-2.5-flash",
@@ -202,7 +245,8 @@ Core Principle: Translate faithfully without summarization or addition. Ensure n
         "top_p": 0.95,
         "frequency_penalty": 0.0,
         "thinking_budget": -1,
-        "use_thinking_budget": True
+        "use_thinking_budget": True,
+        "fallback_models": []
     },
     "image_translate_model_config": {
         "name": "gemini-2.0-flash",
@@ -224,7 +268,8 @@ This version makes each step unambiguous and emphasizes the “no extras” rule
         "top_p": 0.95,
         "frequency_penalty": 0.0,
         "thinking_budget": -1,
-        "use_thinking_budget": False
+        "use_thinking_budget": False,
+        "fallback_models": []
     }
 }
 
@@ -249,5 +294,13 @@ def save_config(data):
     with open(settings_path, "w", encoding='utf-8') as f:
         json.dump(data, f)
 
+def get_rate_limits(free_tier: bool, rate_limits: dict[str, dict]) -> dict[str, dict]:
+    """
+    Per-model limits to enforce: the free-tier quotas if free_tier is set, with every entry of rate_limits taking precedence.
+    """
+    limits = dict(FREE_TIER_RATE_LIMITS) if free_tier else {}
+    limits.update(rate_limits)
+    return limits
+
 def get_default_config():
     return _default_config_data
\ No newline at end of file
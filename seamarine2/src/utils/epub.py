@@ -23,10 +23,13 @@ NAMESPACES = {
 for prefix, url in NAMESPACES.items():
     ET.register_namespace(prefix, url)
 
+ORIGINAL_LANGUAGE_META = "seamarine original lang"
+
 class BrokenEpubError(Exception):
     pass
 class UnsupportedEpubError(Exception):
     pass
+
 class Epub:
     def __init__(self, file_path: str):
         self._file_path: str = file_path
@@ -198,6 +201,10 @@ class Epub:
         return ''
     
     def get_original_language(self) -> str:
+        """
+        Source language of the book: the language saved by update_metadata_epub() before it set
+        dc:language to the target language, or dc:language itself for an untouched book.
+        """
         opf_tree, _ = self._get_opf_tree_and_path()
         ns = {
             'opf': 'http://www.idpf.org/2007/opf',
@@ -207,11 +214,18 @@ class Epub:
         if metadata_elem is None:
             raise ValueError("Metadata not found in OPF file.")
         
-        original_lang_elem = metadata_elem.find("opf:meta", ns)
-        if original_lang_elem is not None:
-            return original_lang_elem.text
+        original_lang_elem = self._find_original_language_meta(metadata_elem, ns)
+        if original_lang_elem is not None and original_lang_elem.get("content"):
+            return original_lang_elem.get("content")
         else:
             return self.get_language()
+
+    def _find_original_language_meta(self, metadata_elem, ns: dict[str, str]):
+        # Books carry other opf:meta elements (cover, calibre:*), so match ours by name.
+        for meta_elem in metadata_elem.findall('opf:meta', ns):
+            if meta_elem.get("name") == ORIGINAL_LANGUAGE_META:
+                return meta_elem
+        return None
     
     def update_title(self, new_title: str):
         self._metadata.set(f"{{{self._ns["dc"]}}}language", new_title)
@@ -239,10 +253,10 @@ class Epub:
  
         language_elem = metadata_elem.find('dc:language', ns)
         if language_elem is not None:
-            if metadata_elem.find('opf:meta', ns) is None:
+            if self._find_original_language_meta(metadata_elem, ns) is None:
                 original_lang = ET.Element('{http://www.idpf.org/2007/opf}meta')
-                original_lang.attrib["name"] = "seamarine original lang"
-                original_lang.attrib["content"] = self._get_language_name(language_elem.text)
+                original_lang.attrib["name"] = ORIGINAL_LANGUAGE_META
+                original_lang.attrib["content"] = self._get_language_name(language_elem.text.strip(), language_elem.text.strip())
                 metadata_elem.append(original_lang)
             language_elem.text = lang
         else:
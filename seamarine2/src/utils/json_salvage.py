@@ -0,0 +1,151 @@
+import json
+import re
+
+_INVALID_ESCAPE = re.compile(r'\\(?!["\\/bfnrtu])')
+_UNESCAPED_QUOTE = re.compile(r'(?<!\\)"')
+_NEXT_PAIR = re.compile(r',\s*"')
+
+class JsonObjectStreamParser:
+    """
+    Tolerant, incremental parser for a flat JSON object of string values.
+
+    Text can be fed piece by piece (e.g. from a streamed response); every key/value
+    pair is returned as soon as it is complete. The parser survives what LLMs tend
+    to produce: markdown fences, raw newlines, invalid escapes, unescaped quotes
+    inside values and a response that is cut off in the middle of a value.
+    """
+
+    def __init__(self):
+        self.pairs: dict[str, str] = {}
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+
+    def feed(self, text: str) -> dict[str, str]:
+        self._buffer += text
+        return self._parse(final=False)
+
+    def close(self) -> dict[str, str]:
+        return self._parse(final=True)
+
+    def _parse(self, final: bool) -> dict[str, str]:
+        new_pairs: dict[str, str] = {}
+        if not self._started:
+            start = self._buffer.find('{')
+            if start == -1:
+                return new_pairs
+            self._pos = start + 1
+            self._started = True
+
+        while not self._finished:
+            pos = self._skip_ws(self._pos)
+            if pos >= len(self._buffer):
+                break
+            if self._buffer[pos] == '}':
+                self._finished = True
+                break
+            if self._buffer[pos] != '"':
+                if not self._resync(pos):
+                    break
+                continue
+
+            key_end = self._find_string_end(pos + 1, ':', final)
+            if key_end is None:
+                break
+            colon = self._skip_ws(key_end + 1)
+            if colon >= len(self._buffer):
+                break
+            if self._buffer[colon] != ':':
+                if not self._resync(pos):
+                    break
+                continue
+
+            value_start = self._skip_ws(colon + 1)
+            if value_start >= len(self._buffer):
+                break
+            if self._buffer[value_start] == '"':
+                value_end = self._find_string_end(value_start + 1, ',}', final)
+                if value_end is None:
+                    break
+                value = self._decode_string(self._buffer[value_start + 1:value_end])
+                next_pos = value_end + 1
+            else:
+                try:
+                    raw_value, next_pos = json.JSONDecoder().raw_decode(self._buffer, value_start)
+                except ValueError:
+                    if final or not self._resync(pos):
+                        break
+                    continue
+                value = raw_value if isinstance(raw_value, str) else json.dumps(raw_value, ensure_ascii=False)
+
+            after = self._skip_ws(next_pos)
+            if after >= len(self._buffer) and not final:
+                break
+            key = self._decode_string(self._buffer[pos + 1:key_end])
+            new_pairs[key] = value
+            self.pairs[key] = value
+            if after < len(self._buffer) and self._buffer[after] == ',':
+                self._pos = after + 1
+            else:
+                self._pos = after
+        return new_pairs
+
+    def _skip_ws(self, pos: int) -> int:
+        while pos < len(self._buffer) and self._buffer[pos] in ' \t\r\n':
+            pos += 1
+        return pos
+
+    def _find_string_end(self, pos: int, terminators: str, final: bool) -> int | None:
+        """
+        Returns the index of the quote that closes the string starting at pos.
+        A quote only closes the string when the next non-blank character is one of
+        terminators; otherwise it is treated as an unescaped quote inside the string.
+        """
+        buffer = self._buffer
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '\\':
+                pos += 2
+                continue
+            if char == '"':
+                after = self._skip_ws(pos + 1)
+                if after >= len(buffer):
+                    return pos if final else None
+                if buffer[after] in terminators:
+                    return pos
+            pos += 1
+        return None
+
+    def _resync(self, pos: int) -> bool:
+        match = _NEXT_PAIR.search(self._buffer, pos)
+        if match is None:
+            return False
+        self._pos = match.end() - 1
+        return True
+
+    @staticmethod
+    def _decode_string(raw: str) -> str:
+        try:
+            return json.loads(f'"{raw}"', strict=False)
+        except ValueError:
+            repaired = _UNESCAPED_QUOTE.sub(r'\\"', _INVALID_ESCAPE.sub(r'\\\\', raw))
+            try:
+                return json.loads(f'"{repaired}"', strict=False)
+            except ValueError:
+                return raw
+
+def salvage_json_object(text: str) -> dict[str, str]:
+    """
+    Returns every complete key/value pair that can be recovered from a (possibly broken or truncated) JSON object.
+    """
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+    parser = JsonObjectStreamParser()
+    parser.feed(text)
+    parser.close()
+    return parser.pairs
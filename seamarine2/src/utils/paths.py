@@ -3,4 +3,8 @@ from PySide6.QtCore import QStandardPaths
 
 def get_save_directory() -> str:
     documents_folder = QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation)
-    return os.path.join(documents_folder, "SeaMarine_AI_Translate_Tool/Output/")
\ No newline at end of file
+    return os.path.join(documents_folder, "SeaMarine_AI_Translate_Tool/Output/")
+
+def get_cache_directory() -> str:
+    documents_folder = QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation)
+    return os.path.join(documents_folder, "SeaMarine_AI_Translate_Tool/Cache/")
\ No newline at end of file
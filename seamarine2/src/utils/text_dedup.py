@@ -0,0 +1,33 @@
+import re
+
+def dedup_key(text: str) -> str:
+    # Only whitespace is normalized: punctuation must come back exactly as in each source line.
+    return re.sub(r'\s+', ' ', text).strip()
+
+def dedupe_text_dict(text_dict: dict[str, str]) -> tuple[dict[str, str], dict[str, list[str]]]:
+    """
+    Collapses lines with identical (whitespace-normalized) text onto the first id that has it.
+    Returns the canonical text dict and {canonical id: [duplicate ids]}.
+    """
+    canonical: dict[str, str] = {}
+    first_ids: dict[str, str] = {}
+    duplicates: dict[str, list[str]] = {}
+    for doc_id, text in text_dict.items():
+        key = dedup_key(text)
+        if key in first_ids:
+            duplicates.setdefault(first_ids[key], []).append(doc_id)
+        else:
+            first_ids[key] = doc_id
+            canonical[doc_id] = text
+    return canonical, duplicates
+
+def expand_text_dict(translated: dict[str, str], duplicates: dict[str, list[str]]) -> dict[str, str]:
+    """
+    Fans the translation of every canonical id out to its duplicate ids.
+    """
+    result = dict(translated)
+    for canonical_id, doc_ids in duplicates.items():
+        if canonical_id in translated:
+            for doc_id in doc_ids:
+                result[doc_id] = translated[canonical_id]
+    return result
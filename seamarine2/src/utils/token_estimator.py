@@ -0,0 +1,102 @@
+import re
+import threading
+from functools import lru_cache
+
+# Character classes in matching order; everything else falls into "other".
+_SCRIPT_PATTERNS: list[tuple[str, re.Pattern]] = [
+    ("latin", re.compile(r'[A-Za-z0-9]')),
+    ("space", re.compile(r'[ \t]')),
+    ("newline", re.compile(r'[\r\n]')),
+    ("punct", re.compile(r'[!-/:-@\[-`{-~]')),
+    ("kana", re.compile(r'[぀-ヿㇰ-ㇿｦ-ﾟ]')),
+    ("han", re.compile(r'[㐀-䶿一-鿿豈-﫿]')),
+    ("hangul", re.compile(r'[ᄀ-ᇿ㄰-㆏가-힯]')),
+    ("cjk_punct", re.compile(r'[　-〿！-･‐-⁯]')),
+    ("alphabet", re.compile(r'[À-ɏͰ-ϿЀ-ԯ]')),
+]
+
+def _script_counts(text: str) -> dict[str, int]:
+    counts = {}
+    rest = len(text)
+    for script, pattern in _SCRIPT_PATTERNS:
+        n = len(pattern.findall(text))
+        if n:
+            counts[script] = n
+            rest -= n
+    if rest > 0:
+        counts["other"] = rest
+    return counts
+
+@lru_cache(maxsize=65536)
+def _cached_script_counts(text: str) -> tuple[tuple[str, int], ...]:
+    return tuple(_script_counts(text).items())
+
+
+class TokenEstimator:
+    """
+    Offline estimate of Gemini token counts, without a count_tokens round trip.
+
+    Each character class has its own tokens-per-character rate (Latin words
+    pack about four characters per token, kanji close to one), so a chunk of
+    Japanese and a chunk of English with the same budget carry a similar load.
+    Character class counts are cached per line. calibrate() nudges the rate of
+    a text's dominant class towards the usage metadata the API reports.
+    """
+
+    DEFAULT_RATES: dict[str, float] = {
+        "latin": 0.25,
+        "space": 0.05,
+        "newline": 0.5,
+        "punct": 0.6,
+        "kana": 0.55,
+        "han": 0.75,
+        "hangul": 0.45,
+        "cjk_punct": 0.8,
+        "alphabet": 0.35,
+        "other": 1.0
+    }
+    # Quotes, colon, comma and indentation around every "id": "text" entry.
+    JSON_ENTRY_OVERHEAD = 5
+
+    def __init__(self, rates: dict[str, float] | None = None, smoothing: float = 0.2):
+        self._rates = dict(self.DEFAULT_RATES) | (rates or {})
+        self._scales: dict[str, float] = {script: 1.0 for script in self._rates}
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+
+    def _raw(self, text: str) -> dict[str, float]:
+        return {script: count * self._rates[script] for script, count in _cached_script_counts(text)}
+
+    def estimate(self, text: str) -> int:
+        if not text:
+            return 0
+        return int(sum(tokens * self._scales[script] for script, tokens in self._raw(text).items())) + 1
+
+    def estimate_entry(self, key, text: str) -> int:
+        """
+        Tokens of one "key": "text" entry of a JSON chunk.
+        """
+        return self.estimate(str(key)) + self.estimate(text) + self.JSON_ENTRY_OVERHEAD
+
+    def estimate_text_dict(self, text_dict: dict) -> int:
+        return sum(self.estimate_entry(k, v) for k, v in text_dict.items()) + 2
+
+    def calibrate(self, text: str, actual_tokens: int, fixed_tokens: int = 0):
+        """
+        Adjusts the rate of text's dominant character class from an observed token count.
+        fixed_tokens is the estimate of everything else in the request (e.g. the system instruction).
+        """
+        raw = self._raw(text)
+        if not raw or actual_tokens <= fixed_tokens:
+            return
+        script = max(raw, key=raw.get)
+        ratio = (actual_tokens - fixed_tokens) / max(1.0, sum(raw.values()))
+        ratio = min(2.0, max(0.5, ratio))
+        with self._lock:
+            self._scales[script] += self._smoothing * (ratio - self._scales[script])
+
+    def get_scales(self) -> dict[str, float]:
+        return dict(self._scales)
+
+
+default_token_estimator = TokenEstimator()
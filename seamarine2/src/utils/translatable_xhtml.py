@@ -1,4 +1,5 @@
 from bs4 import BeautifulSoup, NavigableString, Comment
+from .token_estimator import TokenEstimator, default_token_estimator
 import re
 
 def chunk_text_dict(text_dict: dict[int, str], chunk_size: int) -> list[dict[int, str]]:
@@ -23,6 +24,47 @@ def chunk_text_dict(text_dict: dict[int, str], chunk_size: int) -> list[dict[int
 
     return result_chunks
 
+def chunk_text_dict_by_tokens(
+        text_dict: dict[int, str],
+        max_input_tokens: int,
+        max_output_tokens: int = 0,
+        output_ratio: float = 1.0,
+        estimator: TokenEstimator | None = None
+        ) -> list[dict[int, str]]:
+    """
+    Packs text_dict in order into chunks whose estimated input tokens (as a JSON object)
+    stay within max_input_tokens and whose expected output (input x output_ratio) stays
+    within max_output_tokens (0 = no output budget). Only the text is scaled by output_ratio;
+    ids and JSON punctuation come back verbatim. A single oversized line gets its own chunk.
+    """
+    if max_input_tokens <= 0:
+        raise ValueError("max_input_tokens must be bigger than 0")
+    estimator = estimator or default_token_estimator
+
+    result_chunks: list[dict[int, str]] = []
+    current_chunk: dict[int, str] = {}
+    current_input: int = 0
+    current_output: float = 0
+
+    for doc_id, text in text_dict.items():
+        entry_tokens = estimator.estimate_entry(doc_id, text)
+        entry_output = entry_tokens + (output_ratio - 1) * estimator.estimate(text)
+        over_input = current_input + entry_tokens > max_input_tokens
+        over_output = max_output_tokens > 0 and current_output + entry_output > max_output_tokens
+        if (over_input or over_output) and current_chunk:
+            result_chunks.append(current_chunk)
+            current_chunk = {}
+            current_input = 0
+            current_output = 0
+        current_chunk[doc_id] = text
+        current_input += entry_tokens
+        current_output += entry_output
+
+    if current_chunk:
+        result_chunks.append(current_chunk)
+
+    return result_chunks
+
 class TranslatableXHTML:
     def __init__(self, html: str, start_id: int = 0):
         self.soup: BeautifulSoup = BeautifulSoup(html, "lxml-xml")
@@ -108,7 +108,7 @@ Page {
                 Layout.rightMargin: 8
                 Layout.topMargin: 8
 
-                onClicked: generalSettingViewModel.save_data(chunkSizeSet.fieldText, maxConcurrentRequestSet.fieldText, delaySet.fieldText)
+                onClicked: generalSettingViewModel.save_data(chunkSizeSet.fieldText, maxConcurrentRequestSet.fieldText)
             }
         }
 
@@ -139,18 +139,18 @@ Page {
         MyComponents.ModelSettingComponent {
             id: chunkSizeSet
             pageFont: root.pageFont
-            text: qsTr("최대 청크 사이즈")
-            placeholderText: "1000-65536"
+            text: qsTr("최대 청크 크기 (토큰)")
+            placeholderText: "256-32768"
             textColor: colorLoader.shimarin_dark
             buttonColor: colorLoader.shimarin
             borderColor: colorLoader.shimarin_dark
-            fieldText: generalSettingViewModel.maxChunkSize
-            validator: IntValidator {bottom: 1000; top: 65536}
+            fieldText: generalSettingViewModel.maxChunkTokens
+            validator: IntValidator {bottom: 256; top: 32768}
             textFieldWidth: 90
 
             onClicked: {
-                generalSettingViewModel.set_default("max_chunk_size")
-                chunkSizeSet.fieldText = generalSettingViewModel.maxChunkSize
+                generalSettingViewModel.set_default("max_chunk_tokens")
+                chunkSizeSet.fieldText = generalSettingViewModel.maxChunkTokens
             }
         }
 
@@ -189,20 +189,52 @@ Page {
             color: colorLoader.shimarin
         }
 
-        MyComponents.ModelSettingComponent {
-            id: delaySet
-            pageFont: root.pageFont
-            text: qsTr("요청간 지연 (초)")
-            placeholderText: "0-99"
-            textColor: colorLoader.shimarin_dark
-            buttonColor: colorLoader.shimarin
-            borderColor: colorLoader.shimarin_dark
-            fieldText: generalSettingViewModel.requestDelay
-            validator: IntValidator {bottom: 0; top: 99}
+        RowLayout {
+            id: freeTierSet
 
-            onClicked: {
-                generalSettingViewModel.set_default("request_delay")
-                delaySet.fieldText = generalSettingViewModel.requestDelay
+            Item {
+                id: freeTierLeftPad
+                Layout.preferredHeight: 1
+                Layout.preferredWidth: 4
+            }
+
+            Text {
+                id: freeTierText
+                Layout.alignment: Qt.AlignLeft
+                Layout.margins: 4
+
+                text: qsTr("무료 등급 API 키 (요청 한도 적용)")
+                font.family: root.pageFont.family
+                font.pixelSize: 16
+                font.bold: true
+                horizontalAlignment: Text.AlignHCenter
+                color: colorLoader.shimarin_dark
+                lineHeight: 1.1
+            }
+
+            Item {
+                id: freeTierFill
+                Layout.fillWidth: true
+                Layout.preferredHeight: 1
+            }
+
+            MyComponents.CircularCheckbox {
+                id: freeTierCheckbox
+                isButton: true
+
+                baseColor: colorLoader.shimarin_light
+                checkColor: "#8cf062"
+                borderColor: colorLoader.shimarin_dark
+                borderWidth: 3
+
+                Layout.preferredWidth: 28
+                Layout.preferredHeight: 28
+                Layout.alignment: Qt.AlignVCenter | Qt.AlignRight
+                Layout.leftMargin: 0
+                Layout.rightMargin: 10
+
+                checked: generalSettingViewModel.freeTier
+                onClicked: generalSettingViewModel.freeTier = !checked
             }
         }
 
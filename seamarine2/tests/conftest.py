@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pytest
+from backend.core import TranslateCore
+from backend.core.fake_gemini import FakeGeminiServer, FakeGeminiBehavior
+from backend.model import AiModelConfig
+
+
+@pytest.fixture
+def fake_server():
+    server = FakeGeminiServer(FakeGeminiBehavior(transform="tag")).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def make_core(fake_server):
+    """
+    Returns a factory for TranslateCores that talk to fake_server with fast retries and no fallback models.
+    """
+    def make(keys: int = 1, model: str = "gemini-2.5-flash", system_prompt: str = "", **retry_policy) -> TranslateCore:
+        core = TranslateCore("Japanese")
+        core.configure_base_url(fake_server.url)
+        core.register_key("key-0")
+        core.register_keys([f"key-{i}" for i in range(1, keys)])
+        core.update_retry_policy({"max_attempts": 4, "base_delay": 0.05, "max_delay": 0.2, "deadline": 30, **retry_policy})
+        model_data = AiModelConfig()
+        model_data.name = model
+        model_data.system_prompt = system_prompt
+        core.update_model_data(model_data)
+        return core
+    return make
+
+
+@pytest.fixture
+def change_after(fake_server):
+    """
+    change_after(n, **behavior) applies the behavior changes once the fake server has answered n requests.
+    """
+    def change(requests: int, **behavior):
+        generate = fake_server.generate
+
+        def wrapped(model: str, body: dict):
+            result = generate(model, body)
+            if fake_server.stats["requests"] >= requests:
+                for name, value in behavior.items():
+                    setattr(fake_server.behavior, name, value)
+            return result
+        fake_server.generate = wrapped
+    return change
@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+from backend.core import BatchJobRunner, LocalBatchBackend
+from utils import dedupe_text_dict, expand_text_dict
+
+
+class CountingBackend(LocalBatchBackend):
+    def __init__(self, directory: str, responder=None, states: list[str] | None = None):
+        super().__init__(directory, responder)
+        self.submitted: list[str] = []
+        self._states = list(states or [])
+
+    def submit(self, jsonl_path: str, model: str, display_name: str) -> str:
+        job_name = super().submit(jsonl_path, model, display_name)
+        self.submitted.append(job_name)
+        return job_name
+
+    def get_state(self, job_name: str) -> str:
+        if self._states:
+            state = self._states.pop(0)
+            if state == "INTERRUPT":
+                raise KeyboardInterrupt
+            return state
+        return super().get_state(job_name)
+
+
+def tag_values(request: dict) -> str:
+    payload = json.loads(request["contents"][0]["parts"][0]["text"])
+    return json.dumps({k: f"[T] {v}" for k, v in payload.items()}, ensure_ascii=False)
+
+
+def test_requests_are_written_as_jsonl_with_the_interactive_config(tmp_path, make_core):
+    core = make_core(system_prompt="Translate the JSON values into Korean.")
+    chunks = [{"0": "a", "1": "b"}, {"2": "c"}]
+    runner = BatchJobRunner(core, LocalBatchBackend(str(tmp_path / "jobs")), str(tmp_path / "work"), poll_interval=0)
+
+    runner.run(chunks)
+
+    with open(tmp_path / "work" / "batch_requests.jsonl", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["key"] for line in lines] == ["chunk-0", "chunk-1"]
+    for line, chunk in zip(lines, chunks):
+        request = line["request"]
+        assert json.loads(request["contents"][0]["parts"][0]["text"]) == chunk
+        assert request["system_instruction"]["parts"][0]["text"].startswith("Translate the JSON values into Korean.")
+        assert "system_instruction" not in request["generation_config"]
+        schema = request["generation_config"]["response_schema"]
+        assert sorted(schema["required"]) == sorted(chunk.keys())
+
+
+def test_results_are_mapped_back_to_their_chunks_and_duplicates_expanded(tmp_path, make_core):
+    core = make_core()
+    text_dict = {"0": "「……」", "1": "hello", "2": "「……」", "3": "world", "4": "hello", "5": "bye"}
+    canonical, duplicates = dedupe_text_dict(text_dict)
+    chunks = [{k: canonical[k] for k in list(canonical)[:2]}, {k: canonical[k] for k in list(canonical)[2:]}]
+
+    def responder(request: dict) -> str:
+        answer = json.loads(tag_values(request))
+        answer.pop("5", None)
+        answer["99"] = "invented"
+        return json.dumps(answer, ensure_ascii=False)
+    runner = BatchJobRunner(core, LocalBatchBackend(str(tmp_path / "jobs"), responder), str(tmp_path / "work"), poll_interval=0)
+
+    translated = expand_text_dict(runner.run(chunks), duplicates)
+
+    assert translated == {k: f"[T] {v}" for k, v in text_dict.items() if k != "5"}
+
+
+def test_an_interrupted_run_resumes_the_submitted_job(tmp_path, make_core):
+    core = make_core()
+    chunks = [{"0": "a"}, {"1": "b"}]
+    backend = CountingBackend(str(tmp_path / "jobs"), tag_values, states=["JOB_STATE_RUNNING", "INTERRUPT"])
+    work_dir = str(tmp_path / "work")
+
+    with pytest.raises(KeyboardInterrupt):
+        BatchJobRunner(core, backend, work_dir, poll_interval=0).run(chunks)
+    assert os.path.exists(os.path.join(work_dir, "batch_job.json"))
+
+    translated = BatchJobRunner(core, backend, work_dir, poll_interval=0).run(chunks)
+
+    assert translated == {"0": "[T] a", "1": "[T] b"}
+    assert len(backend.submitted) == 1
+    assert not os.path.exists(os.path.join(work_dir, "batch_job.json"))
+
+
+def test_a_job_for_other_chunks_is_not_resumed(tmp_path, make_core):
+    core = make_core()
+    backend = CountingBackend(str(tmp_path / "jobs"), tag_values, states=["INTERRUPT"])
+    work_dir = str(tmp_path / "work")
+    with pytest.raises(KeyboardInterrupt):
+        BatchJobRunner(core, backend, work_dir, poll_interval=0).run([{"0": "a"}])
+
+    translated = BatchJobRunner(core, backend, work_dir, poll_interval=0).run([{"1": "b"}])
+
+    assert translated == {"1": "[T] b"}
+    assert len(backend.submitted) == 2
+
+
+@pytest.mark.parametrize("state", ["JOB_STATE_FAILED", "JOB_STATE_EXPIRED", "JOB_STATE_CANCELLED"])
+def test_a_failed_job_leaves_every_line_to_the_interactive_pass(tmp_path, make_core, state):
+    core = make_core()
+    backend = CountingBackend(str(tmp_path / "jobs"), tag_values, states=["JOB_STATE_PENDING", state])
+    work_dir = str(tmp_path / "work")
+    polled = []
+
+    translated = BatchJobRunner(core, backend, work_dir, poll_interval=0).run([{"0": "a"}, {"1": "b"}], on_poll=polled.append)
+
+    assert translated == {}
+    assert polled == ["JOB_STATE_PENDING", state]
+    # The next run submits a fresh job instead of resuming the failed one.
+    assert not os.path.exists(os.path.join(work_dir, "batch_job.json"))
@@ -0,0 +1,52 @@
+from backend.core import ChunkReconciler
+
+
+def make_chunk(count: int, length: int = 1) -> dict[str, str]:
+    return {str(i): f"line {i} " + "あ" * length for i in range(count)}
+
+
+def test_missing_keys_are_resubmitted_alone(fake_server, make_core, change_after):
+    fake_server.behavior.rate_missing_key = 1.0
+    change_after(1, rate_missing_key=0.0)
+    core = make_core()
+    chunk = make_chunk(6)
+    resolved = []
+    reconciler = ChunkReconciler(core, chunk, "chunk 0", on_resolved=resolved.extend)
+
+    results = core.run_coroutine(reconciler.resolve())
+
+    assert results == {k: f"[T] {v}" for k, v in chunk.items()}
+    assert fake_server.stats["missing_key"] == 1
+    assert reconciler.requests == 2
+    assert reconciler.resubmitted_lines == 1
+    assert sorted(resolved) == sorted(chunk.keys())
+    assert max(reconciler.attempts.values()) == 2 and sum(reconciler.attempts.values()) == 7
+
+
+def test_unknown_ids_are_dropped(make_core):
+    core = make_core()
+    reconciler = ChunkReconciler(core, {"0": "a", "1": "b"})
+
+    missing = reconciler.reconcile({"0": "a", "1": "b"}, {"0": "A", "1": "", "9": "invented"})
+
+    assert reconciler.results == {"0": "A"}
+    assert missing == {"1": "b"}
+    assert reconciler.extra_ids == 1
+
+
+def test_stream_cut_off_at_max_tokens_is_split_instead_of_retried(fake_server, make_core, change_after):
+    fake_server.behavior.rate_truncate = 1.0
+    change_after(1, rate_truncate=0.0)
+    core = make_core()
+    chunk = make_chunk(8, length=40)
+    streamed = []
+    reconciler = ChunkReconciler(core, chunk, "chunk 0", stream=True, on_resolved=streamed.extend)
+
+    results = core.run_coroutine(reconciler.resolve())
+
+    assert results == {k: f"[T] {v}" for k, v in chunk.items()}
+    assert fake_server.stats["truncated"] == 1
+    # Lines completed before the cut were kept; the rest went out in two halves in the same round.
+    assert reconciler.requests == 3
+    assert reconciler.resubmitted_lines == 0
+    assert sorted(streamed) == sorted(chunk.keys())
@@ -0,0 +1,33 @@
+from backend.core import ChunkRunner, ChunkReconciler
+
+
+def test_chunks_failed_by_an_outage_are_requeued_until_the_circuit_closes(fake_server, make_core, change_after):
+    fake_server.behavior.rate_500 = 1.0
+    change_after(2, rate_500=0.0)
+    core = make_core()
+    core.configure_circuit_breaker(2, 0.2)
+    chunks = [{f"{c}-{i}": f"chunk {c} line {i}" for i in range(3)} for c in range(4)]
+    calls = []
+
+    async def translate(chunk: dict, previous: tuple | None = None):
+        calls.append(list(chunk.keys()))
+        resolved = previous[1] if previous else None
+        reconciler = ChunkReconciler(core, chunk, resolved=resolved)
+        results = await reconciler.resolve()
+        return reconciler.done, results
+
+    runner = ChunkRunner(core, 1)
+    results = list(runner.run(
+        translate,
+        [(chunk,) for chunk in chunks],
+        is_valid=lambda result: result[0],
+        resume=lambda args, result: (args[0], result)
+    ))
+
+    assert [done for done, _ in results] == [True] * len(chunks)
+    translated = {k: v for _, lines in results for k, v in lines.items()}
+    assert translated == {k: f"[T] {v}" for chunk in chunks for k, v in chunk.items()}
+    assert fake_server.stats["500"] == 2
+    # The chunks hit by the outage ran again instead of being reported as failed.
+    assert len(calls) > len(chunks)
+    assert not core.is_circuit_open()
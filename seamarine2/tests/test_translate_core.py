@@ -0,0 +1,61 @@
+import json
+import time
+
+
+def make_chunk(count: int, marker_at: int = -1, marker: str = "") -> dict[str, str]:
+    return {str(i): f"line {i} {marker}" if i == marker_at else f"line {i}" for i in range(count)}
+
+
+def test_429_with_retry_delay_benches_the_key_and_stops_after_max_attempts(fake_server, make_core):
+    fake_server.behavior.rate_429 = 1.0
+    fake_server.behavior.retry_delay = 3
+    core = make_core(keys=3, max_attempts=3)
+
+    result = core.generate_content(json.dumps(make_chunk(2)), resp_in_json=True, response_keys=["0", "1"])
+
+    assert result == ""
+    assert fake_server.stats["429"] == 3
+    # Each attempt went to the next key; every throttled key waits at least the server's retryDelay.
+    now = time.monotonic()
+    assert [stats["throttles"] for stats in core.get_key_stats()] == [1, 1, 1]
+    assert all(slot.cooldown_until - now > 2.5 for slot in core._key_pool._slots)
+
+
+def test_429_without_retry_info_retries_with_jittered_backoff(fake_server, make_core, change_after):
+    fake_server.behavior.rate_429 = 1.0
+    fake_server.behavior.retry_delay = 0
+    change_after(2, rate_429=0.0)
+    core = make_core(base_delay=0.05, max_delay=0.1)
+    delays = []
+    defer = core._retry_scheduler.defer
+
+    async def recording_defer(delay: float):
+        delays.append(delay)
+        await defer(delay)
+    core._retry_scheduler.defer = recording_defer
+
+    started_at = time.monotonic()
+    result = core.generate_content(json.dumps(make_chunk(2)), resp_in_json=True, response_keys=["0", "1"])
+
+    assert json.loads(result) == {"0": "[T] line 0", "1": "[T] line 1"}
+    assert fake_server.stats["429"] == 2
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 0.05 and 0 <= delays[1] <= 0.1
+    assert time.monotonic() - started_at < 5
+    assert core._key_pool.primary.consecutive_throttles == 0
+
+
+def test_bisection_isolates_the_blocked_line(fake_server, make_core):
+    fake_server.behavior.block_marker = "FORBIDDEN"
+    core = make_core()
+    chunk = make_chunk(8, marker_at=5, marker="FORBIDDEN")
+
+    result = json.loads(core.generate_content(json.dumps(chunk), resp_in_json=True, response_keys=list(chunk.keys())))
+
+    assert result == {k: f"[T] {v}" for k, v in chunk.items() if k != "5"}
+    stats = core.get_bisection_stats()
+    assert stats["runs"] == 1
+    assert stats["blocked_pieces"] == 1
+    # One blocked line in eight: the whole chunk plus two halves per level down to the single line.
+    assert fake_server.stats["blocked"] == 4
+    assert fake_server.stats["requests"] == 1 + 2 * 3